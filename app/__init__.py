@@ -47,9 +47,11 @@ def create_app():
     extensions(app)
 
     with app.app_context():
-        from app.models import FlightPlan, Waypoint, DroneParameters, Gimbal, GPSCoord, FlightPlanBuilder, ReconResource, Recon, AppInformations, Analysis, AnalysisResult
+        from app.models import FlightPlan, Waypoint, Gimbal, GPSCoord, FlightPlanBuilder, ReconResource, Recon, ChangeLog, Analysis, AnalysisResult
+        from app.migrations import upgrade
         #db.drop_all()
         db.create_all()
+        upgrade()
 
     return app
 
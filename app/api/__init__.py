@@ -7,6 +7,13 @@ api = Api(blueprint,
           version='2.0',
           description='API for the BTS E-Littoral Project')
 
+from app.api.encoding import representations, compress_response
+
+for mediatype, output in representations.items():
+    api.representation(mediatype)(output)
+
+blueprint.after_request(compress_response)
+
 from app.api.endpoints.Postman import ns as postman_namespace
 from app.api.endpoints.AppInformations import ns as info_namespace
 from app.api.endpoints.FlightPlans import ns as flightplan_namespace
@@ -15,6 +22,8 @@ from app.api.endpoints.Recons import ns as recon_namespace
 from app.api.endpoints.Resources import ns as resource_namespace
 from app.api.endpoints.Analysis import ns as analysis_namespace
 from app.api.endpoints.Results import ns as result_namespace
+from app.api.endpoints.NoFlyZones import ns as nofly_namespace
+from app.api.endpoints.Sync import ns as sync_namespace
 
 api.add_namespace(postman_namespace)
 api.add_namespace(info_namespace)
@@ -24,3 +33,5 @@ api.add_namespace(recon_namespace)
 api.add_namespace(resource_namespace)
 api.add_namespace(analysis_namespace)
 api.add_namespace(result_namespace)
+api.add_namespace(nofly_namespace)
+api.add_namespace(sync_namespace)
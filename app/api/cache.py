@@ -0,0 +1,179 @@
+import hashlib
+from functools import wraps
+from flask import request, current_app, Response
+from sqlalchemy import event
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_REDIS_URL, RESPONSE_CACHE_TTL
+from app.core.cache import LRUCache
+from app.api import api
+from app.api.encoding import negotiate_mediatype, negotiate_encoding, compressions
+from app.extensions import db
+from app.models import ChangeLog
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Responses of the current process, by key
+response_cache = LRUCache(RESPONSE_CACHE_SIZE)
+
+# Responses shared by the processes (Redis client), connected on first use
+shared_cache = None
+
+
+def get_shared_cache():
+    """
+    Return the Redis client of the shared cache, None if no Redis URL is set
+
+    :return: Redis client
+    :rtype: redis.StrictRedis|None
+    """
+    global shared_cache
+
+    if shared_cache is None and RESPONSE_CACHE_REDIS_URL is not None:
+        if redis is None:
+            raise ValueError('redis is required to use RESPONSE_CACHE_REDIS_URL')
+
+        shared_cache = redis.StrictRedis.from_url(RESPONSE_CACHE_REDIS_URL)
+
+    return shared_cache
+
+
+def response_key(version, mediatype):
+    """
+    Return the cache key of the current request at a data version
+
+    The key contains the path, the query arguments, the field mask and the media type, a new version makes the
+    previous keys unreachable.
+
+    :param version: Version of the data
+    :type version: int
+
+    :param mediatype: Media type of the representation
+    :type mediatype: str
+
+    :return: Key
+    :rtype: str
+    """
+    args = '&'.join('{0}={1}'.format(key, value) for key, value in sorted(request.args.items(multi=True)))
+    mask = request.headers.get(current_app.config.get('RESTPLUS_MASK_HEADER', 'X-Fields'), '')
+
+    return 'response:{0}:{1}?{2}|{3}|{4}'.format(version, request.path, args, mask, mediatype)
+
+
+def get_cached_body(key):
+    """
+    Return the cached body of a response, from the process cache then from Redis
+
+    :param key: Key
+    :type key: str
+
+    :return: Body, None if the response is not cached
+    :rtype: bytes|None
+    """
+    body = response_cache.get(key)
+    if body is not None:
+        return body
+
+    client = get_shared_cache()
+    if client is None:
+        return None
+
+    try:
+        body = client.get(key)
+    except redis.RedisError:
+        return None
+
+    if body is not None:
+        response_cache.set(key, body)
+
+    return body
+
+
+def set_cached_body(key, body):
+    """
+    Cache the body of a response in the process cache and in Redis
+
+    :param key: Key
+    :type key: str
+
+    :param body: Body
+    :type body: bytes
+    """
+    response_cache.set(key, body)
+
+    client = get_shared_cache()
+    if client is None:
+        return
+
+    try:
+        client.setex(key, RESPONSE_CACHE_TTL, body)
+    except redis.RedisError:
+        pass
+
+
+def cached_response(func):
+    """
+    Decorator caching the responses of a GET endpoint by data version
+
+    The version is the last change of the change log, a write changes it so the cached responses are never stale.
+    The responses have a strong ETag (hash of the body, with the content coding if compressed), a request with a
+    matching If-None-Match gets a 304. Only the 200 responses are cached, the compressed bodies are kept by the
+    process cache only.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        last = ChangeLog.last_version()
+        mediatype = negotiate_mediatype(api)
+        key = response_key(last.id if last is not None else 0, mediatype)
+
+        body = get_cached_body(key)
+
+        if body is None:
+            data = func(*args, **kwargs)
+            if isinstance(data, tuple) or isinstance(data, Response):
+                return data
+
+            body = api.make_response(data, 200).get_data()
+            set_cached_body(key, body)
+
+        etag = hashlib.sha1(body).hexdigest()
+        encoding = negotiate_encoding(len(body))
+        if encoding is not None:
+            etag += '-' + encoding
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            if encoding is not None:
+                compressed_key = key + '|' + encoding
+                compressed = response_cache.get(compressed_key)
+                if compressed is None:
+                    compressed = compressions[encoding](body)
+                    response_cache.set(compressed_key, compressed)
+                body = compressed
+
+            response = Response(body, mimetype=mediatype)
+            if encoding is not None:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.vary.add('Accept')
+        response.vary.add('Accept-Encoding')
+
+        return response
+
+    return api.response(304, 'Not modified.')(wrapper)
+
+
+@event.listens_for(db.session, 'after_commit')
+def drop_stale_responses(session):
+    # The responses of the previous versions can no longer be reached
+    if session.info.pop('data_changed', False):
+        response_cache.clear()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def keep_responses(session):
+    session.info.pop('data_changed', None)
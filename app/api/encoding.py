@@ -0,0 +1,173 @@
+import gzip
+import zlib
+from collections import OrderedDict
+from flask import request, make_response
+from config import COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+# Media types of the responses that are worth compressing
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'application/msgpack', 'application/cbor',
+                          'application/geo+json', 'application/vnd.google-earth.kml+xml'}
+
+
+def output_msgpack(data, code, headers=None):
+    """
+    Representation of the responses in MessagePack
+
+    :param data: Marshalled data
+    :param code: Status code
+    :type code: int
+
+    :param headers: Headers
+    :type headers: dict
+
+    :return: Response
+    :rtype: flask.Response
+    """
+    response = make_response(msgpack.packb(data, use_bin_type=True), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def output_cbor(data, code, headers=None):
+    """
+    Representation of the responses in CBOR
+
+    :param data: Marshalled data
+    :param code: Status code
+    :type code: int
+
+    :param headers: Headers
+    :type headers: dict
+
+    :return: Response
+    :rtype: flask.Response
+    """
+    response = make_response(cbor2.dumps(data), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+# Binary representations of the responses, available if their package is installed
+representations = OrderedDict()
+if msgpack is not None:
+    representations['application/msgpack'] = output_msgpack
+if cbor2 is not None:
+    representations['application/cbor'] = output_cbor
+
+# Compressions by content coding, in order of preference, brotli if the package is installed
+compressions = OrderedDict()
+if brotli is not None:
+    compressions['br'] = lambda body: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+compressions['gzip'] = lambda body: gzip.compress(body, COMPRESSION_GZIP_LEVEL)
+
+
+def negotiate_encoding(size=None):
+    """
+    Return the content coding of a response accepted by the client
+
+    :param size: Size of the body, the bodies smaller than COMPRESSION_MIN_SIZE are not compressed. None if unknown
+        (streamed body)
+    :type size: int|None
+
+    :return: Content coding, None to send the response uncompressed
+    :rtype: str|None
+    """
+    if size is not None and size < COMPRESSION_MIN_SIZE:
+        return None
+
+    return request.accept_encodings.best_match(list(compressions.keys()))
+
+
+def negotiate_mediatype(api):
+    """
+    Return the media type of the representation of a response accepted by the client, as api.make_response
+
+    :param api: API
+    :type api: flask_restplus.Api
+
+    :return: Media type
+    :rtype: str
+    """
+    return request.accept_mimetypes.best_match(api.representations, default=api.default_mediatype)
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compress a streamed body as it is generated
+
+    :param chunks: Parts of the body
+    :type chunks: generator
+
+    :param encoding: Content coding
+    :type encoding: str
+
+    :return: Parts of the compressed body
+    :rtype: generator
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        compressed = compress(chunk)
+        if len(compressed) > 0:
+            yield compressed
+
+    yield finish()
+
+
+def compress_response(response):
+    """
+    Compress a response of the API with the content coding accepted by the client
+
+    The files (direct passthrough), the responses already compressed and the media types that do not compress well
+    are sent as is. The streamed responses are compressed as they are generated.
+
+    :param response: Response
+    :type response: flask.Response
+
+    :return: Response
+    :rtype: flask.Response
+    """
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or response.direct_passthrough:
+        return response
+
+    response.vary.add('Accept')
+    response.vary.add('Accept-Encoding')
+
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+
+    if response.is_streamed:
+        encoding = negotiate_encoding()
+        if encoding is not None:
+            response.response = compress_stream(response.iter_encoded(), encoding)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    body = response.get_data()
+    encoding = negotiate_encoding(len(body))
+    if encoding is not None:
+        response.set_data(compressions[encoding](body))
+        response.headers['Content-Encoding'] = encoding
+
+    return response
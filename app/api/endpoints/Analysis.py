@@ -1,26 +1,57 @@
 from flask import request
 from flask_restplus import abort
 from flask_restplus import Resource
+from sqlalchemy.orm import joinedload, subqueryload
 from app.api.serializers.analysis import analysis_data_container, analysis_with_recon, analysis_with_result, \
     analysis_post
 from app.api import api
+from app.api.cache import cached_response
+from app.api.fieldsets import sparse_loading
+from app.api.serializers.compiler import marshal_compiled
+from app.api.parsers import analysis_parser, fieldset_parser
+from app.api.pagination import paginate
 from app.extensions import db
-from app.models import AppInformations, Analysis
+from app.models import Analysis, AnalysisResult
 
 ns = api.namespace('analysis', description='Operations related to analysis.')
 
+# Loading plan of analysis_with_recon
+analysis_with_recon_loading = (
+    joinedload(Analysis.minuend_recon),
+    joinedload(Analysis.subtrahend_recon)
+)
+
+# Loading plan of analysis_with_result, the resources of all the results are loaded with them
+analysis_with_result_loading = (
+    subqueryload(Analysis.result_list).joinedload(AnalysisResult.minuend_resource),
+    subqueryload(Analysis.result_list).joinedload(AnalysisResult.subtrahend_resource)
+)
+
 
 @ns.route('/')
 class AnalysisCollection(Resource):
-    @api.marshal_with(analysis_data_container)
+    @cached_response
+    @marshal_compiled(analysis_data_container, sparse=True, collection='analysis')
+    @api.expect(analysis_parser)
     def get(self):
         """
         Get Analysis List
+
+        200 Success
+        400 Validation error
         """
+        args = analysis_parser.parse_args()
 
-        analysis_list = Analysis.query.all()
+        query = Analysis.query.options(*sparse_loading(analysis_with_recon, Analysis, analysis_with_recon_loading))
+        if args['state'] is not None:
+            query = query.filter_by(state=args['state'])
 
-        return {'analysis': analysis_list}
+        try:
+            analysis_list, next_cursor = paginate(query, Analysis, args)
+        except ValueError as e:
+            abort(400, error=str(e))
+
+        return {'analysis': analysis_list, 'next_cursor': next_cursor}
 
     @api.marshal_with(analysis_with_recon, code=201, description='Analysis successfully created.')
     @api.doc(responses={
@@ -39,7 +70,6 @@ class AnalysisCollection(Resource):
         try:
             task = Analysis.from_dict(request.json)
             db.session.add(task)
-            AppInformations.update()
             db.session.commit()
 
             new_analysis.delay(task.id)
@@ -53,7 +83,9 @@ class AnalysisCollection(Resource):
 @ns.route('/<int:id>')
 @api.response(404, 'Analysis not found.')
 class AnalysisItem(Resource):
-    @api.marshal_with(analysis_with_result)
+    @cached_response
+    @marshal_compiled(analysis_with_result, sparse=True)
+    @api.expect(fieldset_parser)
     def get(self, id):
         """
         Get a Analysis
@@ -63,7 +95,8 @@ class AnalysisItem(Resource):
         :param id: Analysis unique Id
         """
 
-        res = Analysis.query.get_or_404(id)
+        res = Analysis.query.options(*sparse_loading(analysis_with_result, Analysis, analysis_with_result_loading)) \
+            .get_or_404(id)
         return res
 
     @api.response(204, 'Analysis successfully deleted.')
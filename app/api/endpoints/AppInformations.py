@@ -19,7 +19,7 @@ class Informations(Resource):
         Get current App informations
         """
 
-        app_info = AppInformations.query.filter_by(id = 1).first()
+        app_info = AppInformations.get()
         if app_info is None:
             abort(400, error='No App informations')
 
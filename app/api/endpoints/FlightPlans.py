@@ -1,19 +1,102 @@
-from flask import request
-from flask_restplus import abort, marshal
+from flask import request, json, Response, stream_with_context
+from flask_restplus import abort
+from sqlalchemy.orm import joinedload, subqueryload
 from app.exceptions import ValueExist
 from flask_restplus import Resource
 from app.api.serializers.flightplan import flightplan, flightplan_complete_with_builder, flightplan_minimal, \
     flightplan_put, flightplan_data_wrapper, flightplan_dump_data_wrapper, flightplan_complete, \
-    flightplan_builder_result
-
-from app.core.flightplan_builder import build_vertical_flightplan_from_options
-from app.api.serializers.builder import post_vertical_builder
+    flightplan_builder_result, flightplan_optimize_result, flightplan_batch_builder_result, flightplan_coverage
+
+from app.core.flightplan_export import binary_export, geojson_export, kml_export
+from app.core.flightplan_builder import build_flightplan_from_options, build_flightplans_from_normalized, \
+    normalize_options, create_preview, builder_cache
+from app.api.serializers.nofly import nofly_violation_data_wrapper
+from app.api.serializers.builder import post_vertical_builder, post_area_builder, post_batch_builder, \
+    builder_cache_info
 from app.api import api
+from app.api.cache import cached_response
+from app.api.serializers.compiler import marshal_compiled, serialize
+from app.api.parsers import pagination_parser, fieldset_parser, export_parser
+from app.api.fieldsets import sparse_model, loading_plan
+from app.api.pagination import paginate
+from app.api.encoding import msgpack
+from config import DUMP_BATCH_SIZE
 from app.extensions import db
-from app.models import FlightPlan, FlightPlanBuilder, AppInformations
+from app.models import FlightPlan, FlightPlanBuilder, Recon
 
 ns = api.namespace('flightplans', description='Operations related to flightplans.')
 
+# Loading plan of flightplan_complete_with_builder, a query per collection level whatever the number of rows
+flightplan_complete_loading = (
+    joinedload(FlightPlan.builder_options).joinedload(FlightPlanBuilder.coord1),
+    joinedload(FlightPlan.builder_options).joinedload(FlightPlanBuilder.coord2),
+    joinedload(FlightPlan.builder_options).joinedload(FlightPlanBuilder.d_gimbal),
+    subqueryload(FlightPlan.waypoint_list),
+    subqueryload(FlightPlan.recon_list).subqueryload(Recon.resource_list)
+)
+
+
+def dump_flightplans(batch_size=DUMP_BATCH_SIZE):
+    """
+    Generate the marshalled complete flightplans one at a time
+
+    The flightplans are loaded by batches (keyset on the unique ID), each batch is released before the next one
+    is loaded, so the memory used does not depend on the number of flightplans.
+
+    :param batch_size: Number of flightplans loaded at once
+    :type batch_size: int
+
+    :return: Marshalled flightplans
+    :rtype: generator
+    """
+    last_id = 0
+
+    while True:
+        flightplans = FlightPlan.query.options(*flightplan_complete_loading) \
+            .filter(FlightPlan.id > last_id) \
+            .order_by(FlightPlan.id) \
+            .limit(batch_size) \
+            .all()
+
+        for fp in flightplans:
+            if fp.builder_options is None:
+                yield serialize(fp, flightplan_complete)
+            else:
+                yield serialize(fp, flightplan_complete_with_builder)
+
+        if len(flightplans) < batch_size:
+            return
+
+        last_id = flightplans[-1].id
+        db.session.expunge_all()
+
+
+def stream_json_list(key, items):
+    """
+    Generate the JSON document {key: [items]} piece by piece
+
+    :param key: Key of the list
+    :type key: str
+
+    :param items: Items of the list
+    :type items: generator
+
+    :return: Parts of the document
+    :rtype: generator
+    """
+    yield '{"' + key + '": ['
+
+    for i, item in enumerate(items):
+        yield (', ' if i > 0 else '') + json.dumps(item)
+
+    yield ']}'
+
+
+# Media types of the dump, a sequence of MessagePack objects if msgpack is installed
+DUMP_MEDIATYPES = ['application/json', 'application/x-ndjson']
+if msgpack is not None:
+    DUMP_MEDIATYPES.append('application/msgpack')
+
 
 @ns.route('/dump')
 class FlightPlanDump(Resource):
@@ -21,31 +104,44 @@ class FlightPlanDump(Resource):
     def get(self):
         """
         Get FlightPlans Dump
+
+        The dump is streamed while the flightplans are read. With Accept: application/x-ndjson, each line is a
+        flightplan. With Accept: application/msgpack, each flightplan is a MessagePack object.
         """
+        mediatype = request.accept_mimetypes.best_match(DUMP_MEDIATYPES)
 
-        result = []
-        flightplans = FlightPlan.query.all()
+        if mediatype == 'application/x-ndjson':
+            lines = (json.dumps(item) + '\n' for item in dump_flightplans())
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
 
-        for fp in flightplans:
-            if fp.builder_options is None:
-                result.append(marshal(fp, flightplan_complete))
-            else:
-                result.append(marshal(fp, flightplan_complete_with_builder))
+        if mediatype == 'application/msgpack':
+            objects = (msgpack.packb(item, use_bin_type=True) for item in dump_flightplans())
+            return Response(stream_with_context(objects), mimetype='application/msgpack')
 
-        return {'flightplans': result}
+        return Response(stream_with_context(stream_json_list('flightplans', dump_flightplans())),
+                        mimetype='application/json')
 
 
 @ns.route('/')
 class FlightPlanCollection(Resource):
-    @api.marshal_with(flightplan_data_wrapper)
+    @cached_response
+    @marshal_compiled(flightplan_data_wrapper, sparse=True, collection='flightplans')
+    @api.expect(pagination_parser)
     def get(self):
         """
         Get FlightPlan List
+
+        200 Success
+        400 Validation error
         """
+        args = pagination_parser.parse_args()
 
-        flightplans = FlightPlan.query.all()
+        try:
+            flightplans, next_cursor = paginate(FlightPlan.query, FlightPlan, args)
+        except ValueError as e:
+            abort(400, error=str(e))
 
-        return {'flightplans': flightplans}
+        return {'flightplans': flightplans, 'next_cursor': next_cursor}
 
     @api.marshal_with(flightplan, code=201, description='FlightPlan successfully created.')
     @api.doc(responses={
@@ -65,7 +161,6 @@ class FlightPlanCollection(Resource):
         try:
             fp = FlightPlan.from_dict(request.json)
             db.session.add(fp)
-            AppInformations.update()
             db.session.commit()
 
             return fp, 201
@@ -79,19 +174,37 @@ class FlightPlanCollection(Resource):
 @ns.route('/<int:id>')
 @api.response(404, 'Flightplan not found.')
 class FlightPlanItem(Resource):
+    @cached_response
     @api.response(200, 'Success', flightplan_complete)
+    @api.expect(fieldset_parser)
     def get(self, id):
         """
         Get a FlightPlan
 
         200 Success
+        400 Unknown requested field
         :param id: FlightPlan unique Id
         """
-        fp = FlightPlan.query.get_or_404(id)
+        try:
+            requested = sparse_model(flightplan_complete_with_builder)
+        except ValueError as e:
+            abort(400, error=str(e))
+
+        if requested is not flightplan_complete_with_builder:
+            fp = FlightPlan.query.options(*loading_plan(requested, FlightPlan)).get_or_404(id)
+            data = serialize(fp, requested)
+
+            # Builder options of a FlightPlan that was not builded
+            if 'builder_options' in data and fp.builder_options_id is None:
+                data['builder_options'] = None
+
+            return data
+
+        fp = FlightPlan.query.options(*flightplan_complete_loading).get_or_404(id)
         if fp.builder_options is None:
-            return marshal(fp, flightplan_complete)
+            return serialize(fp, flightplan_complete)
         else:
-            return marshal(fp, flightplan_complete_with_builder)
+            return serialize(fp, flightplan_complete_with_builder)
 
     @api.response(204, 'FlightPlan successfully updated.')
     @api.doc(responses={
@@ -116,15 +229,19 @@ class FlightPlanItem(Resource):
             if request.json.get('builder_options') is not None:
 
                 builder_options = FlightPlanBuilder.from_dict(request.json.get('builder_options'))
-                flightplan_path = build_vertical_flightplan_from_options(builder_options)
+                flightplan_path = build_flightplan_from_options(builder_options)
+
+                preview = create_preview(fp.name, flightplan_path, builder_options, fp.id)
 
                 fp.delete_waypoints()
-                fp.waypoints = flightplan_path
                 fp.builder_options = builder_options
-                fp.update_informations()
+                fp.distance = preview.distance
                 fp.builded = True
 
                 db.session.add(fp)
+                db.session.flush()
+                fp.insert_waypoints(preview.waypoints)
+                fp.set_missions(preview.missions)
                 db.session.commit()
 
             return 'FlightPlan successfully updated.', 204
@@ -149,6 +266,167 @@ class FlightPlanItem(Resource):
         return 'FlightPlan successfully deleted.', 204
 
 
+@ns.route('/<int:id>/optimize')
+@api.response(404, 'Flightplan not found.')
+class FlightPlanOptimize(Resource):
+    @api.marshal_with(flightplan_optimize_result)
+    def post(self, id):
+        """
+        Reorder the waypoints of a FlightPlan to minimise the flight distance
+
+        200 Success
+        404 FlightPlan not found
+        :param id: FlightPlan unique Id
+        """
+        fp = FlightPlan.query.get_or_404(id)
+
+        before, after = fp.optimize_waypoints()
+        db.session.commit()
+
+        return {'distance_before': before, 'distance_after': after}
+
+
+@ns.route('/<int:id>/violations')
+@api.response(404, 'Flightplan not found.')
+class FlightPlanViolations(Resource):
+    @cached_response
+    @api.marshal_with(nofly_violation_data_wrapper)
+    def get(self, id):
+        """
+        Get the legs of a FlightPlan and of its missions that cross a NoFlyZone
+
+        200 Success
+        404 FlightPlan not found
+        :param id: FlightPlan unique Id
+        """
+        fp = FlightPlan.query.get_or_404(id)
+
+        return {'violations': fp.violations}
+
+
+@ns.route('/<int:id>/coverage')
+@api.response(404, 'Flightplan not found.')
+class FlightPlanCoverage(Resource):
+    @cached_response
+    @api.marshal_with(flightplan_coverage)
+    def get(self, id):
+        """
+        Get the ground coverage of the photos of a FlightPlan and of its missions
+
+        200 Success
+        404 FlightPlan not found
+        :param id: FlightPlan unique Id
+        """
+        fp = FlightPlan.query.get_or_404(id)
+
+        return fp.coverage
+
+
+# Exports by format: generator, media type and file extension
+EXPORT_FORMATS = {
+    'bin': (binary_export, 'application/octet-stream', 'bin'),
+    'geojson': (geojson_export, 'application/geo+json', 'geojson'),
+    'kml': (kml_export, 'application/vnd.google-earth.kml+xml', 'kml')
+}
+
+
+@ns.route('/<int:id>/export')
+@api.response(404, 'Flightplan not found.')
+class FlightPlanExport(Resource):
+    @api.response(200, 'Success')
+    @api.expect(export_parser)
+    def get(self, id):
+        """
+        Export a FlightPlan for the ground station
+
+        The waypoint columns are read with a single query before the export is streamed. format=bin gives a header
+        (magic ELFP, format version, record size, FlightPlan unique ID, number of waypoints, name), a fixed-width
+        record per waypoint and a CRC32, see app.core.flightplan_export.
+
+        200 Success
+        404 FlightPlan not found
+        :param id: FlightPlan unique Id
+        """
+        args = export_parser.parse_args()
+        export, mimetype, extension = EXPORT_FORMATS[args['format']]
+
+        rows = FlightPlan.query_export(id).all()
+        if len(rows) == 0:
+            abort(404, error='FlightPlan not found')
+
+        # The number of waypoints in the header is the number of records written
+        waypoints = [row[2:] for row in rows if row.number is not None]
+
+        response = Response(stream_with_context(export(rows[0].id, rows[0].name, len(waypoints), waypoints)),
+                            mimetype=mimetype)
+        response.headers['Content-Disposition'] = 'attachment; filename=flightplan-{0}.{1}'.format(id, extension)
+        return response
+
+
+def save_flightplan(preview, builder):
+    """
+    Save a built FlightPlan and its missions
+
+    :param preview: Built FlightPlan
+    :type preview: FlightPlanPreview
+
+    :param builder: Builder options
+    :type builder: FlightPlanBuilder
+
+    :return: Saved FlightPlan
+    :rtype: FlightPlan
+    """
+
+    if FlightPlan.query.filter_by(name=preview.name).first() is not None:
+        raise ValueExist('FlightPlan name already exist')
+
+    fp = FlightPlan(
+        name=preview.name,
+        builder_options=builder,
+        builded=True,
+        distance=preview.distance
+    )
+
+    db.session.add(fp)
+    db.session.flush()
+    fp.insert_waypoints(preview.waypoints)
+    fp.set_missions(preview.missions)
+    db.session.commit()
+
+    return fp
+
+
+def build_flightplan(args):
+    """
+    Build a FlightPlan from a builder request, the FlightPlan and its missions are saved if asked
+
+    :param args: Builder request
+    :type args: dict
+
+    :return: Saved FlightPlan or preview
+    :rtype: FlightPlan|FlightPlanPreview
+    """
+
+    fp_name = args.get('flightplan_name')
+    if FlightPlan.query.filter_by(name=fp_name).first() is not None:
+        abort(409, error='FlightPlan name already exist')
+
+    try:
+        builder = FlightPlanBuilder.from_dict(args)
+
+        flightplan_path = build_flightplan_from_options(builder)
+
+        preview = create_preview(fp_name, flightplan_path, builder)
+
+        if not args.get('save'):
+            return preview
+
+        return save_flightplan(preview, builder)
+    except Exception as e:
+        db.session.rollback()
+        abort(400, error=str(e))
+
+
 @ns.route('/build')
 class FlightBuilder(Resource):
     @api.marshal_with(flightplan_builder_result)
@@ -158,29 +436,76 @@ class FlightBuilder(Resource):
         Build vertical FlightPlan
         """
 
-        try:
-            fp_name = request.json.get('flightplan_name')
-            if FlightPlan.query.filter_by(name=fp_name).first() is not None:
-                abort(409, error='FlightPlan name already exist')
+        return build_flightplan(dict(request.json, type='vertical'))
 
-            builder = FlightPlanBuilder.from_dict(request.json)
 
-            flightplan_path = build_vertical_flightplan_from_options(builder)
+@ns.route('/build/area')
+class AreaFlightBuilder(Resource):
+    @api.marshal_with(flightplan_builder_result)
+    @api.expect(post_area_builder)
+    def post(self):
+        """
+        Build area (lawnmower) FlightPlan
+        """
 
-            fp = FlightPlan(
-                name=fp_name,
-                waypoints=flightplan_path,
-                builder_options=builder,
-                builded = True
-            )
+        return build_flightplan(dict(request.json, type='area'))
 
-            fp.update_informations()
 
-            if request.json.get('save'):
-                db.session.add(fp)
-                AppInformations.update()
-                db.session.commit()
+@ns.route('/build/batch')
+class BatchFlightBuilder(Resource):
+    @api.marshal_with(flightplan_batch_builder_result)
+    @api.expect(post_batch_builder)
+    def post(self):
+        """
+        Build several FlightPlans in parallel
 
-            return fp
-        except Exception as e:
-            abort(400, error=str(e))
+        Each build is previewed or saved on its own, errors are reported per build.
+        """
+
+        builds = request.json.get('builds') or []
+        results = [{'flightplan_name': args.get('flightplan_name')} for args in builds]
+        builders = {}
+
+        for i, args in enumerate(builds):
+            if FlightPlan.query.filter_by(name=args.get('flightplan_name')).first() is not None:
+                results[i]['error'] = 'FlightPlan name already exist'
+                continue
+
+            try:
+                builder = FlightPlanBuilder.from_dict(args)
+                builders[i] = (builder, normalize_options(builder))
+            except (ValueError, TypeError, AttributeError) as e:
+                results[i]['error'] = str(e)
+
+        indexes = sorted(builders.keys())
+        paths = build_flightplans_from_normalized([builders[i][1] for i in indexes])
+
+        for i, flightplan_path in zip(indexes, paths):
+            if isinstance(flightplan_path, Exception):
+                results[i]['error'] = str(flightplan_path)
+                continue
+
+            try:
+                builder = builders[i][0]
+                preview = create_preview(builds[i].get('flightplan_name'), flightplan_path, builder)
+
+                if builds[i].get('save'):
+                    results[i]['flightplan'] = save_flightplan(preview, builder)
+                else:
+                    results[i]['flightplan'] = preview
+            except Exception as e:
+                db.session.rollback()
+                results[i]['error'] = str(e)
+
+        return {'results': results}
+
+
+@ns.route('/build/cache')
+class FlightBuilderCache(Resource):
+    @api.marshal_with(builder_cache_info)
+    def get(self):
+        """
+        Get builder cache statistics
+        """
+
+        return builder_cache.info()
@@ -0,0 +1,123 @@
+from flask import request
+from flask_restplus import abort
+from app.exceptions import ValueExist
+from flask_restplus import Resource
+from app.api.serializers.nofly import nofly_zone_minimal, nofly_zone_put, nofly_zone, nofly_zone_data_wrapper
+from app.api import api
+from app.api.cache import cached_response
+from app.api.serializers.compiler import marshal_compiled
+from app.api.parsers import pagination_parser, fieldset_parser
+from app.api.pagination import paginate
+from app.extensions import db
+from app.models import NoFlyZone
+
+ns = api.namespace('nofly', description='Operations related to no-fly zones.')
+
+
+@ns.route('/')
+class NoFlyZoneCollection(Resource):
+    @cached_response
+    @marshal_compiled(nofly_zone_data_wrapper, sparse=True, collection='zones')
+    @api.expect(pagination_parser)
+    def get(self):
+        """
+        Get NoFlyZone list
+
+        200 Success
+        400 Validation error
+        """
+        args = pagination_parser.parse_args()
+
+        try:
+            zones, next_cursor = paginate(NoFlyZone.query, NoFlyZone, args)
+        except ValueError as e:
+            abort(400, error=str(e))
+
+        return {'zones': zones, 'next_cursor': next_cursor}
+
+    @api.marshal_with(nofly_zone, code=201, description='NoFlyZone successfully created.')
+    @api.doc(responses={
+        409: 'Value Exist',
+        400: 'Validation Error'
+    })
+    @api.expect(nofly_zone_minimal)
+    def post(self):
+        """
+        Add a NoFlyZone
+
+        201 Success
+        409 NoFlyZone name already exist
+        400 Validation error
+        """
+        try:
+            zone = NoFlyZone.from_dict(request.json)
+            db.session.add(zone)
+            db.session.commit()
+
+            return zone, 201
+
+        except ValueExist as e:
+            abort(409, error=str(e))
+        except ValueError as e:
+            abort(400, error=str(e))
+
+
+@ns.route('/<int:id>')
+@api.response(404, 'NoFlyZone not found.')
+class NoFlyZoneItem(Resource):
+    @cached_response
+    @marshal_compiled(nofly_zone, sparse=True)
+    @api.expect(fieldset_parser)
+    def get(self, id):
+        """
+        Get a NoFlyZone
+
+        200 Success
+        404 NoFlyZone not found
+        :param id: NoFlyZone unique Id
+        """
+        return NoFlyZone.query.get_or_404(id)
+
+    @api.response(204, 'NoFlyZone successfully updated.')
+    @api.doc(responses={
+        409: 'Value Exist',
+        400: 'Validation Error'
+    })
+    @api.expect(nofly_zone_put)
+    def put(self, id):
+        """
+        Update a NoFlyZone
+
+        204 Success
+        404 NoFlyZone not found
+        409 Unique value already exist
+        400 Validation error
+        :param id: NoFlyZone unique Id
+        """
+        zone = NoFlyZone.query.get_or_404(id)
+
+        try:
+            zone.update_from_dict(request.json)
+            db.session.commit()
+
+            return 'NoFlyZone successfully updated.', 204
+
+        except ValueExist as e:
+            abort(409, error=str(e))
+        except ValueError as e:
+            abort(400, error=str(e))
+
+    @api.response(204, 'NoFlyZone successfully deleted.')
+    def delete(self, id):
+        """
+        Delete a NoFlyZone
+
+        204 Success
+        404 NoFlyZone not found
+        :param id: NoFlyZone unique Id
+        """
+        zone = NoFlyZone.query.get_or_404(id)
+        zone.deep_delete()
+        db.session.commit()
+
+        return 'NoFlyZone successfully deleted.', 204
@@ -1,32 +1,49 @@
 from flask import request
 from flask_restplus import abort
 from flask_restplus import Resource
-from app.api.parsers import flightplan_parser
+from sqlalchemy.orm import subqueryload
+from app.api.parsers import flightplan_parser, fieldset_parser
 from app.api.serializers.recon import recon_post, recon, recon_data_wrapper, recon_with_resources
 from app.api import api
+from app.api.cache import cached_response
+from app.api.fieldsets import sparse_loading
+from app.api.serializers.compiler import marshal_compiled
+from app.api.pagination import paginate
 from app.extensions import db
-from app.models import Recon, AppInformations
+from app.models import Recon
 
 ns = api.namespace('recons', description='Operations related to recons.')
 
+# Loading plan of recon_with_resources
+recon_with_resources_loading = (
+    subqueryload(Recon.resource_list),
+)
+
 
 @ns.route('/')
 class ReconCollection(Resource):
-    @api.marshal_with(recon_data_wrapper)
+    @cached_response
+    @marshal_compiled(recon_data_wrapper, sparse=True, collection='recons')
     @api.expect(flightplan_parser)
     def get(self):
         """
         Get Recons list
 
         200 Success
+        400 Validation error
         """
         args = flightplan_parser.parse_args()
 
+        query = Recon.query
         if args['flightplan_id'] is not None:
-            result = Recon.query.filter_by(flightplan_id = args['flightplan_id'])
-        else:
-            result = Recon.query.all()
-        return {'recons': result}
+            query = query.filter_by(flightplan_id = args['flightplan_id'])
+
+        try:
+            result, next_cursor = paginate(query, Recon, args)
+        except ValueError as e:
+            abort(400, error=str(e))
+
+        return {'recons': result, 'next_cursor': next_cursor}
 
     @api.marshal_with(recon, code=201, description='Recon successfully created.')
     @api.doc(responses={
@@ -44,7 +61,6 @@ class ReconCollection(Resource):
         try:
             rc = Recon.from_dict(request.json)
             db.session.add(rc)
-            AppInformations.update()
             db.session.commit()
 
             return rc, 201
@@ -56,7 +72,9 @@ class ReconCollection(Resource):
 @ns.route('/<int:id>')
 @api.response(404, 'Recon not found.')
 class ReconItem(Resource):
-    @api.marshal_with(recon_with_resources)
+    @cached_response
+    @marshal_compiled(recon_with_resources, sparse=True)
+    @api.expect(fieldset_parser)
     def get(self, id):
         """
         Get a Recon
@@ -65,7 +83,8 @@ class ReconItem(Resource):
         404 Recon not found
         :param id: Recon unique Id
         """
-        rc = Recon.query.get_or_404(id)
+        rc = Recon.query.options(*sparse_loading(recon_with_resources, Recon, recon_with_resources_loading)) \
+            .get_or_404(id)
         return rc
 
     @api.response(204, 'Recon successfully deleted.')
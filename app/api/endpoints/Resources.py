@@ -4,32 +4,42 @@ from flask import request, send_from_directory
 from flask_restplus import abort
 from flask_restplus import Resource
 from app.exceptions import ValueExist
-from app.api.parsers import upload_parser, recon_parser
+from app.api.parsers import upload_parser, recon_parser, fieldset_parser
 from app.api.serializers.resource import resource_post, resource_data_wrapper, resource
 from app.api import api
+from app.api.cache import cached_response
+from app.api.serializers.compiler import marshal_compiled
+from app.api.pagination import paginate
 from app.extensions import db
-from app.models import AppInformations, ReconResource
+from app.models import ReconResource
 
 ns = api.namespace('resources', description='Operations related to resources.')
 
 
 @ns.route('/')
 class ResourceCollection(Resource):
-    @api.marshal_with(resource_data_wrapper)
+    @cached_response
+    @marshal_compiled(resource_data_wrapper, sparse=True, collection='resources')
     @api.expect(recon_parser)
     def get(self):
         """
         Get Resources list
 
         200 Success
+        400 Validation error
         """
         args = recon_parser.parse_args()
 
+        query = ReconResource.query
         if args['recon_id'] is not None:
-            result = ReconResource.query.filter_by(recon_id=args['recon_id'])
-        else:
-            result = ReconResource.query.all()
-        return {'resources': result}
+            query = query.filter_by(recon_id=args['recon_id'])
+
+        try:
+            result, next_cursor = paginate(query, ReconResource, args)
+        except ValueError as e:
+            abort(400, error=str(e))
+
+        return {'resources': result, 'next_cursor': next_cursor}
 
     @api.marshal_with(resource, code=201, description='Resource successfully created.')
     @api.doc(responses={
@@ -48,7 +58,6 @@ class ResourceCollection(Resource):
         try:
             res = ReconResource.from_dict(request.json)
             db.session.add(res)
-            AppInformations.update()
             db.session.commit()
 
             return res, 201
@@ -60,7 +69,9 @@ class ResourceCollection(Resource):
 @ns.route('/<int:id>')
 @api.response(404, 'Resource not found.')
 class ResourceItem(Resource):
-    @api.marshal_with(resource)
+    @cached_response
+    @marshal_compiled(resource, sparse=True)
+    @api.expect(fieldset_parser)
     def get(self, id):
         """
         Get a Resource
@@ -5,6 +5,10 @@ from flask_restplus import abort
 from flask_restplus import Resource
 from app.api.serializers.analysis import analysis_result_with_resources
 from app.api import api
+from app.api.cache import cached_response
+from app.api.fieldsets import sparse_loading
+from app.api.serializers.compiler import marshal_compiled
+from app.api.parsers import fieldset_parser
 from app.extensions import db
 from app.models import AppInformations, AnalysisResult
 
@@ -14,7 +18,9 @@ ns = api.namespace('results', description='Operations related to analysis result
 @ns.route('/<int:id>')
 @api.response(404, 'AnalysisResult not found.')
 class AnalysisResultItem(Resource):
-    @api.marshal_with(analysis_result_with_resources)
+    @cached_response
+    @marshal_compiled(analysis_result_with_resources, sparse=True)
+    @api.expect(fieldset_parser)
     def get(self, id):
         """
         Get a AnalysisResult
@@ -24,7 +30,8 @@ class AnalysisResultItem(Resource):
         :param id: AnalysisResult unique Id
         """
 
-        res = AnalysisResult.query.get_or_404(id)
+        res = AnalysisResult.query.options(*sparse_loading(analysis_result_with_resources, AnalysisResult, ())) \
+            .get_or_404(id)
         return res
 
 
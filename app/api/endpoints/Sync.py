@@ -0,0 +1,56 @@
+from flask_restplus import abort
+from flask_restplus import Resource
+from config import SYNC_MAX_CHANGES
+from app.api.serializers.sync import sync
+from app.api.parsers import sync_parser
+from app.api import api
+from app.api.serializers.compiler import marshal_compiled
+from app.models import ChangeLog, FlightPlan, Waypoint, Recon, ReconResource, Analysis, AnalysisResult, NoFlyZone
+
+ns = api.namespace('sync', description='Incremental synchronisation.')
+
+# Synchronised entities: response key and mapped class
+SYNC_ENTITIES = [
+    ('flightplans', FlightPlan),
+    ('waypoints', Waypoint),
+    ('recons', Recon),
+    ('resources', ReconResource),
+    ('analysis', Analysis),
+    ('results', AnalysisResult),
+    ('zones', NoFlyZone)
+]
+
+
+@ns.route('/')
+class Sync(Resource):
+
+    @marshal_compiled(sync)
+    @api.expect(sync_parser)
+    def get(self):
+        """
+        Get the entities created, updated or deleted since a version
+
+        At most SYNC_MAX_CHANGES changes are read, the client repeats the request with the returned version
+        until complete is true.
+
+        200 Success
+        400 Validation error
+        """
+        args = sync_parser.parse_args()
+        if args['since'] < 0:
+            abort(400, error='Parameter since have to be positive')
+
+        version, changed, deleted, complete = ChangeLog.changes_since(args['since'], SYNC_MAX_CHANGES)
+
+        result = {'version': version, 'complete': complete, 'deleted': {}}
+        for key, model in SYNC_ENTITIES:
+            ids = changed.get(model.__tablename__, [])
+            rows = model.query.filter(model.id.in_(ids)).order_by(model.id).all() if len(ids) > 0 else []
+
+            # Rows deleted after the version reached are reported as deleted
+            missing = set(ids) - set(row.id for row in rows)
+
+            result[key] = rows
+            result['deleted'][key] = sorted(set(deleted.get(model.__tablename__, [])) | missing)
+
+        return result
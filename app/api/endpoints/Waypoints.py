@@ -1,35 +1,45 @@
 from flask import request
 from flask_restplus import abort
-from app.exceptions import ValueExist
+from app.exceptions import ValueExist, NoFlyZoneViolation
 from flask_restplus import Resource
-from app.api.parsers import flightplan_parser
+from app.api.parsers import flightplan_parser, fieldset_parser
 from app.api.serializers.waypoint import minimal_waypoint, post_waypoint, waypoint, waypoint_data_container
 from app.api import api
+from app.api.cache import cached_response
+from app.api.serializers.compiler import marshal_compiled
+from app.api.pagination import paginate
 from app.extensions import db
-from app.models import Waypoint, AppInformations
+from app.models import Waypoint
 
 ns = api.namespace('waypoints', description='Operations related to waypoints.')
 
 
 @ns.route('/')
 class WaypointCollection(Resource):
-    @api.marshal_with(waypoint_data_container)
+    @cached_response
+    @marshal_compiled(waypoint_data_container, sparse=True, collection='waypoints')
     @api.expect(flightplan_parser)
     def get(self):
         """
         Get Waypoint list
         
         200 Success
+        400 Validation error
         :return: 
         """
 
         args = flightplan_parser.parse_args()
 
+        query = Waypoint.query
         if args['flightplan_id'] is not None:
-            result = Waypoint.query.filter_by(flightplan_id = args['flightplan_id'])
-        else:
-            result = Waypoint.query.all()
-        return {'waypoints': result}
+            query = query.filter_by(flightplan_id = args['flightplan_id'])
+
+        try:
+            result, next_cursor = paginate(query, Waypoint, args)
+        except ValueError as e:
+            abort(400, error=str(e))
+
+        return {'waypoints': result, 'next_cursor': next_cursor}
 
     @api.marshal_with(waypoint, code=201, description='Waypoint successfully created.')
     @api.doc(responses={
@@ -43,20 +53,21 @@ class WaypointCollection(Resource):
 
         201 Success
         409 Unique value already exist
-        400 Validation error
+        400 Validation error, or a leg to the waypoint crosses a NoFlyZone
         :return: 
         """
         try:
             wp = Waypoint.from_dict(request.json)
             wp.flightplan.delete_builder_options()
             db.session.add(wp)
-            AppInformations.update()
             db.session.commit()
 
             return wp, 201
 
         except ValueExist as e:
             abort(409, error=str(e))
+        except NoFlyZoneViolation as e:
+            abort(400, error=str(e), violations=e.violations)
         except ValueError as e:
             abort(400, error=str(e))
 
@@ -64,7 +75,9 @@ class WaypointCollection(Resource):
 @ns.route('/<int:id>')
 @api.response(404, 'Waypoint not found.')
 class WaypointItem(Resource):
-    @api.marshal_with(waypoint)
+    @cached_response
+    @marshal_compiled(waypoint, sparse=True)
+    @api.expect(fieldset_parser)
     def get(self, id):
         """
         Get a Waypoint
@@ -89,7 +102,7 @@ class WaypointItem(Resource):
         204 Success
         404 Waypoint not found
         409 Unique value already exist
-        400 Validation error
+        400 Validation error, or a leg to the waypoint crosses a NoFlyZone
         :param id: Waypoint unique Id
         """
         wp = Waypoint.query.get_or_404(id)
@@ -102,6 +115,8 @@ class WaypointItem(Resource):
 
         except ValueExist as e:
             abort(409, error=str(e))
+        except NoFlyZoneViolation as e:
+            abort(400, error=str(e), violations=e.violations)
         except ValueError as e:
             abort(400, error=str(e))
 
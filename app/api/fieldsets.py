@@ -0,0 +1,236 @@
+import copy
+from flask_restplus import Model, fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, subqueryload
+from config import FIELDSET_CACHE_SIZE
+from app.core.cache import LRUCache
+from app.api.parsers import fieldset_parser
+
+# Models trimmed to the requested fields, by model, collection key and fieldset
+sparse_models = LRUCache(FIELDSET_CACHE_SIZE)
+
+
+def parse_fieldset(value):
+    """
+    Parse a list of field names, a dotted name selects a field of a nested object
+
+    :param value: Comma separated names (id,name,waypoints.number)
+    :type value: str|None
+
+    :return: Tree of the names, True for a field selected in full, None without names
+    :rtype: dict|None
+    """
+    if value is None or value.strip() == '':
+        return None
+
+    tree = {}
+    for name in value.split(','):
+        if name.strip() == '':
+            continue
+
+        node = tree
+        keys = [key.strip() for key in name.split('.')]
+        for key in keys[:-1]:
+            child = node.get(key)
+            if child is True:
+                break
+            if child is None:
+                child = node[key] = {}
+            node = child
+        else:
+            node[keys[-1]] = True
+
+    return tree
+
+
+def nested_model(field):
+    """
+    Return the model of a Nested field or of a List of Nested
+
+    :param field: Field
+    :type field: flask_restplus.fields.Raw
+
+    :return: Model, None for the other fields
+    :rtype: flask_restplus.Model|None
+    """
+    if isinstance(field, fields.List):
+        field = field.container
+
+    if isinstance(field, fields.Nested):
+        return field.model
+
+    return None
+
+
+def with_model(field, model):
+    """
+    Return a copy of a Nested field or of a List of Nested that outputs another model
+
+    :param field: Field
+    :type field: flask_restplus.fields.Raw
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :return: Field
+    :rtype: flask_restplus.fields.Raw
+    """
+    field = copy.copy(field)
+
+    if isinstance(field, fields.List):
+        field.container = with_model(field.container, model)
+    else:
+        field.model = model
+
+    return field
+
+
+def trim_model(model, selected, expanded):
+    """
+    Derive the model of the requested fields
+
+    The plain fields are kept if no field is selected or if they are selected. The nested objects are kept if they
+    are selected or expanded: in full if selected by their name, else trimmed the same way.
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :param selected: Tree of the selected fields, None to select the plain fields
+    :type selected: dict|None
+
+    :param expanded: Tree of the expanded nested objects
+    :type expanded: dict|None
+
+    :return: Trimmed model
+    :rtype: flask_restplus.Model
+    :raise ValueError: Si un champ demande n'existe pas dans le modele
+    """
+    resolved = getattr(model, 'resolved', model)
+
+    for name in list((selected or {}).keys()) + list((expanded or {}).keys()):
+        if name not in resolved:
+            raise ValueError('Unknown field: ' + name)
+
+    trimmed = Model(getattr(model, 'name', 'Model') + ' Sparse')
+
+    for key, field in resolved.items():
+        nested = nested_model(field)
+
+        if nested is None:
+            if expanded is not None and key in expanded:
+                raise ValueError('Not a nested field: ' + key)
+            if selected is None or key in selected:
+                trimmed[key] = field
+            continue
+
+        sub_selected = selected.get(key) if selected is not None else None
+        sub_expanded = expanded.get(key) if expanded is not None else None
+
+        if sub_selected is None and sub_expanded is None:
+            continue
+
+        if sub_selected is True or sub_expanded is True:
+            trimmed[key] = field
+        else:
+            trimmed[key] = with_model(field, trim_model(nested, sub_selected, sub_expanded))
+
+    return trimmed
+
+
+def sparse_model(model, collection=None):
+    """
+    Return the model of the fields requested by the fields and expand arguments of the request
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :param collection: Key of the items of a collection model, the fields apply to the items
+    :type collection: str
+
+    :return: Model, the given model if no field is requested
+    :rtype: flask_restplus.Model
+    :raise ValueError: Si un champ demande n'existe pas dans le modele
+    """
+    args = fieldset_parser.parse_args()
+
+    if not args['fields'] and not args['expand']:
+        return model
+
+    key = (id(model), collection, args['fields'], args['expand'])
+    trimmed = sparse_models.get(key)
+
+    if trimmed is None:
+        selected = parse_fieldset(args['fields'])
+        expanded = parse_fieldset(args['expand'])
+
+        if collection is None:
+            trimmed = trim_model(model, selected, expanded)
+        else:
+            resolved = model.resolved
+            items = resolved[collection]
+
+            trimmed = Model(model.name + ' Sparse', resolved)
+            trimmed[collection] = with_model(items, trim_model(nested_model(items), selected, expanded))
+
+        sparse_models.set(key, trimmed)
+
+    return trimmed
+
+
+def loading_plan(model, mapped_class, parent=None):
+    """
+    Derive the loading options of the relationships output by a model
+
+    The single objects are joined, the collections are loaded by a query per level.
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :param mapped_class: Mapped class of the objects
+    :param parent: Loading option of the objects, None for the queried objects
+
+    :return: Loading options
+    :rtype: list
+    """
+    mapper = inspect(mapped_class)
+    options = []
+
+    for key, field in getattr(model, 'resolved', model).items():
+        nested = nested_model(field)
+        attribute = key if field.attribute is None else field.attribute
+
+        if nested is None or attribute not in mapper.relationships:
+            continue
+
+        relationship = mapper.relationships[attribute]
+        loader, name = (subqueryload, 'subqueryload') if relationship.uselist else (joinedload, 'joinedload')
+
+        option = (loader if parent is None else getattr(parent, name))(getattr(mapped_class, attribute))
+
+        options.append(option)
+        options.extend(loading_plan(nested, relationship.mapper.class_, option))
+
+    return options
+
+
+def sparse_loading(model, mapped_class, loading):
+    """
+    Return the loading options of the fields requested by the fields and expand arguments of the request
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :param mapped_class: Mapped class of the objects
+
+    :param loading: Loading options of the whole model
+    :type loading: tuple
+
+    :return: Loading options, only the requested relationships are loaded
+    :rtype: tuple|list
+    """
+    requested = sparse_model(model)
+
+    if requested is model:
+        return loading
+
+    return loading_plan(requested, mapped_class)
@@ -0,0 +1,45 @@
+from config import PAGE_DEFAULT_SIZE, PAGE_MAX_SIZE
+
+
+def paginate(query, model, args):
+    """
+    Return a page of a query, with keyset pagination on the unique ID
+
+    The page is read by a bounded range scan of the primary key (id > cursor), whatever the size of the table.
+
+    :param query: Query of the collection, with its filters
+    :type query: sqlalchemy.orm.Query
+
+    :param model: Mapped class of the collection, with id and created_on columns
+
+    :param args: Arguments parsed by pagination_parser (cursor, limit, created_after, created_before)
+    :type args: dict
+
+    :return: Items of the page and cursor of the next page, None on the last page
+    :rtype: tuple
+
+    :raise ValueError: Si limit < 1 ou limit > PAGE_MAX_SIZE
+    """
+    limit = args.get('limit')
+    if limit is None:
+        limit = PAGE_DEFAULT_SIZE
+
+    if limit < 1 or limit > PAGE_MAX_SIZE:
+        raise ValueError('Parameter limit have to be between 1 and ' + str(PAGE_MAX_SIZE))
+
+    if args.get('cursor') is not None:
+        query = query.filter(model.id > args.get('cursor'))
+
+    if args.get('created_after') is not None:
+        query = query.filter(model.created_on >= args.get('created_after'))
+
+    if args.get('created_before') is not None:
+        query = query.filter(model.created_on < args.get('created_before'))
+
+    # One more item tells if there is a next page
+    items = query.order_by(model.id).limit(limit + 1).all()
+
+    if len(items) > limit:
+        return items[:limit], items[limit - 1].id
+
+    return items, None
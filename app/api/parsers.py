@@ -1,11 +1,31 @@
 from werkzeug.datastructures import FileStorage
+from flask_restplus import inputs
 from app.api import api
 
 upload_parser = api.parser()
 upload_parser.add_argument('file', location='files', type=FileStorage, required=True)
 
-flightplan_parser = api.parser()
+fieldset_parser = api.parser()
+fieldset_parser.add_argument('fields', required=False, location='args', help='Fields to return, comma separated, a dotted name selects a field of a nested object (waypoints.number)')
+fieldset_parser.add_argument('expand', required=False, location='args', help='Nested objects to return in full with the fields, comma separated (recons.resources)')
+
+pagination_parser = fieldset_parser.copy()
+pagination_parser.add_argument('cursor', required=False, type=int, help='Return the items after this unique ID (next_cursor of the previous page)')
+pagination_parser.add_argument('limit', required=False, type=int, help='Maximum number of items')
+pagination_parser.add_argument('created_after', required=False, type=inputs.datetime_from_iso8601, help='Minimum creation datetime (iso8601)')
+pagination_parser.add_argument('created_before', required=False, type=inputs.datetime_from_iso8601, help='Maximum creation datetime, excluded (iso8601)')
+
+flightplan_parser = pagination_parser.copy()
 flightplan_parser.add_argument('flightplan_id', required=False, type=int, help='FlightPlan unique ID')
 
-recon_parser = api.parser()
-recon_parser.add_argument('recon_id', required=False, type=int, help='Recon unique ID')
\ No newline at end of file
+recon_parser = pagination_parser.copy()
+recon_parser.add_argument('recon_id', required=False, type=int, help='Recon unique ID')
+
+analysis_parser = pagination_parser.copy()
+analysis_parser.add_argument('state', required=False, choices=('pending', 'progress', 'complete', 'error'), help='State of Analysis')
+
+export_parser = api.parser()
+export_parser.add_argument('format', required=False, location='args', default='bin', choices=('bin', 'geojson', 'kml'), help='Export format: packed binary records, GeoJSON or KML')
+
+sync_parser = api.parser()
+sync_parser.add_argument('since', required=True, type=int, help='Version known by the client (version of /infos/ after a full download)')
@@ -2,9 +2,14 @@ from flask_restplus import fields
 from app.api import api
 
 app_informations = api.model('AppInformations', {
+    'version' : fields.Integer(required = True, description = 'Version of the data, unique ID of the last change'),
     'updated_on' : fields.DateTime(dt_format='iso8601', required = True, description = 'DatetTime of last App update (iso8601)'),
 })
 
+page = api.model('Page', {
+    'next_cursor' : fields.Integer(description = 'Cursor of the next page, null on the last page')
+})
+
 minimal_gpscoord = api.model('MinimalGPSCoord', {
     'lat' : fields.Float(required = True, description = 'Latitute of GPSCoord ([-90, 90])', min = -90, max = 90),
     'lon' : fields.Float(required = True, description = 'Longitude of GPSCoord ([-180, 180])', min = -180, max = 180),
@@ -1,5 +1,6 @@
 from flask_restplus import fields
 from app.api import api
+from app.api.serializers import page
 from app.api.serializers.recon import recon, recon_with_resources, resource
 
 analysis_result = api.model('AnalysisResult', {
@@ -40,9 +41,9 @@ analysis_with_recon = api.inherit('Analysis WithRecon', analysis_base, {
 })
 
 analysis_with_result = api.inherit('Analysis WithResults', analysis_base, {
-    'results' : fields.List(fields.Nested(analysis_result_with_resources), description='List of results')
+    'results' : fields.List(fields.Nested(analysis_result_with_resources), attribute = 'result_list', description='List of results')
 })
 
-analysis_data_container = api.model('Analysis DataContainer', {
+analysis_data_container = api.inherit('Analysis DataContainer', page, {
     'analysis': fields.List(fields.Nested(analysis_with_recon), required=True, description='List of analysis')
 })
@@ -9,11 +9,62 @@ vertical_builder_options = api.model('VerticalBuilderOptions', {
     'alt_end' : fields.Float(required = True, description = 'End altitude of FlightPlan (m) ([alt_start, [)', min = 0, exclusiveMin=True),
     'h_increment' : fields.Float(required = True, description = 'Horizontal Increment (m) (]0, [)', min = 0, exclusiveMin=True),
     'v_increment' : fields.Float(required = True, description = 'Vertical Increment (m) (]0, [)', min = 0, exclusiveMin=True),
+    'terrain_following' : fields.Boolean(required = False, description = 'Altitudes are heights above the ground', default = False),
     'd_rotation' : fields.Float(required = False, description = 'Drone rotation (°) ([-180, 180])', min=-180, max=180, default=0),
     'd_gimbal' : fields.Nested(gimbal, required = False, description = 'Drone Gimbal parameters')
 })
 
+area_builder_options = api.model('AreaBuilderOptions', {
+    'polygon' : fields.List(fields.Nested(minimal_gpscoord), required = True, description = 'Vertices of the area to cover (3 minimum)'),
+    'altitude' : fields.Float(required = True, description = 'Altitude of FlightPlan (m) (]0, [)', min = 0, exclusiveMin=True),
+    'front_overlap' : fields.Float(required = False, description = 'Overlap between 2 photos of a line ([0, 1[)', min = 0, max = 1, exclusiveMax=True, default = 0.7),
+    'side_overlap' : fields.Float(required = False, description = 'Overlap between 2 lines ([0, 1[)', min = 0, max = 1, exclusiveMax=True, default = 0.6),
+    'angle' : fields.Float(required = False, description = 'Direction of the lines (° from north) ([-180, 180])', min=-180, max=180, default=0),
+    'terrain_following' : fields.Boolean(required = False, description = 'Altitudes are heights above the ground', default = False),
+    'd_rotation' : fields.Float(required = False, description = 'Drone rotation (°) ([-180, 180])', min=-180, max=180, default=0),
+    'd_gimbal' : fields.Nested(gimbal, required = False, description = 'Drone Gimbal parameters')
+})
+
+builder_options = api.model('BuilderOptions', {
+    'type' : fields.String(required = False, description = 'Builder type', enum = ['vertical', 'area'], default = 'vertical'),
+    'coord1' : fields.Nested(minimal_gpscoord, allow_null = True, description='GPS coord1 (vertical)'),
+    'coord2' : fields.Nested(minimal_gpscoord, allow_null = True, description='GPS coord2 (vertical)'),
+    'alt_start' : fields.Float(description = 'Start altitude of FlightPlan (m) (vertical)'),
+    'alt_end' : fields.Float(description = 'End altitude of FlightPlan (m) (vertical)'),
+    'h_increment' : fields.Float(description = 'Horizontal Increment (m) (vertical)'),
+    'v_increment' : fields.Float(description = 'Vertical Increment (m) (vertical)'),
+    'polygon' : fields.List(fields.Nested(minimal_gpscoord), attribute = 'polygon_coords', description = 'Vertices of the area to cover (area)'),
+    'altitude' : fields.Float(description = 'Altitude of FlightPlan (m) (area)'),
+    'front_overlap' : fields.Float(description = 'Overlap between 2 photos of a line (area)'),
+    'side_overlap' : fields.Float(description = 'Overlap between 2 lines (area)'),
+    'angle' : fields.Float(description = 'Direction of the lines (° from north) (area)'),
+    'terrain_following' : fields.Boolean(description = 'Altitudes are heights above the ground'),
+    'd_rotation' : fields.Float(description = 'Drone rotation (°) ([-180, 180])', min=-180, max=180),
+    'd_gimbal' : fields.Nested(gimbal, description = 'Drone Gimbal parameters')
+})
+
+post_builder = api.inherit('BuilderParams', builder_options, {
+    'flightplan_name' : fields.String(required = True, description = 'FlightPlan name'),
+    'save' :fields.Boolean(required=False, description='Auto save the builded FlightPlan', default=False)
+})
+
+post_batch_builder = api.model('BatchBuilderParams', {
+    'builds' : fields.List(fields.Nested(post_builder), required = True, description = 'Builder params of each FlightPlan')
+})
+
+post_area_builder = api.inherit('AreaBuilderParams', area_builder_options, {
+    'flightplan_name' : fields.String(required = True, description = 'FlightPlan name'),
+    'save' :fields.Boolean(required=False, description='Auto save the builded FlightPlan', default=False)
+})
+
 post_vertical_builder = api.inherit('VerticalBuilderParams', vertical_builder_options, {
     'flightplan_name' : fields.String(required = True, description = 'FlightPlan name'),
     'save' :fields.Boolean(required=False, description='Auto save the builded FlightPlan', default=False)
 })
+
+builder_cache_info = api.model('BuilderCacheInfo', {
+    'hits' : fields.Integer(description = 'Number of builds found in cache'),
+    'misses' : fields.Integer(description = 'Number of builds not found in cache'),
+    'size' : fields.Integer(description = 'Number of cached builds'),
+    'max_size' : fields.Integer(description = 'Maximum number of cached builds')
+})
@@ -0,0 +1,252 @@
+from datetime import datetime
+from functools import wraps
+from flask import request, current_app
+from flask_restplus import fields, marshal, abort
+from app.api import api
+from app.api.fieldsets import sparse_model
+
+# Conversion of the values of the simple field types
+SCALAR_FORMATS = {
+    fields.Raw: '{0}',
+    fields.Integer: 'int({0})',
+    fields.Float: 'float({0})',
+    fields.String: 'str({0})'
+}
+
+
+def none_value(field):
+    """
+    Return the output of a field for a None value, as flask_restplus.fields.Raw.output
+
+    :param field: Field
+    :type field: flask_restplus.fields.Raw
+
+    :return: Output value
+    """
+    default = field.default
+    return field.format(default) if default else default
+
+
+class SerializerBuilder(object):
+    """
+    Source code of a serializer function, the fields and the constants it uses are given by name
+    """
+
+    def __init__(self):
+        self.names = {'marshal': marshal, 'datetime': datetime}
+        self.lines = []
+
+    def bind(self, value):
+        """
+        Give a name to a value used by the function
+
+        :param value: Value
+        :return: Name of the value
+        :rtype: str
+        """
+        name = '_' + str(len(self.names))
+        self.names[name] = value
+        return name
+
+    def value(self, field, expression):
+        """
+        Return the expression of the output of a field for a value, None if the field is not specialised
+
+        :param field: Field
+        :type field: flask_restplus.fields.Raw
+
+        :param expression: Expression of the value, evaluated once
+        :type expression: str
+
+        :return: Expression of the output
+        :rtype: str|None
+        """
+        if field.mask is not None or callable(field.default):
+            return None
+
+        field_type = type(field)
+
+        if field_type in SCALAR_FORMATS:
+            return '{0} if {1} is None else {2}'.format(
+                self.bind(none_value(field)), expression, SCALAR_FORMATS[field_type].format(expression))
+
+        if field_type is fields.Boolean or field_type is fields.DateTime:
+            if field_type is fields.DateTime and field.dt_format == 'iso8601':
+                # Datetimes skip the parsing step of DateTime.format
+                formatted = '{1}.format_iso8601({0}) if type({0}) is datetime else {1}.format({0})'.format(
+                    expression, self.bind(field))
+            else:
+                formatted = '{1}.format({0})'.format(expression, self.bind(field))
+
+            return '{0} if {1} is None else ({2})'.format(self.bind(none_value(field)), expression, formatted)
+
+        if field_type is fields.Nested and not getattr(field, 'skip_none', False):
+            if field.allow_null:
+                null = 'None'
+            elif field.default is not None:
+                null = self.bind(field.default)
+            else:
+                # Marshalling None outputs the fields of the model with their None value
+                null = self.bind(compile_model(field.model)) + '(None)'
+
+            return '{0} if {1} is None else {2}({1})'.format(null, expression, self.bind(compile_model(field.model)))
+
+        return None
+
+    def add_field(self, key, field):
+        """
+        Add the output of a field of the model
+
+        :param key: Key of the field
+        :type key: str
+
+        :param field: Field
+        :type field: flask_restplus.fields.Raw
+        """
+        attribute = key if field.attribute is None else field.attribute
+        generic = "out[{0!r}] = {1}.output({0!r}, obj)".format(key, self.bind(field))
+
+        if not isinstance(attribute, str) or '.' in attribute:
+            self.lines.append(generic)
+            return
+
+        self.lines.append('v = getattr(obj, {0!r}, None)'.format(attribute))
+
+        if type(field) is fields.List and field.mask is None:
+            item = self.value(field.container, 'x')
+            if item is not None:
+                self.lines.extend([
+                    'if isinstance(v, (list, tuple)):',
+                    '    out[{0!r}] = [{1} for x in v]'.format(key, item),
+                    'elif v is None:',
+                    '    out[{0!r}] = {1}._v("default")'.format(key, self.bind(field)),
+                    'else:',
+                    '    ' + generic
+                ])
+                return
+
+        output = self.value(field, 'v')
+        self.lines.append(generic if output is None else 'out[{0!r}] = {1}'.format(key, output))
+
+    def build(self, model):
+        """
+        Compile the serializer function of a model
+
+        :param model: Model
+        :type model: flask_restplus.Model
+
+        :return: Function (object) -> dict
+        :rtype: function
+        """
+        resolved = getattr(model, 'resolved', model)
+        model_name = self.bind(model)
+
+        for key, field in resolved.items():
+            self.add_field(key, field)
+
+        source = '\n    '.join(
+            ['def serialize(obj):',
+             'if isinstance(obj, dict):',
+             '    return marshal(obj, {0})'.format(model_name),
+             'out = {}'] +
+            self.lines +
+            ['return out']
+        )
+
+        exec(compile(source, '<serializer {0}>'.format(getattr(model, 'name', 'model')), 'exec'), self.names)
+        return self.names['serialize']
+
+
+def compile_model(model):
+    """
+    Return the serializer function of an api.model, compiled on first use
+
+    The function gives the output of flask_restplus.marshal for an object, the fields of the model are read once
+    at compile time instead of for every object. Dictionaries and the fields that are not specialised (dotted or
+    callable attribute, mask, other field types) use the flask_restplus implementation.
+
+    The function is kept by the model, it is released with the models derived per request (sparse fieldsets).
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :return: Function (object) -> dict
+    :rtype: function
+    """
+    serializer = getattr(model, 'compiled_serializer', None)
+
+    if serializer is None:
+        serializer = SerializerBuilder().build(model)
+        model.compiled_serializer = serializer
+
+    return serializer
+
+
+def serialize(data, model):
+    """
+    Serialize an object or a list of objects with the compiled serializer of a model
+
+    :param data: Object or list of objects
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :return: Serialized data
+    :rtype: dict|list[dict]
+    """
+    serializer = compile_model(model)
+
+    if isinstance(data, (list, tuple)):
+        return [serializer(item) for item in data]
+
+    return serializer(data)
+
+
+def marshal_compiled(model, code=200, description=None, sparse=False, collection=None):
+    """
+    Decorator equivalent to api.marshal_with, the response is serialized with the compiled serializer of the model
+
+    The response is documented with the same model. A request with a field mask (X-Fields header) is marshalled by
+    flask_restplus.
+
+    :param model: Model
+    :type model: flask_restplus.Model
+
+    :param code: Status code of the documented response
+    :type code: int
+
+    :param description: Description of the documented response
+    :type description: str
+
+    :param sparse: Output only the fields requested by the fields and expand arguments (sparse fieldsets)
+    :type sparse: bool
+
+    :param collection: Key of the items of a collection model, the requested fields apply to the items
+    :type collection: str
+    """
+    compile_model(model)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            requested = model
+            if sparse:
+                try:
+                    requested = sparse_model(model, collection)
+                except ValueError as e:
+                    abort(400, error=str(e))
+
+            response = func(*args, **kwargs)
+            data, rest = (response[0], response[1:]) if isinstance(response, tuple) else (response, ())
+
+            mask = request.headers.get(current_app.config.get('RESTPLUS_MASK_HEADER', 'X-Fields'))
+            if mask:
+                data = marshal(data, requested, mask=mask)
+            else:
+                data = serialize(data, requested)
+
+            return (data,) + rest if len(rest) > 0 else data
+
+        return api.response(code, description or 'Success', model)(wrapper)
+
+    return decorator
@@ -1,8 +1,10 @@
 from flask_restplus import fields
 from app.api import api
+from app.api.serializers import page
 from app.api.serializers.waypoint import waypoint_in_flightplan
-from app.api.serializers.builder import vertical_builder_options
+from app.api.serializers.builder import builder_options
 from app.api.serializers.recon import recon_with_resources
+from app.api.serializers.nofly import nofly_violation
 
 flightplan_minimal = api.model('FlightPlan Minimal', {
     'name' : fields.String(required = True, description = 'Flightplan name', min_length = 3, max_length = 64),
@@ -11,32 +13,75 @@ flightplan_minimal = api.model('FlightPlan Minimal', {
 
 flightplan_put = api.model('FlightPlan Put', {
     'name' : fields.String(description = 'Flightplan name', min_length = 3, max_length = 64),
-    'builder_options' : fields.Nested(vertical_builder_options, description="Build otions for update")
+    'builder_options' : fields.Nested(builder_options, description="Build otions for update")
 })
 
 flightplan = api.inherit('FlightPlan', flightplan_minimal, {
     'id' : fields.Integer(required = True, description="FlightPlan unique ID"),
     'updated_on' : fields.DateTime(dt_format='iso8601', required = False, description = 'DateTime of last FlightPlan update (iso8601)'),
     'builded':fields.Boolean(required=False, description='Indicate if the FlightPlan is builded'),
-    'waypoints_count' : fields.Integer(attribute=lambda x: x.waypoints.count()),
-    'recons_count' : fields.Integer(attribute=lambda x: x.recons.count()),
+    'waypoints_count' : fields.Integer(description='Number of waypoints'),
+    'recons_count' : fields.Integer(description='Number of recons'),
     'distance' : fields.Float(required = False, description = 'FlightPlan distance (km)'),
+    'parent_id' : fields.Integer(required = False, description = 'Unique ID of the first mission if the FlightPlan was split'),
+    'mission_number' : fields.Integer(required = False, description = 'Mission number in the split FlightPlan (from 0)'),
 })
 
 flightplan_with_waypoints = api.inherit('FlightPlan WithWaypoints', flightplan, {
     'waypoints' : fields.List(fields.Nested(waypoint_in_flightplan), description = 'Waypoint list of Flighplan')
 })
 
+flightplan_coverage_views = api.model('FlightPlan CoverageViews', {
+    'views' : fields.Integer(description = 'Number of photos'),
+    'area' : fields.Float(description = 'Ground area seen by this number of photos (m²)')
+})
+
+flightplan_coverage_gap = api.model('FlightPlan CoverageGap', {
+    'lat' : fields.Float(description = 'Latitude of the gap center'),
+    'lon' : fields.Float(description = 'Longitude of the gap center'),
+    'area' : fields.Float(description = 'Area of the gap (m²)')
+})
+
+flightplan_coverage = api.model('FlightPlan Coverage', {
+    'cell_size' : fields.Float(description = 'Size of the analysis grid cells (m)'),
+    'photos' : fields.Integer(description = 'Number of analysed photos'),
+    'ignored_photos' : fields.Integer(description = 'Number of photos too oblique to be analysed'),
+    'min_views' : fields.Integer(description = 'Number of photos needed by the change analysis'),
+    'covered_area' : fields.Float(description = 'Ground area seen by at least 1 photo (m²)'),
+    'target_area' : fields.Float(description = 'Area to cover, the builder polygon or the covered area (m²)'),
+    'target_coverage' : fields.Float(description = 'Part of the target seen by at least 1 photo ([0, 1])'),
+    'target_overlap' : fields.Float(description = 'Part of the target seen by at least min_views photos ([0, 1])'),
+    'mean_views' : fields.Float(description = 'Average number of photos of a covered point'),
+    'max_views' : fields.Integer(description = 'Maximum number of photos of a point'),
+    'histogram' : fields.List(fields.Nested(flightplan_coverage_views), description = 'Covered area by number of photos'),
+    'gap_area' : fields.Float(description = 'Area of the target seen by less than min_views photos (m²)'),
+    'gaps' : fields.List(fields.Nested(flightplan_coverage_gap), description = 'Largest gaps')
+})
+
 flightplan_builder_result = api.inherit('FlightPlan BuilderResult', flightplan_with_waypoints, {
-    'builder_options' : fields.Nested(vertical_builder_options, description='Builder options if builded', default=None)
+    'builder_options' : fields.Nested(builder_options, description='Builder options if builded', default=None),
+    'missions' : fields.List(fields.Nested(flightplan_with_waypoints), description='Following missions if the path exceed the drone limit'),
+    'violations' : fields.List(fields.Nested(nofly_violation), description='Legs of the missions that cross a NoFlyZone'),
+    'coverage' : fields.Nested(flightplan_coverage, allow_null=True, description='Ground coverage of the missions')
 })
 
-flightplan_complete = api.inherit('FlightPlan Complete', flightplan_with_waypoints, {
-    'recons' : fields.List(fields.Nested(recon_with_resources), description='Recons list of FlightPlan')
+flightplan_complete = api.inherit('FlightPlan Complete', flightplan, {
+    'waypoints' : fields.List(fields.Nested(waypoint_in_flightplan), attribute = 'waypoint_list', description = 'Waypoint list of Flighplan'),
+    'recons' : fields.List(fields.Nested(recon_with_resources), attribute = 'recon_list', description='Recons list of FlightPlan')
 })
 
 flightplan_complete_with_builder = api.inherit('FlightPlan Complete WithBuilder', flightplan_complete, {
-    'builder_options' : fields.Nested(vertical_builder_options, description='Builder options if builded', default=None)
+    'builder_options' : fields.Nested(builder_options, description='Builder options if builded', default=None)
+})
+
+flightplan_batch_builder_item = api.model('FlightPlan BatchBuilderItem', {
+    'flightplan_name' : fields.String(description = 'FlightPlan name'),
+    'error' : fields.String(description = 'Error message if the FlightPlan could not be built or saved'),
+    'flightplan' : fields.Nested(flightplan_builder_result, allow_null = True, description = 'Built FlightPlan')
+})
+
+flightplan_batch_builder_result = api.model('FlightPlan BatchBuilderResult', {
+    'results' : fields.List(fields.Nested(flightplan_batch_builder_item), description = 'Result of each build, in request order')
 })
 
 
@@ -44,6 +89,11 @@ flightplan_dump_data_wrapper = api.model('FlightPlan DumpDataWrapper', {
     'flightplans': fields.List(fields.Nested(flightplan_complete_with_builder), description='List of FlightPlans')
 })
 
-flightplan_data_wrapper = api.model('FlightPlan DataWrapper', {
+flightplan_data_wrapper = api.inherit('FlightPlan DataWrapper', page, {
     'flightplans': fields.List(fields.Nested(flightplan))
 })
+
+flightplan_optimize_result = api.model('FlightPlan OptimizeResult', {
+    'distance_before' : fields.Float(description = 'FlightPlan distance before optimisation'),
+    'distance_after' : fields.Float(description = 'FlightPlan distance after optimisation'),
+})
@@ -0,0 +1,34 @@
+from flask_restplus import fields
+from app.api import api
+from app.api.serializers import minimal_gpscoord, page
+
+nofly_zone_minimal = api.model('NoFlyZone Minimal', {
+    'name' : fields.String(required = True, description = 'NoFlyZone name', min_length = 3, max_length = 64),
+    'polygon' : fields.List(fields.Nested(minimal_gpscoord), required = True, attribute = 'polygon_coords', description = 'Vertices of the zone (3 minimum)')
+})
+
+nofly_zone_put = api.model('NoFlyZone Put', {
+    'name' : fields.String(description = 'NoFlyZone name', min_length = 3, max_length = 64),
+    'polygon' : fields.List(fields.Nested(minimal_gpscoord), description = 'Vertices of the zone (3 minimum)')
+})
+
+nofly_zone = api.inherit('NoFlyZone', nofly_zone_minimal, {
+    'id' : fields.Integer(required = True, description = 'NoFlyZone unique ID'),
+    'created_on' : fields.DateTime(dt_format='iso8601', description = 'Datetime of NoFlyZone creation (iso8601)'),
+    'updated_on' : fields.DateTime(dt_format='iso8601', description = 'Datetime of last NoFlyZone update (iso8601)')
+})
+
+nofly_zone_data_wrapper = api.inherit('NoFlyZone DataWrapper', page, {
+    'zones' : fields.List(fields.Nested(nofly_zone), description = 'List of NoFlyZones')
+})
+
+nofly_violation = api.model('NoFlyZone Violation', {
+    'zone_id' : fields.Integer(description = 'Unique ID of the crossed NoFlyZone'),
+    'zone_name' : fields.String(description = 'Name of the crossed NoFlyZone'),
+    'mission_number' : fields.Integer(description = 'Mission number of the leg'),
+    'waypoint_number' : fields.Integer(description = 'Number of the waypoint at the start of the leg')
+})
+
+nofly_violation_data_wrapper = api.model('NoFlyZone ViolationDataWrapper', {
+    'violations' : fields.List(fields.Nested(nofly_violation), description = 'Legs that cross a NoFlyZone')
+})
@@ -1,5 +1,6 @@
 from flask_restplus import fields
 from app.api import api
+from app.api.serializers import page
 from app.api.serializers.resource import resource
 
 recon_post = api.model('ReconPost', {
@@ -9,13 +10,13 @@ recon_post = api.model('ReconPost', {
 
 recon = api.inherit('Recon', recon_post, {
     'id' : fields.Integer(required=True, description='Recon unique ID'),
-    'resources_count' : fields.Integer(attribute=lambda x: x.resources.count() if (x is not None) else None),
+    'resources_count' : fields.Integer(description='Number of resources'),
 })
 
 recon_with_resources = api.inherit('ReconWithResources', recon, {
-    'resources' : fields.List(fields.Nested(resource), description="Recon Resources list")
+    'resources' : fields.List(fields.Nested(resource), attribute = 'resource_list', description="Recon Resources list")
 })
 
-recon_data_wrapper = api.model('ReconDataWrapper', {
+recon_data_wrapper = api.inherit('ReconDataWrapper', page, {
     'recons' : fields.List(fields.Nested(recon), description='List of Recons')
 })
@@ -1,6 +1,6 @@
 from flask_restplus import fields
 from app.api import api
-from app.api.serializers import droneparameters
+from app.api.serializers import droneparameters, page
 
 resource_post = api.model('ResourcePost', {
     'recon_id' : fields.Integer(required=True, description='Recon unique ID'),
@@ -15,6 +15,6 @@ resource = api.inherit('Resource', resource_post, {
 })
 
 
-resource_data_wrapper = api.model('ResourceDataWrapper', {
+resource_data_wrapper = api.inherit('ResourceDataWrapper', page, {
     'resources' : fields.List(fields.Nested(resource), description='List of Resources')
 })
\ No newline at end of file
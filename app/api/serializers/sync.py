@@ -0,0 +1,36 @@
+from flask_restplus import fields
+from app.api import api
+from app.api.serializers.flightplan import flightplan
+from app.api.serializers.waypoint import waypoint
+from app.api.serializers.recon import recon
+from app.api.serializers.resource import resource
+from app.api.serializers.analysis import analysis_base, analysis_result
+from app.api.serializers.nofly import nofly_zone
+
+sync_analysis = api.inherit('Sync Analysis', analysis_base, {
+    'minuend_recon_id': fields.Integer(description='Minuend recon unique Id'),
+    'subtrahend_recon_id': fields.Integer(description='Subtrahend recon unique Id')
+})
+
+sync_deleted = api.model('Sync Deleted', {
+    'flightplans' : fields.List(fields.Integer, description = 'Unique IDs of the deleted FlightPlans'),
+    'waypoints' : fields.List(fields.Integer, description = 'Unique IDs of the deleted Waypoints'),
+    'recons' : fields.List(fields.Integer, description = 'Unique IDs of the deleted Recons'),
+    'resources' : fields.List(fields.Integer, description = 'Unique IDs of the deleted Resources'),
+    'analysis' : fields.List(fields.Integer, description = 'Unique IDs of the deleted Analysis'),
+    'results' : fields.List(fields.Integer, description = 'Unique IDs of the deleted AnalysisResults'),
+    'zones' : fields.List(fields.Integer, description = 'Unique IDs of the deleted NoFlyZones')
+})
+
+sync = api.model('Sync', {
+    'version' : fields.Integer(description = 'Version reached, since parameter of the next sync'),
+    'complete' : fields.Boolean(description = 'False if changes remain after version'),
+    'flightplans' : fields.List(fields.Nested(flightplan), description = 'Created or updated FlightPlans'),
+    'waypoints' : fields.List(fields.Nested(waypoint), description = 'Created or updated Waypoints'),
+    'recons' : fields.List(fields.Nested(recon), description = 'Created or updated Recons'),
+    'resources' : fields.List(fields.Nested(resource), description = 'Created or updated Resources'),
+    'analysis' : fields.List(fields.Nested(sync_analysis), description = 'Created or updated Analysis'),
+    'results' : fields.List(fields.Nested(analysis_result), description = 'Created or updated AnalysisResults'),
+    'zones' : fields.List(fields.Nested(nofly_zone), description = 'Created or updated NoFlyZones'),
+    'deleted' : fields.Nested(sync_deleted, description = 'Deleted entities')
+})
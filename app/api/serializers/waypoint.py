@@ -1,6 +1,6 @@
 from flask_restplus import fields
 from app.api import api
-from app.api.serializers import droneparameters
+from app.api.serializers import droneparameters, page
 
 minimal_waypoint = api.model('MinimalWaypoint', {
     'number' : fields.Integer(required = True, description = 'Waypoint number ([0, 98])', min = 0, max = 98),
@@ -20,6 +20,6 @@ waypoint = api.inherit('Waypoint', post_waypoint, {
     'id' : fields.Integer(required = True, description = 'Waypoint unique ID')
 })
 
-waypoint_data_container = api.model('WaypointDataContainer', {
+waypoint_data_container = api.inherit('WaypointDataContainer', page, {
     'waypoints' : fields.List(fields.Nested(waypoint), description="List of Waypoints")
 })
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache(object):
+    """
+    Thread safe least recently used cache with hit and miss statistics
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: Maximum number of entries
+        :type max_size: int
+        """
+        self.max_size = int(max_size)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value of a key and mark it as recently used
+
+        :param key: Key
+        :param default: Value returned if the key is not cached
+
+        :return: Cached value or default
+        """
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Cache a value, the least recently used entry is removed if the cache is full
+
+        :param key: Key
+        :param value: Value
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove a key from the cache
+
+        :param key: Key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        Return the cache statistics
+
+        :return: Statistics
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,299 @@
+import math
+import numpy as np
+import cv2
+from config import CAMERA_H_FOV, CAMERA_V_FOV, COVERAGE_CELL_SIZE, COVERAGE_MAX_CELLS, COVERAGE_MIN_VIEWS, \
+    COVERAGE_MAX_GAPS
+from app.core.distance import to_local, from_local
+from app.core.geometry import clip_scanlines
+
+# Footprints whose far edge is less than this angle below the horizon (°) are not bounded enough to be analysed
+HORIZON_MARGIN = 5.0
+
+
+def camera_footprints(x, y, heights, headings, pitches, h_fov=CAMERA_H_FOV, v_fov=CAMERA_V_FOV):
+    """
+    Project the camera footprints on a flat ground, vectorized over the photos
+
+    The camera looks along the heading, tilted from the nadir by 90° - |pitch| (a pitch of -90° or 90° is nadir).
+
+    :param x: East position of the photos on the local plane (m)
+    :type x: numpy.ndarray
+
+    :param y: North position of the photos on the local plane (m)
+    :type y: numpy.ndarray
+
+    :param heights: Height of the photos above the ground (m)
+    :type heights: numpy.ndarray
+
+    :param headings: Direction of the camera (° from north)
+    :type headings: numpy.ndarray
+
+    :param pitches: Gimbal pitch (°)
+    :type pitches: numpy.ndarray
+
+    :param h_fov: Field of view across the heading (°)
+    :type h_fov: float
+
+    :param v_fov: Field of view along the heading (°)
+    :type v_fov: float
+
+    :return: Corners of each footprint, array of shape (n, 4, 2) with x and y, and the mask of the valid footprints
+    :rtype: tuple[numpy.ndarray]
+    """
+    tilt = np.radians(np.clip(90.0 - np.abs(pitches), 0.0, 90.0))[:, np.newaxis]
+    heading = np.radians(headings)[:, np.newaxis]
+
+    valid = (heights > 0) & (np.degrees(tilt[:, 0]) + v_fov / 2.0 < 90.0 - HORIZON_MARGIN)
+
+    # Corners front right, front left, back left, back right of a nadir camera (forward, right, down = 1)
+    along = math.tan(math.radians(v_fov) / 2.0) * np.array([1.0, 1.0, -1.0, -1.0])
+    across = math.tan(math.radians(h_fov) / 2.0) * np.array([1.0, -1.0, -1.0, 1.0])
+
+    forward = along * np.cos(tilt) + np.sin(tilt)
+    down = np.cos(tilt) - along * np.sin(tilt)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(valid[:, np.newaxis], heights[:, np.newaxis] / down, 0.0)
+
+    forward = forward * scale
+    right = across * scale
+
+    corners = np.empty((len(x), 4, 2))
+    corners[:, :, 0] = x[:, np.newaxis] + forward * np.sin(heading) + right * np.cos(heading)
+    corners[:, :, 1] = y[:, np.newaxis] + forward * np.cos(heading) - right * np.sin(heading)
+
+    return corners, valid
+
+
+def count_views(corners, x0, y0, cell_size, shape):
+    """
+    Rasterize convex footprints and count the footprints covering each cell, vectorized over footprints and rows
+
+    A cell is covered if its center is inside the footprint.
+
+    :param corners: Corners of the footprints, array of shape (n, k, 2)
+    :type corners: numpy.ndarray
+
+    :param x0: Abscissa of the grid left edge (m)
+    :type x0: float
+
+    :param y0: Ordinate of the grid bottom edge (m)
+    :type y0: float
+
+    :param cell_size: Size of a cell (m)
+    :type cell_size: float
+
+    :param shape: Number of rows and columns of the grid
+    :type shape: tuple[int]
+
+    :return: Number of footprints covering each cell
+    :rtype: numpy.ndarray
+    """
+    nb_row, nb_col = shape
+
+    ys = corners[:, :, 1]
+    first_row = np.maximum(np.ceil((ys.min(axis=1) - y0) / cell_size - 0.5), 0).astype(int)
+    last_row = np.minimum(np.floor((ys.max(axis=1) - y0) / cell_size - 0.5), nb_row - 1).astype(int)
+    counts = np.maximum(last_row - first_row + 1, 0)
+
+    # One row per (footprint, grid row)
+    footprints = np.repeat(np.arange(len(corners)), counts)
+    rows = np.repeat(first_row, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    yc = y0 + (rows + 0.5) * cell_size
+
+    a = corners[footprints]
+    b = np.roll(a, -1, axis=1)
+    crossing = (a[:, :, 1] <= yc[:, np.newaxis]) != (b[:, :, 1] <= yc[:, np.newaxis])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xc = a[:, :, 0] + (yc[:, np.newaxis] - a[:, :, 1]) * (b[:, :, 0] - a[:, :, 0]) / (b[:, :, 1] - a[:, :, 1])
+
+    # A convex footprint covers a single interval of each row
+    start = np.where(crossing, xc, np.inf).min(axis=1)
+    end = np.where(crossing, xc, -np.inf).max(axis=1)
+
+    first_col = np.clip(np.ceil((start - x0) / cell_size - 0.5), 0, nb_col).astype(int)
+    end_col = np.clip(np.floor((end - x0) / cell_size - 0.5) + 1, 0, nb_col).astype(int)
+    keep = end_col > first_col
+
+    return fill_intervals(rows[keep], first_col[keep], end_col[keep], shape)
+
+
+def fill_intervals(rows, first_cols, end_cols, shape):
+    """
+    Count the intervals covering each cell of a grid
+
+    :param rows: Row of each interval
+    :type rows: numpy.ndarray
+
+    :param first_cols: First column of each interval
+    :type first_cols: numpy.ndarray
+
+    :param end_cols: End column (excluded) of each interval
+    :type end_cols: numpy.ndarray
+
+    :param shape: Number of rows and columns of the grid
+    :type shape: tuple[int]
+
+    :return: Number of intervals covering each cell
+    :rtype: numpy.ndarray
+    """
+    width = shape[1] + 1
+    size = shape[0] * width
+
+    diff = np.bincount(rows * width + first_cols, minlength=size) - np.bincount(rows * width + end_cols, minlength=size)
+
+    return np.cumsum(diff.reshape(shape[0], width), axis=1)[:, :shape[1]]
+
+
+def rasterize_polygon(x, y, x0, y0, cell_size, shape):
+    """
+    Return the cells of a grid whose center is inside a polygon (even-odd rule)
+
+    :param x: Abscissas of the polygon vertices (m)
+    :type x: numpy.ndarray
+
+    :param y: Ordinates of the polygon vertices (m)
+    :type y: numpy.ndarray
+
+    :param x0: Abscissa of the grid left edge (m)
+    :type x0: float
+
+    :param y0: Ordinate of the grid bottom edge (m)
+    :type y0: float
+
+    :param cell_size: Size of a cell (m)
+    :type cell_size: float
+
+    :param shape: Number of rows and columns of the grid
+    :type shape: tuple[int]
+
+    :return: Mask of the cells inside the polygon
+    :rtype: numpy.ndarray
+    """
+    nb_row, nb_col = shape
+    lines = y0 + (np.arange(nb_row) + 0.5) * cell_size
+    rows, start, end = clip_scanlines(x, y, lines)
+
+    first_col = np.clip(np.ceil((start - x0) / cell_size - 0.5), 0, nb_col).astype(int)
+    end_col = np.clip(np.floor((end - x0) / cell_size - 0.5) + 1, 0, nb_col).astype(int)
+    keep = end_col > first_col
+
+    return fill_intervals(rows[keep], first_col[keep], end_col[keep], shape) > 0
+
+
+def analyze_coverage(points, rotations, yaws, pitches, target=None, h_fov=CAMERA_H_FOV, v_fov=CAMERA_V_FOV):
+    """
+    Analyse the ground coverage of the photos of a flightplan
+
+    The footprints are rasterized on a grid of COVERAGE_CELL_SIZE m (larger if the grid would exceed
+    COVERAGE_MAX_CELLS cells). A gap is a part of the target seen by less than COVERAGE_MIN_VIEWS photos, the target
+    is the polygon if given, else the covered ground.
+
+    :param points: Array of shape (n, 3) with lat, lon and height above the ground columns
+    :type points: numpy.ndarray
+
+    :param rotations: Drone rotation of each photo (°)
+    :type rotations: numpy.ndarray
+
+    :param yaws: Gimbal yaw of each photo (°)
+    :type yaws: numpy.ndarray
+
+    :param pitches: Gimbal pitch of each photo (°)
+    :type pitches: numpy.ndarray
+
+    :param target: Vertices (lat, lon) of the area to cover
+    :type target: list[tuple[float]]
+
+    :param h_fov: Field of view across the heading (°)
+    :type h_fov: float
+
+    :param v_fov: Field of view along the heading (°)
+    :type v_fov: float
+
+    :return: Coverage statistics
+    :rtype: dict
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    result = {
+        'cell_size': float(COVERAGE_CELL_SIZE),
+        'photos': 0,
+        'ignored_photos': len(points),
+        'min_views': COVERAGE_MIN_VIEWS,
+        'covered_area': 0.0,
+        'target_area': 0.0,
+        'target_coverage': 0.0,
+        'target_overlap': 0.0,
+        'mean_views': 0.0,
+        'max_views': 0,
+        'histogram': [],
+        'gap_area': 0.0,
+        'gaps': []
+    }
+    if len(points) == 0:
+        return result
+
+    lat0, lon0 = float(points[:, 0].mean()), float(points[:, 1].mean())
+    x, y = to_local(points[:, 0], points[:, 1], lat0, lon0)
+
+    headings = np.asarray(rotations, dtype=float) + np.asarray(yaws, dtype=float)
+    corners, valid = camera_footprints(x, y, points[:, 2], headings, np.asarray(pitches, dtype=float), h_fov, v_fov)
+    corners = corners[valid]
+
+    result['photos'] = int(valid.sum())
+    result['ignored_photos'] = int(len(points) - valid.sum())
+    if len(corners) == 0:
+        return result
+
+    bounds = [corners.reshape(-1, 2)]
+    if target is not None:
+        tx, ty = to_local(np.array([v[0] for v in target]), np.array([v[1] for v in target]), lat0, lon0)
+        bounds.append(np.column_stack((tx, ty)))
+    bounds = np.concatenate(bounds)
+
+    x0, y0 = bounds.min(axis=0)
+    width, height = bounds.max(axis=0) - (x0, y0)
+    cell_size = max(float(COVERAGE_CELL_SIZE), math.sqrt(max(width * height, 0.0) / COVERAGE_MAX_CELLS))
+    shape = (int(math.ceil(height / cell_size)) + 1, int(math.ceil(width / cell_size)) + 1)
+    cell_area = cell_size ** 2
+
+    views = count_views(corners, x0, y0, cell_size, shape)
+    covered = views > 0
+
+    if target is not None:
+        target_mask = rasterize_polygon(tx, ty, x0, y0, cell_size, shape)
+    else:
+        target_mask = covered
+
+    nb_target = int(target_mask.sum())
+    gap_mask = target_mask & (views < COVERAGE_MIN_VIEWS)
+    histogram = np.bincount(views[covered])
+
+    result.update({
+        'cell_size': cell_size,
+        'covered_area': float(covered.sum() * cell_area),
+        'target_area': float(nb_target * cell_area),
+        'target_coverage': float((target_mask & covered).sum()) / nb_target if nb_target > 0 else 0.0,
+        'target_overlap': float((target_mask & ~gap_mask).sum()) / nb_target if nb_target > 0 else 0.0,
+        'mean_views': float(views[covered].mean()) if covered.any() else 0.0,
+        'max_views': int(views.max()),
+        'histogram': [
+            {'views': nb_view, 'area': float(count * cell_area)}
+            for nb_view, count in enumerate(histogram.tolist()) if nb_view > 0 and count > 0
+        ],
+        'gap_area': float(gap_mask.sum() * cell_area)
+    })
+
+    # Largest gaps, as connected groups of cells
+    if gap_mask.any():
+        nb_label, labels, stats, centroids = cv2.connectedComponentsWithStats(gap_mask.astype(np.uint8), connectivity=8)
+        order = np.argsort(-stats[1:, cv2.CC_STAT_AREA])[:COVERAGE_MAX_GAPS] + 1
+
+        lat, lon = from_local(x0 + (centroids[order, 0] + 0.5) * cell_size,
+                              y0 + (centroids[order, 1] + 0.5) * cell_size, lat0, lon0)
+        result['gaps'] = [
+            {'lat': gap_lat, 'lon': gap_lon, 'area': float(area * cell_area)}
+            for gap_lat, gap_lon, area in zip(lat.tolist(), lon.tolist(), stats[order, cv2.CC_STAT_AREA].tolist())
+        ]
+
+    return result
@@ -0,0 +1,337 @@
+from collections import OrderedDict
+import numpy as np
+
+# Mean earth radius (m)
+EARTH_RADIUS = 6371008.8
+
+# WGS-84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+VINCENTY_MAX_ITERATIONS = 200
+VINCENTY_TOLERANCE = 1e-12
+
+
+def vincenty(lat1, lon1, lat2, lon2):
+    """
+    Return the distance between coordinates on the WGS-84 ellipsoid (Vincenty inverse formula),
+    vectorized over NumPy arrays
+
+    The iterations are run on the whole arrays until every pair has converged. Nearly antipodal pairs,
+    for which the formula does not converge, fall back on the haversine distance.
+
+    :param lat1: Latitudes of the first coordinates (°)
+    :type lat1: float|numpy.ndarray
+
+    :param lon1: Longitudes of the first coordinates (°)
+    :type lon1: float|numpy.ndarray
+
+    :param lat2: Latitudes of the second coordinates (°)
+    :type lat2: float|numpy.ndarray
+
+    :param lon2: Longitudes of the second coordinates (°)
+    :type lon2: float|numpy.ndarray
+
+    :return: Distances (m)
+    :rtype: numpy.ndarray
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (lat1, lon1, lat2, lon2)))
+
+    f = WGS84_F
+    lon_delta = np.radians(lon2 - lon1)
+    u1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    lam = lon_delta
+    change = np.zeros(lam.shape)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(VINCENTY_MAX_ITERATIONS):
+            sin_lam = np.sin(lam)
+            cos_lam = np.cos(lam)
+
+            sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+
+            # Coincident points give 0 / 0
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+
+            # Equatorial lines give 0 / 0
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+
+            c = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+            previous = lam
+            lam = lon_delta + (1 - c) * f * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+
+            change = np.abs(lam - previous)
+            if not np.any(change > VINCENTY_TOLERANCE):
+                break
+
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = b * sin_sigma * (cos_2sigma_m + b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2) -
+        b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+    ))
+
+    result = WGS84_B * a * (sigma - delta_sigma)
+
+    diverged = ~(change <= VINCENTY_TOLERANCE)
+    if np.any(diverged):
+        result = np.where(diverged, haversine(lat1, lon1, lat2, lon2), result)
+
+    return result
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Return the great-circle distance between coordinates, vectorized over NumPy arrays
+
+    :param lat1: Latitudes of the first coordinates (°)
+    :type lat1: float|numpy.ndarray
+
+    :param lon1: Longitudes of the first coordinates (°)
+    :type lon1: float|numpy.ndarray
+
+    :param lat2: Latitudes of the second coordinates (°)
+    :type lat2: float|numpy.ndarray
+
+    :param lon2: Longitudes of the second coordinates (°)
+    :type lon2: float|numpy.ndarray
+
+    :return: Distances (m)
+    :rtype: numpy.ndarray
+    """
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlon = np.radians(lon2) - np.radians(lon1)
+
+    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2.0) ** 2
+
+    return 2.0 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def equirectangular(lat1, lon1, lat2, lon2):
+    """
+    Return the distance between coordinates projected on a plane at their mean latitude,
+    vectorized over NumPy arrays
+
+    :param lat1: Latitudes of the first coordinates (°)
+    :type lat1: float|numpy.ndarray
+
+    :param lon1: Longitudes of the first coordinates (°)
+    :type lon1: float|numpy.ndarray
+
+    :param lat2: Latitudes of the second coordinates (°)
+    :type lat2: float|numpy.ndarray
+
+    :param lon2: Longitudes of the second coordinates (°)
+    :type lon2: float|numpy.ndarray
+
+    :return: Distances (m)
+    :rtype: numpy.ndarray
+    """
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlon = np.radians((np.asarray(lon2, dtype=float) - lon1 + 180.0) % 360.0 - 180.0)
+
+    x = dlon * np.cos((lat1 + lat2) / 2.0)
+    y = lat2 - lat1
+
+    return EARTH_RADIUS * np.hypot(x, y)
+
+
+# Distance engines from the cheapest to the most accurate, with their maximum relative error
+# against the WGS-84 ellipsoid and the maximum length of the legs for which it holds (m, None for any leg):
+# - equirectangular: spherical earth and flat leg, 0.6% for legs under 10 km below 80° of latitude,
+#   the error grows with the length of the leg and near the poles
+# - haversine: spherical earth, 0.6% for any leg
+# - vincenty: WGS-84 ellipsoid, under 0.5 mm for any leg that converges
+ENGINES = OrderedDict((
+    ('equirectangular', (equirectangular, 6e-3, 10000.0)),
+    ('haversine', (haversine, 6e-3, None)),
+    ('vincenty', (vincenty, 1e-9, None))
+))
+
+
+def get_engine(name=None, accuracy=None, max_leg=None):
+    """
+    Return a distance engine, by name or as the cheapest engine that meets an accuracy target
+
+    :param name: Name of the engine (equirectangular, haversine or vincenty)
+    :type name: str
+
+    :param accuracy: Maximum relative error accepted, used if name is None
+    :type accuracy: float
+
+    :param max_leg: Maximum length of the measured legs (m), below 80° of latitude. None if unknown, only the engines
+        accurate for any leg are chosen
+    :type max_leg: float
+
+    :return: Distance function (lat1, lon1, lat2, lon2) -> meters
+    :rtype: function
+    """
+    if name is not None:
+        if name not in ENGINES:
+            raise ValueError('Unknown distance engine %s' % name)
+        return ENGINES[name][0]
+
+    if accuracy is None:
+        return vincenty
+
+    for engine, max_error, engine_max_leg in ENGINES.values():
+        if max_error > accuracy:
+            continue
+
+        if engine_max_leg is None or (max_leg is not None and max_leg <= engine_max_leg):
+            return engine
+
+    return vincenty
+
+
+def as_points(path):
+    """
+    Return a path as an array of points
+
+    :param path: Coordinates (objects with lat, lon and alt) or sequences (lat, lon, alt)
+    :type path: list
+
+    :return: Array of shape (n, 3) with lat, lon and alt columns
+    :rtype: numpy.ndarray
+    """
+    if isinstance(path, np.ndarray):
+        return path.reshape(-1, 3).astype(float)
+
+    points = np.empty((len(path), 3), dtype=float)
+
+    for i, coord in enumerate(path):
+        if hasattr(coord, 'lat'):
+            points[i] = (coord.lat, coord.lon, coord.alt or 0.0)
+        else:
+            points[i] = (coord[0], coord[1], coord[2] or 0.0)
+
+    return points
+
+
+def leg_lengths(points, engine=haversine):
+    """
+    Return the length of each leg of a path
+
+    The horizontal distance is used, or the altitude difference if the 2 points have the same position.
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param engine: Distance engine
+    :type engine: function
+
+    :return: Array of n - 1 lengths (m)
+    :rtype: numpy.ndarray
+    """
+    if len(points) < 2:
+        return np.zeros(0)
+
+    horizontal = engine(points[:-1, 0], points[:-1, 1], points[1:, 0], points[1:, 1])
+    vertical = np.abs(np.diff(points[:, 2]))
+
+    return np.where(horizontal == 0, vertical, horizontal)
+
+
+def path_length(points, engine=haversine):
+    """
+    Return the length of a path
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param engine: Distance engine
+    :type engine: function
+
+    :return: Length (m)
+    :rtype: float
+    """
+    return float(leg_lengths(points, engine).sum())
+
+
+def insertion_length(point, previous=None, following=None, engine=haversine):
+    """
+    Return the length added to a path when a point is inserted between 2 points
+
+    :param point: Inserted point (lat, lon, alt)
+    :type point: tuple
+
+    :param previous: Point before the inserted point, None if the point is the first
+    :type previous: tuple
+
+    :param following: Point after the inserted point, None if the point is the last
+    :type following: tuple
+
+    :param engine: Distance engine
+    :type engine: function
+
+    :return: Added length (m), negative if the path is shortened
+    :rtype: float
+    """
+    with_point = [p for p in (previous, point, following) if p is not None]
+    without_point = [p for p in (previous, following) if p is not None]
+
+    return path_length(as_points(with_point), engine) - path_length(as_points(without_point), engine)
+
+
+def to_local(lat, lon, lat0, lon0):
+    """
+    Project coordinates on a local plane (equirectangular) centered on an origin
+
+    :param lat: Latitudes (°)
+    :type lat: float|numpy.ndarray
+
+    :param lon: Longitudes (°)
+    :type lon: float|numpy.ndarray
+
+    :param lat0: Latitude of the origin (°)
+    :type lat0: float
+
+    :param lon0: Longitude of the origin (°)
+    :type lon0: float
+
+    :return: East and north offsets from the origin (m)
+    :rtype: tuple[numpy.ndarray]
+    """
+    x = np.radians(np.asarray(lon, dtype=float) - lon0) * EARTH_RADIUS * np.cos(np.radians(lat0))
+    y = np.radians(np.asarray(lat, dtype=float) - lat0) * EARTH_RADIUS
+
+    return x, y
+
+
+def from_local(x, y, lat0, lon0):
+    """
+    Return the coordinates of points of a local plane (inverse of to_local)
+
+    :param x: East offsets from the origin (m)
+    :type x: float|numpy.ndarray
+
+    :param y: North offsets from the origin (m)
+    :type y: float|numpy.ndarray
+
+    :param lat0: Latitude of the origin (°)
+    :type lat0: float
+
+    :param lon0: Longitude of the origin (°)
+    :type lon0: float
+
+    :return: Latitudes and longitudes (°)
+    :rtype: tuple[numpy.ndarray]
+    """
+    lat = lat0 + np.degrees(np.asarray(y, dtype=float) / EARTH_RADIUS)
+    lon = lon0 + np.degrees(np.asarray(x, dtype=float) / (EARTH_RADIUS * np.cos(np.radians(lat0))))
+
+    return lat, lon
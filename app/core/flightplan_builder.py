@@ -1,5 +1,36 @@
-from config import MAX_WAYPOINT
-from app.models import GPSCoord, Gimbal, Waypoint, DroneParameters, FlightPlanBuilder
+import math
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import MAX_WAYPOINT, MAX_BUILD_WAYPOINT, BUILDER_CACHE_SIZE, BUILD_POOL_WORKERS, CAMERA_H_FOV, \
+    CAMERA_V_FOV, BUILDER_DISTANCE_ACCURACY
+from app.core.cache import LRUCache
+from app.core.distance import as_points, to_local, from_local, get_engine
+from app.core.geometry import Coord, GimbalAngles, PlannedWaypoint, path_distance, clip_scanlines
+from app.core.mission_splitter import split_flightplan, mission_name
+from app.core.terrain import get_elevation_model
+from app.core.coverage import analyze_coverage
+from sqlalchemy import or_
+from app.exceptions import ValueExist
+from app.models import FlightPlan, FlightPlanBuilder, NoFlyZone
+
+VerticalOptions = namedtuple('VerticalOptions', [
+    'lat1', 'lon1', 'lat2', 'lon2', 'h_increment', 'v_increment', 'alt_start', 'alt_end', 'rotation', 'yaw', 'pitch',
+    'roll', 'terrain_following', 'max_waypoint'
+])
+
+AreaOptions = namedtuple('AreaOptions', [
+    'polygon', 'altitude', 'front_overlap', 'side_overlap', 'angle', 'h_fov', 'v_fov', 'rotation', 'yaw', 'pitch',
+    'roll', 'terrain_following', 'max_waypoint'
+])
+
+builder_cache = LRUCache(BUILDER_CACHE_SIZE)
+
+builder_distance_engine = get_engine(accuracy=BUILDER_DISTANCE_ACCURACY)
+
+# Process pool used to build several flightplans at once, created on first use
+build_pool = None
 
 
 def build_line_with_increment(coord1, coord2, increment, max_point, altitude=0):
@@ -7,10 +38,10 @@ def build_line_with_increment(coord1, coord2, increment, max_point, altitude=0):
     Build horizontal line with increment from 2 gps coordinates
     
     :param coord1: Start coordinate
-    :type coord1: GPSCoord
+    :type coord1: Coord
     
     :param coord2: End coordinate
-    :type coord2: GPSCoord
+    :type coord2: Coord
     
     :param increment: Increment (m)
     :type increment: float
@@ -22,71 +53,63 @@ def build_line_with_increment(coord1, coord2, increment, max_point, altitude=0):
     :type altitude: float
     
     :return: List of cordinates that represent the line
-    :rtype: list[GPSCoord]
+    :rtype: list[Coord]
     """
 
-    if not isinstance(coord1, GPSCoord):
-        raise ValueError('Parameter coord1 have to be a GPSCoord')
+    if not isinstance(coord1, Coord):
+        raise ValueError('Parameter coord1 have to be a Coord')
 
-    if not isinstance(coord2, GPSCoord):
-        raise ValueError('Parameter coord2 have to be a GPSCoord')
+    if not isinstance(coord2, Coord):
+        raise ValueError('Parameter coord2 have to be a Coord')
 
     increment = float(increment)
 
-    start_coord = coord1.clone()
-    start_coord.alt = altitude
-    result = [start_coord]
+    result = [coord1.clone(altitude)]
 
-    distance = coord1.distance_to(coord2).meters
+    distance = coord1.meters_to(coord2, builder_distance_engine)
 
     nb_point = int(distance / increment)
 
     if nb_point > max_point:
         nb_point = max_point
 
-    for i in range(1, nb_point):
-        last_coord = result[len(result) - 1]
-        distance = last_coord.distance_to(coord2).meters
-        coef_direct = increment / distance
+    # The points are evenly spaced on the line, only its length is computed
+    coefs = np.arange(1, nb_point) * (increment / distance) if nb_point > 1 else np.zeros(0)
+    lats = coord1.lat + coefs * (coord2.lat - coord1.lat)
+    lons = coord1.lon + coefs * (coord2.lon - coord1.lon)
 
-        dx = last_coord.lon + coef_direct * (coord2.lon - last_coord.lon)
-        dy = last_coord.lat + coef_direct * (coord2.lat - last_coord.lat)
+    for lat, lon in zip(lats.tolist(), lons.tolist()):
+        result.append(Coord(lat, lon, altitude))
 
-        new_coord = GPSCoord(lat=dy, lon=dx, alt=altitude)
-
-        result.append(new_coord)
-
-    end_coord = coord2.clone()
-    end_coord.alt = altitude
-    result.append(end_coord)
+    result.append(coord2.clone(altitude))
 
     return result
 
 
 def create_waypoints_from_path(path, max_number, rotation, gimbal):
     """
-    Create Waypoints list from path of GPSCoord
+    Create Waypoints list from path of Coord
 
-    :param path: Path of GPSCoord
-    :type path: list[GPSCoord]
+    :param path: Path of Coord
+    :type path: list[Coord]
 
     :param rotation: Drone rotation
     :type rotation: float
 
     :param gimbal: Gimbal for waypoints
-    :type gimbal: Gimbal
+    :type gimbal: GimbalAngles
 
     :param max_number: Max number for Waypoints
     :type max_number: int
 
-    :return: List of Waypoints
-    :rtype: list[Waypoint]
+    :return: List of planned Waypoints
+    :rtype: list[PlannedWaypoint]
     """
     if path is None:
         raise ValueError('Parameter line required')
 
-    if not isinstance(gimbal, Gimbal):
-        raise ValueError('Parameter gimbal have to be a Gimbal')
+    if not isinstance(gimbal, GimbalAngles):
+        raise ValueError('Parameter gimbal have to be a GimbalAngles')
 
     rotation = float(rotation)
     max_number = int(max_number)
@@ -97,24 +120,8 @@ def create_waypoints_from_path(path, max_number, rotation, gimbal):
         if i >= max_number:
             break
 
-        new_coord = GPSCoord(
-            lat=path[i].lat,
-            lon=path[i].lon,
-            alt=path[i].alt
-        )
-
-        new_parameters = DroneParameters(
-            rotation=rotation,
-            gimbal=gimbal.clone(),
-            coord=new_coord
-        )
-
-        new_waypoint = Waypoint(
-            number=i,
-            parameters=new_parameters
-        )
-
-        result.append(new_waypoint)
+        # The gimbal is never modified, so all waypoints can share it
+        result.append(PlannedWaypoint(i, rotation, path[i], gimbal))
 
     return result
 
@@ -125,10 +132,10 @@ def build_vertical_path_with_increments(coord1, coord2, horizontal_increment, ve
     Build a vertical path 
     
     :param coord1: Start coordinate
-    :type coord1: GPSCoord
+    :type coord1: Coord
     
     :param coord2: End coordinate
-    :type coord2: GPSCoord
+    :type coord2: Coord
     
     :param horizontal_increment: Horizontal increment (m)
     :type horizontal_increment: float
@@ -146,14 +153,14 @@ def build_vertical_path_with_increments(coord1, coord2, horizontal_increment, ve
     :type max_point: int
     
     :return: List of cordinates that represent the path
-    :rtype: list[GPSCoord]
+    :rtype: list[Coord]
     """
 
-    if not isinstance(coord1, GPSCoord):
-        raise ValueError('Parameter coord1 have to be a GPSCoord')
+    if not isinstance(coord1, Coord):
+        raise ValueError('Parameter coord1 have to be a Coord')
 
-    if not isinstance(coord2, GPSCoord):
-        raise ValueError('Parameter coord2 have to be a GPSCoord')
+    if not isinstance(coord2, Coord):
+        raise ValueError('Parameter coord2 have to be a Coord')
 
     if coord1 == coord2:
         raise ValueError('The coordinates have the same position')
@@ -194,10 +201,10 @@ def build_vertical_flightplan(coord1, coord2, horizontal_increment, vertical_inc
     Build a vertical flightplan from parameters
     
     :param coord1: Start coordinate
-    :type coord1: GPSCoord
+    :type coord1: Coord
     
     :param coord2: End coordinate
-    :type coord2: GPSCoord
+    :type coord2: Coord
     
     :param horizontal_increment: Horizontal increment (m)
     :type horizontal_increment: float
@@ -218,10 +225,10 @@ def build_vertical_flightplan(coord1, coord2, horizontal_increment, vertical_inc
     :type rotation: float
     
     :param gimbal: Gimbal parameters
-    :type gimbal: Gimbal
+    :type gimbal: GimbalAngles
     
     :return: List of waypoint that represent the flightplan
-    :rtype: list[Waypoint]
+    :rtype: list[PlannedWaypoint]
     """
 
     # No special verification, functions used already handle errors
@@ -234,28 +241,573 @@ def build_vertical_flightplan(coord1, coord2, horizontal_increment, vertical_inc
     return flightplan_path
 
 
+def normalize_vertical_options(builder_options):
+    """
+    Return the normalized options of a vertical builder, used as cache key
+
+    :param builder_options: Builder options
+    :type builder_options: FlightPlanBuilder
+
+    :return: Normalized options
+    :rtype: VerticalOptions
+    """
+
+    if not isinstance(builder_options, FlightPlanBuilder):
+        raise ValueError('Parameter builder_options have to be a FlightPlanBuilder')
+
+    gimbal = GimbalAngles.from_model(builder_options.d_gimbal)
+
+    return VerticalOptions(
+        lat1=round(float(builder_options.coord1.lat), 9),
+        lon1=round(float(builder_options.coord1.lon), 9),
+        lat2=round(float(builder_options.coord2.lat), 9),
+        lon2=round(float(builder_options.coord2.lon), 9),
+        h_increment=round(float(builder_options.h_increment), 6),
+        v_increment=round(float(builder_options.v_increment), 6),
+        alt_start=round(float(builder_options.alt_start), 6),
+        alt_end=round(float(builder_options.alt_end), 6),
+        rotation=round(float(builder_options.d_rotation or 0.0), 6),
+        yaw=round(float(gimbal.yaw), 6),
+        pitch=round(float(gimbal.pitch), 6),
+        roll=round(float(gimbal.roll), 6),
+        terrain_following=bool(builder_options.terrain_following),
+        max_waypoint=int(MAX_BUILD_WAYPOINT)
+    )
+
+
+def build_vertical_flightplan_from_normalized(options):
+    """
+    Build a vertical flightplan from normalized options
+
+    :param options: Normalized options
+    :type options: VerticalOptions
+
+    :return: Path du plan de vol
+    :rtype: tuple[PlannedWaypoint]
+    """
+
+    return tuple(build_vertical_flightplan(
+        Coord(options.lat1, options.lon1),
+        Coord(options.lat2, options.lon2),
+        options.h_increment,
+        options.v_increment,
+        options.alt_start,
+        options.alt_end,
+        options.max_waypoint,
+        options.rotation,
+        GimbalAngles(options.yaw, options.pitch, options.roll)
+    ))
+
+
 def build_vertical_flightplan_from_options(builder_options):
     """
     Build a vertical flightplan from args (json request)
+
+    The built paths are cached by normalized options, the returned waypoints are shared and must not be modified.
     
     :param builder_options: Builder options
     :type builder_options: FlightPlanBuilder
     
     :return: Path du plan de vol
-    :rtype: list[Waypoint]
+    :rtype: tuple[PlannedWaypoint]
+    """
+
+    if isinstance(builder_options, FlightPlanBuilder) and builder_options.type == 'area':
+        raise ValueError('Parameter builder_options have to be vertical builder options')
+
+    return build_flightplan_from_options(builder_options)
+
+
+def camera_footprint(altitude, h_fov, v_fov):
+    """
+    Return the ground footprint of a nadir camera
+
+    :param altitude: Altitude above ground (m)
+    :type altitude: float
+
+    :param h_fov: Field of view across the flight line (°)
+    :type h_fov: float
+
+    :param v_fov: Field of view along the flight line (°)
+    :type v_fov: float
+
+    :return: Width and length of the footprint (m)
+    :rtype: tuple[float]
+    """
+
+    return (
+        2.0 * altitude * math.tan(math.radians(h_fov) / 2.0),
+        2.0 * altitude * math.tan(math.radians(v_fov) / 2.0)
+    )
+
+
+def build_area_path(polygon, altitude, line_spacing, photo_spacing, angle, max_point):
+    """
+    Build a boustrophedon (lawnmower) path covering a polygon
+
+    :param polygon: Vertices of the polygon
+    :type polygon: list[Coord]
+
+    :param altitude: Altitude (m)
+    :type altitude: float
+
+    :param line_spacing: Distance between 2 lines (m)
+    :type line_spacing: float
+
+    :param photo_spacing: Distance between 2 points of a line (m)
+    :type photo_spacing: float
+
+    :param angle: Direction of the lines (° from north)
+    :type angle: float
+
+    :param max_point: Maximum number of coordinate in the path
+    :type max_point: int
+
+    :return: List of cordinates that represent the path
+    :rtype: list[Coord]
+    """
+
+    if polygon is None or len(polygon) < 3:
+        raise ValueError('Parameter polygon needs at least 3 coordinates')
+
+    line_spacing = float(line_spacing)
+    photo_spacing = float(photo_spacing)
+    altitude = float(altitude)
+    max_point = int(max_point)
+
+    if line_spacing <= 0 or photo_spacing <= 0:
+        raise ValueError('Line and photo spacing have to be upper 0')
+
+    lat = np.array([coord.lat for coord in polygon], dtype=float)
+    lon = np.array([coord.lon for coord in polygon], dtype=float)
+    lat0 = float(lat.mean())
+    lon0 = float(lon.mean())
+
+    # Local plane rotated so the lines are along the u axis
+    x, y = to_local(lat, lon, lat0, lon0)
+    sin_a = math.sin(math.radians(angle))
+    cos_a = math.cos(math.radians(angle))
+    u = x * sin_a + y * cos_a
+    v = -x * cos_a + y * sin_a
+
+    v_min = v.min()
+    v_max = v.max()
+    nb_line = max(1, int(math.ceil((v_max - v_min) / line_spacing)))
+    lines = v_min + (v_max - v_min - (nb_line - 1) * line_spacing) / 2.0 + np.arange(nb_line) * line_spacing
+
+    line_index, start, end = clip_scanlines(u, v, lines)
+    if len(line_index) == 0:
+        raise ValueError('The polygon is too small to be covered')
+
+    # Every other line is flown backward
+    backward = line_index % 2 == 1
+    order = np.lexsort((np.where(backward, -start, start), line_index))
+    line_index = line_index[order]
+    start, end = np.where(backward[order], end[order], start[order]), np.where(backward[order], start[order],
+                                                                               end[order])
+
+    counts = np.maximum(np.ceil(np.abs(end - start) / photo_spacing).astype(int), 1) + 1
+    total = np.cumsum(counts)
+    if total[-1] > max_point:
+        nb_segment = int(np.searchsorted(total, max_point, side='right')) + 1
+        line_index = line_index[:nb_segment]
+        start = start[:nb_segment]
+        end = end[:nb_segment]
+        counts = counts[:nb_segment]
+
+    segment = np.repeat(np.arange(len(counts)), counts)
+    position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = position / (counts[segment] - 1.0)
+
+    path_u = start[segment] + t * (end[segment] - start[segment])
+    path_v = lines[line_index[segment]]
+
+    path_lat, path_lon = from_local(path_u * sin_a - path_v * cos_a, path_u * cos_a + path_v * sin_a, lat0, lon0)
+
+    return [Coord(lat, lon, altitude) for lat, lon in zip(path_lat[:max_point].tolist(), path_lon[:max_point].tolist())]
+
+
+def build_area_flightplan(polygon, altitude, front_overlap, side_overlap, angle, h_fov, v_fov, max_waypoint, rotation,
+                          gimbal):
+    """
+    Build an area flightplan from parameters
+
+    :param polygon: Vertices of the polygon
+    :type polygon: list[Coord]
+
+    :param altitude: Altitude (m)
+    :type altitude: float
+
+    :param front_overlap: Overlap between 2 photos of a line ([0, 1[)
+    :type front_overlap: float
+
+    :param side_overlap: Overlap between 2 lines ([0, 1[)
+    :type side_overlap: float
+
+    :param angle: Direction of the lines (° from north)
+    :type angle: float
+
+    :param h_fov: Camera field of view across the lines (°)
+    :type h_fov: float
+
+    :param v_fov: Camera field of view along the lines (°)
+    :type v_fov: float
+
+    :param max_waypoint: Maximum number of waypoints
+    :type max_waypoint: int
+
+    :param rotation: Drone rotation (°)
+    :type rotation: float
+
+    :param gimbal: Gimbal parameters
+    :type gimbal: GimbalAngles
+
+    :return: List of waypoint that represent the flightplan
+    :rtype: list[PlannedWaypoint]
+    """
+
+    width, length = camera_footprint(altitude, h_fov, v_fov)
+
+    coord_path = build_area_path(polygon, altitude, width * (1.0 - side_overlap), length * (1.0 - front_overlap),
+                                 angle, max_waypoint)
+
+    return create_waypoints_from_path(coord_path, max_waypoint, rotation, gimbal)
+
+
+def normalize_area_options(builder_options):
+    """
+    Return the normalized options of an area builder, used as cache key
+
+    :param builder_options: Builder options
+    :type builder_options: FlightPlanBuilder
+
+    :return: Normalized options
+    :rtype: AreaOptions
+    """
+
+    if not isinstance(builder_options, FlightPlanBuilder):
+        raise ValueError('Parameter builder_options have to be a FlightPlanBuilder')
+
+    gimbal = GimbalAngles.from_model(builder_options.d_gimbal)
+
+    return AreaOptions(
+        polygon=tuple((round(coord.lat, 9), round(coord.lon, 9)) for coord in builder_options.polygon_coords),
+        altitude=round(float(builder_options.altitude), 6),
+        front_overlap=round(float(builder_options.front_overlap), 6),
+        side_overlap=round(float(builder_options.side_overlap), 6),
+        angle=round(float(builder_options.angle or 0.0), 6),
+        h_fov=float(CAMERA_H_FOV),
+        v_fov=float(CAMERA_V_FOV),
+        rotation=round(float(builder_options.d_rotation or 0.0), 6),
+        yaw=round(float(gimbal.yaw), 6),
+        pitch=round(float(gimbal.pitch), 6),
+        roll=round(float(gimbal.roll), 6),
+        terrain_following=bool(builder_options.terrain_following),
+        max_waypoint=int(MAX_BUILD_WAYPOINT)
+    )
+
+
+def build_area_flightplan_from_normalized(options):
+    """
+    Build an area flightplan from normalized options
+
+    :param options: Normalized options
+    :type options: AreaOptions
+
+    :return: Path du plan de vol
+    :rtype: tuple[PlannedWaypoint]
+    """
+
+    return tuple(build_area_flightplan(
+        [Coord(lat, lon) for lat, lon in options.polygon],
+        options.altitude,
+        options.front_overlap,
+        options.side_overlap,
+        options.angle,
+        options.h_fov,
+        options.v_fov,
+        options.max_waypoint,
+        options.rotation,
+        GimbalAngles(options.yaw, options.pitch, options.roll)
+    ))
+
+
+def normalize_options(builder_options):
+    """
+    Return the normalized options of a builder, whatever its type
+
+    :param builder_options: Builder options
+    :type builder_options: FlightPlanBuilder
+
+    :return: Normalized options
+    :rtype: VerticalOptions|AreaOptions
     """
 
     if not isinstance(builder_options, FlightPlanBuilder):
         raise ValueError('Parameter builder_options have to be a FlightPlanBuilder')
 
-    return build_vertical_flightplan(
-        builder_options.coord1,
-        builder_options.coord2,
-        builder_options.h_increment,
-        builder_options.v_increment,
-        builder_options.alt_start,
-        builder_options.alt_end,
-        MAX_WAYPOINT,
-        builder_options.d_rotation,
-        builder_options.d_gimbal
-    )
\ No newline at end of file
+    if builder_options.type == 'area':
+        return normalize_area_options(builder_options)
+
+    return normalize_vertical_options(builder_options)
+
+
+def follow_terrain(flightplan_path):
+    """
+    Adjust the altitude of planned waypoints to hold their height above the ground
+
+    The altitudes of the waypoints are relative to the take off point (first waypoint), the ground elevation
+    difference with this point is added to each waypoint.
+
+    :param flightplan_path: Planned waypoints, their altitude is the height above the ground
+    :type flightplan_path: tuple[PlannedWaypoint]
+
+    :return: Planned waypoints with adjusted altitude
+    :rtype: tuple[PlannedWaypoint]
+    """
+    if len(flightplan_path) == 0:
+        return flightplan_path
+
+    points = as_points([waypoint.coord for waypoint in flightplan_path])
+    ground = get_elevation_model().elevations(points[:, 0], points[:, 1])
+    altitudes = points[:, 2] + ground - ground[0]
+
+    return tuple(
+        PlannedWaypoint(waypoint.number, waypoint.rotation, Coord(waypoint.coord.lat, waypoint.coord.lon, alt),
+                        waypoint.gimbal)
+        for waypoint, alt in zip(flightplan_path, altitudes.tolist())
+    )
+
+
+def build_flightplan_from_normalized(options):
+    """
+    Build a flightplan from normalized options
+
+    :param options: Normalized options
+    :type options: VerticalOptions|AreaOptions
+
+    :return: Path du plan de vol
+    :rtype: tuple[PlannedWaypoint]
+    """
+
+    if isinstance(options, AreaOptions):
+        flightplan_path = build_area_flightplan_from_normalized(options)
+    else:
+        flightplan_path = build_vertical_flightplan_from_normalized(options)
+
+    if options.terrain_following:
+        flightplan_path = follow_terrain(flightplan_path)
+
+    if len(flightplan_path) >= options.max_waypoint:
+        raise ValueError('The FlightPlan exceed ' + str(options.max_waypoint) + ' waypoints')
+
+    return flightplan_path
+
+
+def build_flightplan_from_options(builder_options):
+    """
+    Build a flightplan from builder options (json request), whatever the builder type
+
+    The path is not limited to MAX_WAYPOINT, it is split in missions by create_preview. The built paths are cached
+    by normalized options, the returned waypoints are shared and must not be modified.
+
+    :param builder_options: Builder options
+    :type builder_options: FlightPlanBuilder
+
+    :return: Path du plan de vol
+    :rtype: tuple[PlannedWaypoint]
+    """
+
+    options = normalize_options(builder_options)
+
+    flightplan_path = builder_cache.get(options)
+    if flightplan_path is None:
+        flightplan_path = build_flightplan_from_normalized(options)
+        builder_cache.set(options, flightplan_path)
+
+    return flightplan_path
+
+
+def get_build_pool():
+    """
+    Return the process pool used to build several flightplans at once
+
+    :return: Process pool
+    :rtype: ProcessPoolExecutor
+    """
+    global build_pool
+
+    if build_pool is None:
+        build_pool = ProcessPoolExecutor(max_workers=BUILD_POOL_WORKERS or None)
+
+    return build_pool
+
+
+def reset_build_pool():
+    """
+    Drop the build pool, a new one is started on next use
+    """
+    global build_pool
+
+    if build_pool is not None:
+        build_pool.shutdown(wait=False)
+        build_pool = None
+
+
+def build_in_pool(options_list):
+    """
+    Build flightplans from normalized options in the build pool
+
+    A pool whose worker died is broken for good: it is replaced and the builds it lost are submitted once more to the
+    new pool.
+
+    :param options_list: Normalized options
+    :type options_list: list[VerticalOptions|AreaOptions]
+
+    :return: Path of the flightplan, or the exception raised while building it, by options
+    :rtype: dict
+    """
+
+    built = {}
+
+    for attempt in range(2):
+        pool = get_build_pool()
+        futures = []
+
+        for options in options_list:
+            try:
+                futures.append((options, pool.submit(build_flightplan_from_normalized, options)))
+            except BrokenProcessPool as e:
+                built[options] = e
+
+        for options, future in futures:
+            try:
+                built[options] = future.result()
+            except Exception as e:
+                built[options] = e
+
+        options_list = [options for options in options_list if isinstance(built[options], BrokenProcessPool)]
+        if len(options_list) == 0:
+            break
+
+        reset_build_pool()
+
+    return built
+
+
+def build_flightplans_from_normalized(options_list):
+    """
+    Build several flightplans from normalized options, in parallel in the build pool
+
+    Cached paths are not rebuilt, identical options are only built once.
+
+    :param options_list: Normalized options
+    :type options_list: list[VerticalOptions|AreaOptions]
+
+    :return: Path of each flightplan, or the exception raised while building it
+    :rtype: list[tuple[PlannedWaypoint]|Exception]
+    """
+
+    results = [builder_cache.get(options) for options in options_list]
+    missing = list(set(options for options, result in zip(options_list, results) if result is None))
+
+    built = {}
+    if len(missing) == 1:
+        try:
+            built[missing[0]] = build_flightplan_from_normalized(missing[0])
+        except Exception as e:
+            built[missing[0]] = e
+
+    elif len(missing) > 1:
+        built = build_in_pool(missing)
+
+    for options, flightplan_path in built.items():
+        if not isinstance(flightplan_path, Exception):
+            builder_cache.set(options, flightplan_path)
+
+    return [result if result is not None else built[options] for options, result in zip(options_list, results)]
+
+
+class FlightPlanPreview(object):
+    """
+    Built flightplan that is not persisted, it can be marshalled with the flightplan serializers
+    """
+    __slots__ = ('name', 'waypoints', 'builder_options', 'distance', 'mission_number', 'missions', 'violations',
+                 'coverage')
+
+    id = None
+    parent_id = None
+    created_on = None
+    updated_on = None
+    builded = True
+    recons_count = 0
+
+    def __init__(self, name, waypoints, builder_options, mission_number=0):
+        self.name = name
+        self.waypoints = waypoints
+        self.builder_options = builder_options
+        self.distance = path_distance([waypoint.coord for waypoint in waypoints])
+        self.mission_number = mission_number
+        self.missions = []
+        self.violations = NoFlyZone.path_violations(
+            as_points([waypoint.coord for waypoint in waypoints]),
+            [waypoint.number for waypoint in waypoints],
+            mission_number
+        )
+        self.coverage = None
+
+    @property
+    def waypoints_count(self):
+        return len(self.waypoints)
+
+
+def create_preview(name, flightplan_path, builder_options, flightplan_id=None):
+    """
+    Create the preview of a built flightplan, split in missions of at most MAX_WAYPOINT waypoints
+
+    :param name: Name of the flightplan
+    :type name: str
+
+    :param flightplan_path: Built path
+    :type flightplan_path: list[PlannedWaypoint]
+
+    :param builder_options: Builder options
+    :type builder_options: FlightPlanBuilder
+
+    :param flightplan_id: FlightPlan unique ID when an existing flightplan is built again, its missions keep their
+        names
+    :type flightplan_id: int
+
+    :return: Preview of the first mission, the following missions are in its missions attribute, the no-fly zone
+             violations and the coverage of all the missions in its violations and coverage attributes
+    :rtype: FlightPlanPreview
+    :raise ValueExist: Si le nom d'une mission est deja porte par un autre plan de vol
+    """
+
+    missions = split_flightplan(flightplan_path, MAX_WAYPOINT)
+
+    preview = FlightPlanPreview(name, missions[0], builder_options)
+    for mission_number in range(1, len(missions)):
+        mission = FlightPlanPreview(mission_name(name, mission_number), missions[mission_number], None, mission_number)
+        preview.missions.append(mission)
+        preview.violations += mission.violations
+
+    if len(preview.missions) > 0:
+        query = FlightPlan.query.filter(FlightPlan.name.in_([mission.name for mission in preview.missions]))
+        if flightplan_id is not None:
+            query = query.filter(or_(FlightPlan.parent_id.is_(None), FlightPlan.parent_id != flightplan_id))
+
+        taken = query.with_entities(FlightPlan.name).first()
+        if taken is not None:
+            raise ValueExist('FlightPlan name already exist: ' + taken.name)
+
+    preview.coverage = analyze_coverage(
+        as_points([waypoint.coord for waypoint in flightplan_path]),
+        [waypoint.rotation for waypoint in flightplan_path],
+        [waypoint.gimbal.yaw for waypoint in flightplan_path],
+        [waypoint.gimbal.pitch for waypoint in flightplan_path],
+        [(coord.lat, coord.lon) for coord in builder_options.polygon_coords]
+        if builder_options is not None and builder_options.type == 'area' else None
+    )
+
+    return preview
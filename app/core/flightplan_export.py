@@ -0,0 +1,234 @@
+import json
+import struct
+import zlib
+from xml.sax.saxutils import escape
+
+# Version of the export formats, incremented at each change of their layout
+EXPORT_FORMAT_VERSION = 1
+
+# Binary export: header, fixed-width waypoint records, CRC32 of the header and the records (little endian)
+BINARY_MAGIC = b'ELFP'
+
+# Magic, format version, record size, FlightPlan unique ID, number of waypoints, name (UTF-8, zero padded)
+BINARY_HEADER = struct.Struct('<4sHHII64s')
+
+# Number, latitude and longitude (1e-7 °), altitude (m), rotation, gimbal yaw, pitch and roll (°)
+BINARY_RECORD = struct.Struct('<Hiifffff')
+
+BINARY_TRAILER = struct.Struct('<I')
+
+# Number of records packed in a chunk of the binary export
+BINARY_CHUNK_RECORDS = 256
+
+# Degrees to the integer unit of the binary coordinates
+COORD_SCALE = 1e7
+
+
+def float_value(value):
+    """
+    Return a value of a waypoint, 0 if it is not set
+
+    :param value: Value
+    :type value: float|None
+
+    :rtype: float
+    """
+    return 0.0 if value is None else float(value)
+
+
+def truncate_utf8(value, size):
+    """
+    Encode a text in UTF-8, truncated to a size without cutting a character
+
+    :param value: Text
+    :type value: str
+
+    :param size: Maximum size (bytes)
+    :type size: int
+
+    :rtype: bytes
+    """
+    return value.encode('utf-8')[:size].decode('utf-8', 'ignore').encode('utf-8')
+
+
+def binary_export(flightplan_id, name, waypoints_count, waypoints):
+    """
+    Generate the binary export of a FlightPlan
+
+    The header is followed by one record per waypoint and by the CRC32 of the header and the records, see
+    BINARY_HEADER and BINARY_RECORD.
+
+    :param flightplan_id: FlightPlan unique ID
+    :type flightplan_id: int
+
+    :param name: FlightPlan name
+    :type name: str
+
+    :param waypoints_count: Number of waypoints
+    :type waypoints_count: int
+
+    :param waypoints: Waypoints (number, lat, lon, alt, rotation, yaw, pitch, roll) ordered by number
+    :type waypoints: iterable
+
+    :return: Parts of the export
+    :rtype: generator
+    """
+    header = BINARY_HEADER.pack(BINARY_MAGIC, EXPORT_FORMAT_VERSION, BINARY_RECORD.size, flightplan_id,
+                                waypoints_count, truncate_utf8(name or '', 64))
+    crc = zlib.crc32(header)
+    yield header
+
+    chunk = []
+    for number, lat, lon, alt, rotation, yaw, pitch, roll in waypoints:
+        chunk.append(BINARY_RECORD.pack(number, int(round(float_value(lat) * COORD_SCALE)),
+                                        int(round(float_value(lon) * COORD_SCALE)), float_value(alt),
+                                        float_value(rotation), float_value(yaw), float_value(pitch),
+                                        float_value(roll)))
+
+        if len(chunk) == BINARY_CHUNK_RECORDS:
+            data = b''.join(chunk)
+            crc = zlib.crc32(data, crc)
+            chunk = []
+            yield data
+
+    data = b''.join(chunk)
+    crc = zlib.crc32(data, crc)
+    yield data + BINARY_TRAILER.pack(crc & 0xffffffff)
+
+
+def read_binary_export(data):
+    """
+    Decode and validate a binary export, as the ground station does
+
+    :param data: Binary export
+    :type data: bytes
+
+    :return: FlightPlan (id, name, format_version) and waypoints (number, lat, lon, alt, rotation, yaw, pitch, roll)
+    :rtype: tuple
+    :raise ValueError: Si l'export est invalide
+    """
+    if len(data) < BINARY_HEADER.size + BINARY_TRAILER.size:
+        raise ValueError('Export too short')
+
+    magic, version, record_size, flightplan_id, waypoints_count, name = BINARY_HEADER.unpack_from(data)
+
+    if magic != BINARY_MAGIC:
+        raise ValueError('Not a FlightPlan export')
+    if version != EXPORT_FORMAT_VERSION or record_size != BINARY_RECORD.size:
+        raise ValueError('Unsupported export format version ' + str(version))
+    if len(data) != BINARY_HEADER.size + waypoints_count * record_size + BINARY_TRAILER.size:
+        raise ValueError('Export size does not match its number of waypoints')
+
+    (crc,) = BINARY_TRAILER.unpack_from(data, len(data) - BINARY_TRAILER.size)
+    if zlib.crc32(data[:-BINARY_TRAILER.size]) & 0xffffffff != crc:
+        raise ValueError('Export checksum mismatch')
+
+    waypoints = []
+    for (number, lat, lon, alt, rotation, yaw, pitch, roll) in BINARY_RECORD.iter_unpack(
+            data[BINARY_HEADER.size:-BINARY_TRAILER.size]):
+        waypoints.append((number, lat / COORD_SCALE, lon / COORD_SCALE, alt, rotation, yaw, pitch, roll))
+
+    flightplan = {
+        'id': flightplan_id,
+        'name': name.rstrip(b'\0').decode('utf-8', 'replace'),
+        'format_version': version
+    }
+
+    return flightplan, waypoints
+
+
+def geojson_export(flightplan_id, name, waypoints_count, waypoints):
+    """
+    Generate the GeoJSON export of a FlightPlan
+
+    A FeatureCollection of a Point per waypoint and of the LineString of the path, coordinates are (lon, lat, alt).
+    The path is omitted if there are less than 2 waypoints.
+
+    :param flightplan_id: FlightPlan unique ID
+    :type flightplan_id: int
+
+    :param name: FlightPlan name
+    :type name: str
+
+    :param waypoints_count: Number of waypoints
+    :type waypoints_count: int
+
+    :param waypoints: Waypoints (number, lat, lon, alt, rotation, yaw, pitch, roll) ordered by number
+    :type waypoints: iterable
+
+    :return: Parts of the export
+    :rtype: generator
+    """
+    flightplan = {'id': flightplan_id, 'name': name, 'waypoints_count': waypoints_count}
+    yield '{"type": "FeatureCollection", "format_version": ' + str(EXPORT_FORMAT_VERSION) + \
+          ', "flightplan": ' + json.dumps(flightplan) + ', "features": ['
+
+    path = []
+    for number, lat, lon, alt, rotation, yaw, pitch, roll in waypoints:
+        coordinates = [float_value(lon), float_value(lat), float_value(alt)]
+        path.append(coordinates)
+
+        yield (', ' if len(path) > 1 else '') + json.dumps({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': coordinates},
+            'properties': {'number': number, 'rotation': rotation, 'yaw': yaw, 'pitch': pitch, 'roll': roll}
+        })
+
+    # A LineString has 2 positions at least
+    if len(path) >= 2:
+        yield ', ' + json.dumps({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': path},
+            'properties': {'name': name}
+        })
+
+    yield ']}'
+
+
+def kml_export(flightplan_id, name, waypoints_count, waypoints):
+    """
+    Generate the KML export of a FlightPlan
+
+    A Placemark per waypoint and the Placemark of the path, the altitudes are relative to the ground. The path is
+    omitted if there are less than 2 waypoints.
+
+    :param flightplan_id: FlightPlan unique ID
+    :type flightplan_id: int
+
+    :param name: FlightPlan name
+    :type name: str
+
+    :param waypoints_count: Number of waypoints
+    :type waypoints_count: int
+
+    :param waypoints: Waypoints (number, lat, lon, alt, rotation, yaw, pitch, roll) ordered by number
+    :type waypoints: iterable
+
+    :return: Parts of the export
+    :rtype: generator
+    """
+    name = escape(name or '')
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n' \
+          '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>' \
+          '<name>{0}</name>' \
+          '<ExtendedData>' \
+          '<Data name="format_version"><value>{1}</value></Data>' \
+          '<Data name="flightplan_id"><value>{2}</value></Data>' \
+          '<Data name="waypoints_count"><value>{3}</value></Data>' \
+          '</ExtendedData>\n'.format(name, EXPORT_FORMAT_VERSION, flightplan_id, waypoints_count)
+
+    path = []
+    for number, lat, lon, alt, rotation, yaw, pitch, roll in waypoints:
+        coordinates = '{0!r},{1!r},{2!r}'.format(float_value(lon), float_value(lat), float_value(alt))
+        path.append(coordinates)
+
+        yield '<Placemark><name>{0}</name><Point><altitudeMode>relativeToGround</altitudeMode>' \
+              '<coordinates>{1}</coordinates></Point></Placemark>\n'.format(number, coordinates)
+
+    # A LineString has 2 coordinates at least
+    if len(path) >= 2:
+        yield '<Placemark><name>{0}</name><LineString><altitudeMode>relativeToGround</altitudeMode>' \
+              '<coordinates>{1}</coordinates></LineString></Placemark>\n'.format(name, ' '.join(path))
+
+    yield '</Document></kml>\n'
@@ -0,0 +1,204 @@
+import numpy as np
+from config import FLIGHTPLAN_DISTANCE_ACCURACY
+from app.core.distance import as_points, path_length, get_engine, vincenty
+
+# Engine used for the distance of the flightplans
+flightplan_distance_engine = get_engine(accuracy=FLIGHTPLAN_DISTANCE_ACCURACY)
+
+# Maximum number of (scanline, edge) pairs computed at once when clipping a polygon
+CLIPPING_CHUNK_SIZE = 1000000
+
+
+class Coord(object):
+    """
+    Lightweight GPS coordinate used by the builders
+
+    Unlike GPSCoord it is not mapped, it only becomes a row when a flightplan is persisted.
+    """
+    __slots__ = ('lat', 'lon', 'alt')
+
+    def __init__(self, lat, lon, alt=0.0):
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+
+    @staticmethod
+    def from_model(coord):
+        """
+        Create a Coord from a GPSCoord
+
+        :param coord: GPS coordinate
+        :type coord: GPSCoord
+
+        :return: Coordinate
+        :rtype: Coord
+        """
+        return Coord(coord.lat, coord.lon, coord.alt if coord.alt is not None else 0.0)
+
+    def meters_to(self, coord, engine=vincenty):
+        """
+        Return the horizontal distance between 2 coordinates
+
+        :param coord: Coordinate
+        :type coord: Coord|GPSCoord
+
+        :param engine: Distance engine
+        :type engine: function
+
+        :return: Distance (m)
+        :rtype: float
+        """
+        return float(engine(self.lat, self.lon, coord.lat, coord.lon))
+
+    def clone(self, alt=None):
+        """
+        Return a copy of the coordinate
+
+        :param alt: Altitude of the copy, current altitude if None
+        :type alt: float
+
+        :return: Copy of the coordinate
+        :rtype: Coord
+        """
+        return Coord(self.lat, self.lon, self.alt if alt is None else alt)
+
+    def __eq__(self, other):
+        return self.lat == other.lat and self.lon == other.lon and self.alt == other.alt
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return 'Coord(%r, %r, %r)' % (self.lat, self.lon, self.alt)
+
+
+class GimbalAngles(object):
+    """
+    Lightweight gimbal parameters used by the builders
+    """
+    __slots__ = ('yaw', 'pitch', 'roll')
+
+    def __init__(self, yaw=0.0, pitch=0.0, roll=0.0):
+        self.yaw = yaw
+        self.pitch = pitch
+        self.roll = roll
+
+    @staticmethod
+    def from_model(gimbal):
+        """
+        Create GimbalAngles from a Gimbal
+
+        :param gimbal: Gimbal parameters
+        :type gimbal: Gimbal
+
+        :return: Gimbal angles
+        :rtype: GimbalAngles
+        """
+        if gimbal is None:
+            return GimbalAngles()
+
+        return GimbalAngles(
+            gimbal.yaw if gimbal.yaw is not None else 0.0,
+            gimbal.pitch if gimbal.pitch is not None else 0.0,
+            gimbal.roll if gimbal.roll is not None else 0.0
+        )
+
+    def __repr__(self):
+        return 'GimbalAngles(%r, %r, %r)' % (self.yaw, self.pitch, self.roll)
+
+
+class PlannedWaypoint(object):
+    """
+    Waypoint produced by a builder, not yet persisted
+
+    It exposes the same attributes as Waypoint so it can be marshalled with the waypoint serializers.
+    """
+    __slots__ = ('number', 'rotation', 'coord', 'gimbal')
+
+    id = None
+
+    def __init__(self, number, rotation, coord, gimbal):
+        self.number = number
+        self.rotation = rotation
+        self.coord = coord
+        self.gimbal = gimbal
+
+    @property
+    def parameters(self):
+        """
+        The waypoint carries its own drone parameters (rotation, coord, gimbal)
+        """
+        return self
+
+
+def path_distance(path, engine=flightplan_distance_engine):
+    """
+    Return the distance of a path
+
+    The horizontal distance is used between 2 points, or the altitude difference if they have the same position.
+
+    :param path: Coordinates of the path
+    :type path: list[Coord]
+
+    :param engine: Distance engine
+    :type engine: function
+
+    :return: Distance (m)
+    :rtype: float
+    """
+    return path_length(as_points(path), engine)
+
+
+def clip_scanlines(u, v, lines):
+    """
+    Clip horizontal scanlines with a polygon (even-odd rule), vectorized over lines and edges
+
+    :param u: Abscissas of the polygon vertices
+    :type u: numpy.ndarray
+
+    :param v: Ordinates of the polygon vertices
+    :type v: numpy.ndarray
+
+    :param lines: Ordinates of the scanlines
+    :type lines: numpy.ndarray
+
+    :return: Line index, start and end abscissa of each segment inside the polygon, sorted by line and abscissa
+    :rtype: tuple[numpy.ndarray]
+    """
+
+    u1, v1 = u, v
+    u2, v2 = np.roll(u, -1), np.roll(v, -1)
+
+    # Horizontal edges never cross a scanline, the slope is only used where the edge crosses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (u2 - u1) / (v2 - v1)
+
+    chunk = max(1, CLIPPING_CHUNK_SIZE // len(u))
+    result_line = []
+    result_start = []
+    result_end = []
+
+    for first in range(0, len(lines), chunk):
+        y = lines[first:first + chunk, np.newaxis]
+
+        # Half-open test so a vertex on a scanline is counted once
+        crossing = (v1 <= y) != (v2 <= y)
+        x = np.where(crossing, u1 + (y - v1) * slope, np.inf)
+        x.sort(axis=1)
+
+        counts = crossing.sum(axis=1)
+        pairs = counts // 2
+        if pairs.sum() == 0:
+            continue
+
+        line_index = np.repeat(np.arange(len(y)), pairs)
+        pair_index = np.arange(pairs.sum()) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+
+        result_line.append(line_index + first)
+        result_start.append(x[line_index, 2 * pair_index])
+        result_end.append(x[line_index, 2 * pair_index + 1])
+
+    if len(result_line) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)
+
+    return np.concatenate(result_line), np.concatenate(result_start), np.concatenate(result_end)
@@ -0,0 +1,134 @@
+import numpy as np
+from config import SPLITTER_DISTANCE_ACCURACY
+from app.core.distance import as_points, get_engine
+from app.core.geometry import PlannedWaypoint
+
+splitter_distance_engine = get_engine(accuracy=SPLITTER_DISTANCE_ACCURACY)
+
+# Maximum length of a FlightPlan name, see FlightPlan.name
+NAME_MAX_LENGTH = 64
+
+
+def transit_distances(points, home):
+    """
+    Return the straight distance between a home point and each point of a path
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param home: Home point (lat, lon, alt)
+    :type home: numpy.ndarray
+
+    :return: Distances (m)
+    :rtype: numpy.ndarray
+    """
+    horizontal = splitter_distance_engine(home[0], home[1], points[:, 0], points[:, 1])
+    vertical = points[:, 2] - home[2]
+
+    return np.sqrt(horizontal ** 2 + vertical ** 2)
+
+
+def choose_split_points(points, max_point):
+    """
+    Choose where to split a path in missions of at most max_point points
+
+    The minimum number of missions is used, and the split points minimise the transit between the home point
+    (first point of the path) and the start and end of each mission.
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param max_point: Maximum number of points in a mission
+    :type max_point: int
+
+    :return: Start and end (excluded) index of each mission
+    :rtype: list[tuple[int]]
+    """
+    nb_point = len(points)
+    max_point = int(max_point)
+
+    if max_point <= 0:
+        raise ValueError('Parameter max_point have to be upper 0')
+
+    if nb_point <= max_point:
+        return [(0, nb_point)]
+
+    transit = transit_distances(points, points[0])
+
+    # count[j] and cost[j]: best split of the first j points, previous[j]: start of the last mission
+    count = np.zeros(nb_point + 1, dtype=int)
+    cost = np.zeros(nb_point + 1)
+    previous = np.zeros(nb_point + 1, dtype=int)
+
+    for end in range(1, nb_point + 1):
+        first = max(0, end - max_point)
+        window_count = count[first:end]
+        window_cost = cost[first:end] + transit[first:end]
+
+        # Fewer missions first, then the cheapest transit
+        window_cost = np.where(window_count == window_count.min(), window_cost, np.inf)
+        start = first + int(np.argmin(window_cost))
+
+        count[end] = count[start] + 1
+        cost[end] = cost[start] + transit[start] + transit[end - 1]
+        previous[end] = start
+
+    result = []
+    end = nb_point
+    while end > 0:
+        result.append((int(previous[end]), end))
+        end = previous[end]
+    result.reverse()
+
+    return result
+
+
+def split_flightplan(flightplan_path, max_waypoint):
+    """
+    Split a built path in missions that the drone can fly, the waypoints of each mission are numbered from 0
+
+    :param flightplan_path: Planned waypoints
+    :type flightplan_path: list[PlannedWaypoint]
+
+    :param max_waypoint: Maximum number of waypoints of a mission
+    :type max_waypoint: int
+
+    :return: Planned waypoints of each mission
+    :rtype: list[tuple[PlannedWaypoint]]
+    """
+    if len(flightplan_path) <= max_waypoint:
+        return [tuple(flightplan_path)]
+
+    points = as_points([waypoint.coord for waypoint in flightplan_path])
+
+    missions = []
+    for start, end in choose_split_points(points, max_waypoint):
+        missions.append(tuple(
+            PlannedWaypoint(number, waypoint.rotation, waypoint.coord, waypoint.gimbal)
+            for number, waypoint in enumerate(flightplan_path[start:end])
+        ))
+
+    return missions
+
+
+def mission_name(name, mission_number):
+    """
+    Return the name of a mission of a flightplan
+
+    The name of the flightplan is shortened if needed so that the name with its mission suffix stays a valid name.
+
+    :param name: Name of the flightplan (first mission)
+    :type name: str
+
+    :param mission_number: Number of the mission (from 0)
+    :type mission_number: int
+
+    :return: Name of the mission
+    :rtype: str
+    """
+    if mission_number == 0:
+        return name
+
+    suffix = ' #%d' % (mission_number + 1)
+
+    return name[:NAME_MAX_LENGTH - len(suffix)] + suffix
@@ -0,0 +1,208 @@
+import math
+import numpy as np
+from config import NOFLY_NODE_CAPACITY
+
+
+def str_order(boxes, capacity):
+    """
+    Return the Sort-Tile-Recursive order of boxes: vertical slices sorted by x, each slice sorted by y
+
+    :param boxes: Array of shape (n, 4) with min x, min y, max x and max y columns
+    :type boxes: numpy.ndarray
+
+    :param capacity: Number of entries of a node
+    :type capacity: int
+
+    :return: Order of the boxes
+    :rtype: numpy.ndarray
+    """
+    nb_box = len(boxes)
+    nb_node = int(math.ceil(nb_box / float(capacity)))
+    slice_size = int(math.ceil(math.sqrt(nb_node))) * capacity
+
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2.0
+    center_y = (boxes[:, 1] + boxes[:, 3]) / 2.0
+
+    order = np.argsort(center_x, kind='mergesort')
+    slices = np.arange(nb_box) // slice_size
+
+    # Sort by slice, then by y in each slice
+    return order[np.lexsort((center_y[order], slices))]
+
+
+def boxes_overlap(a, b):
+    """
+    Indicate if boxes overlap, row by row
+
+    :param a: Array of shape (n, 4) with min x, min y, max x and max y columns
+    :type a: numpy.ndarray
+
+    :param b: Array of shape (n, 4) with min x, min y, max x and max y columns
+    :type b: numpy.ndarray
+
+    :return: True where the boxes overlap
+    :rtype: numpy.ndarray
+    """
+    return (a[:, 0] <= b[:, 2]) & (b[:, 0] <= a[:, 2]) & (a[:, 1] <= b[:, 3]) & (b[:, 1] <= a[:, 3])
+
+
+def expand_ranges(owners, starts, ends):
+    """
+    Expand index ranges, each owner is repeated for every index of its range
+
+    :param owners: Owner of each range
+    :type owners: numpy.ndarray
+
+    :param starts: Start of each range
+    :type starts: numpy.ndarray
+
+    :param ends: End (excluded) of each range
+    :type ends: numpy.ndarray
+
+    :return: Owners and indexes
+    :rtype: tuple[numpy.ndarray]
+    """
+    counts = ends - starts
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return np.repeat(owners, counts), np.repeat(starts, counts) + offsets
+
+
+class ZoneIndex(object):
+    """
+    Polygons indexed by a packed R-tree (Sort-Tile-Recursive), queried with segments
+
+    Coordinates are used as plane coordinates (x = lon, y = lat), which is accurate enough at the scale of a
+    zone. All the segments of a path are queried at once, level by level.
+    """
+
+    def __init__(self, zones, capacity=NOFLY_NODE_CAPACITY):
+        """
+        :param zones: Identifier, name and vertices (lat, lon) of each zone
+        :type zones: list[tuple]
+
+        :param capacity: Number of entries of a node
+        :type capacity: int
+        """
+        self.ids = np.array([zone[0] for zone in zones], dtype=int)
+        self.names = [zone[1] for zone in zones]
+
+        vertices = [np.asarray(zone[2], dtype=float).reshape(-1, 2)[:, ::-1] for zone in zones]
+        counts = np.array([len(v) for v in vertices], dtype=int)
+
+        # Edges of all the zones, the edges of a zone are contiguous
+        self.edge_starts = np.cumsum(counts) - counts
+        self.edge_ends = np.cumsum(counts)
+        if len(zones) > 0:
+            self.edge_a = np.concatenate(vertices)
+            self.edge_b = np.concatenate([np.roll(v, -1, axis=0) for v in vertices])
+        else:
+            self.edge_a = self.edge_b = np.empty((0, 2))
+
+        boxes = np.array([np.concatenate((v.min(axis=0), v.max(axis=0))) for v in vertices]).reshape(-1, 4)
+
+        # Levels from the leaves to the root, an entry covers the range [start, end[ of the level below (or the zone)
+        self.levels = []
+        starts = np.arange(len(zones))
+        ends = starts + 1
+
+        while len(boxes) > 0:
+            order = str_order(boxes, capacity)
+            boxes, starts, ends = boxes[order], starts[order], ends[order]
+            self.levels.append((boxes, starts, ends))
+
+            if len(boxes) <= capacity:
+                break
+
+            node_starts = np.arange(0, len(boxes), capacity)
+            boxes = np.concatenate((
+                np.minimum.reduceat(boxes[:, :2], node_starts),
+                np.maximum.reduceat(boxes[:, 2:], node_starts)
+            ), axis=1)
+            starts = node_starts
+            ends = np.minimum(node_starts + capacity, len(self.levels[-1][0]))
+
+        self.levels.reverse()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def candidates(self, segment_boxes):
+        """
+        Return the (segment, zone) pairs whose boxes overlap
+
+        :param segment_boxes: Array of shape (n, 4) with min x, min y, max x and max y columns
+        :type segment_boxes: numpy.ndarray
+
+        :return: Segment and zone indexes
+        :rtype: tuple[numpy.ndarray]
+        """
+        root_size = len(self.levels[0][0])
+        segments = np.repeat(np.arange(len(segment_boxes)), root_size)
+        entries = np.tile(np.arange(root_size), len(segment_boxes))
+
+        for depth, (boxes, starts, ends) in enumerate(self.levels):
+            keep = boxes_overlap(segment_boxes[segments], boxes[entries])
+            segments, entries = segments[keep], entries[keep]
+
+            if depth < len(self.levels) - 1:
+                segments, entries = expand_ranges(segments, starts[entries], ends[entries])
+
+        return segments, starts[entries]
+
+    def intersections(self, points):
+        """
+        Return the zones crossed by the segments of a path
+
+        A segment crosses a zone if it intersects an edge of the zone or if it starts inside the zone.
+
+        :param points: Array of shape (n, 3) with lat, lon and alt columns
+        :type points: numpy.ndarray
+
+        :return: Segment (index of its first point) and zone indexes, sorted by segment
+        :rtype: tuple[numpy.ndarray]
+        """
+        empty = np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        if len(self.ids) == 0 or len(points) == 0:
+            return empty
+
+        xy = np.asarray(points, dtype=float)[:, 1::-1]
+        if len(xy) == 1:
+            xy = np.concatenate((xy, xy))
+        p, q = xy[:-1], xy[1:]
+
+        segment_boxes = np.concatenate((np.minimum(p, q), np.maximum(p, q)), axis=1)
+        segments, zones = self.candidates(segment_boxes)
+        if len(segments) == 0:
+            return empty
+
+        # One row per (candidate, edge of its zone)
+        pairs, edges = expand_ranges(np.arange(len(segments)), self.edge_starts[zones], self.edge_ends[zones])
+        sp, sq = p[segments[pairs]], q[segments[pairs]]
+        ea, eb = self.edge_a[edges], self.edge_b[edges]
+
+        def orientation(o, a, b):
+            return np.sign((a[:, 0] - o[:, 0]) * (b[:, 1] - o[:, 1]) - (a[:, 1] - o[:, 1]) * (b[:, 0] - o[:, 0]))
+
+        crossing = (orientation(ea, eb, sp) * orientation(ea, eb, sq) <= 0) & \
+                   (orientation(sp, sq, ea) * orientation(sp, sq, eb) <= 0) & \
+                   boxes_overlap(np.concatenate((np.minimum(sp, sq), np.maximum(sp, sq)), axis=1),
+                                 np.concatenate((np.minimum(ea, eb), np.maximum(ea, eb)), axis=1))
+
+        # Even-odd rule for the first point of the segment, half-open test on the edge ends
+        straddle = (ea[:, 1] > sp[:, 1]) != (eb[:, 1] > sp[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = ea[:, 0] + (sp[:, 1] - ea[:, 1]) * (eb[:, 0] - ea[:, 0]) / (eb[:, 1] - ea[:, 1])
+        ray = straddle & (sp[:, 0] < x_cross)
+
+        edge_counts = self.edge_ends[zones] - self.edge_starts[zones]
+        group_starts = np.cumsum(edge_counts) - edge_counts
+
+        crossed = np.logical_or.reduceat(crossing, group_starts)
+        inside = np.add.reduceat(ray.astype(int), group_starts) % 2 == 1
+
+        hit = crossed | inside
+        segments, zones = segments[hit], zones[hit]
+        order = np.lexsort((zones, segments))
+
+        return segments[order], zones[order]
@@ -0,0 +1,168 @@
+import time
+import numpy as np
+from config import OPTIMIZER_ALTITUDE_WEIGHT, OPTIMIZER_TIME_LIMIT
+from app.core.distance import to_local
+
+
+def local_points(points):
+    """
+    Project points on a local plane centred on their mean position
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :return: East, north and up coordinates (m)
+    :rtype: tuple[numpy.ndarray]
+    """
+    x, y = to_local(points[:, 0], points[:, 1], float(points[:, 0].mean()), float(points[:, 1].mean()))
+
+    return x.astype(np.float32), y.astype(np.float32), points[:, 2].astype(np.float32)
+
+
+def cost_matrix(points, altitude_weight=OPTIMIZER_ALTITUDE_WEIGHT):
+    """
+    Return the flight cost between every pair of points
+
+    The cost is the horizontal distance plus the weighted altitude change.
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param altitude_weight: Cost of 1 m of altitude change, relative to 1 m of horizontal flight
+    :type altitude_weight: float
+
+    :return: Matrix of shape (n, n)
+    :rtype: numpy.ndarray
+    """
+    x, y, z = local_points(points)
+
+    horizontal = np.hypot(x[:, np.newaxis] - x, y[:, np.newaxis] - y)
+
+    return horizontal + np.float32(altitude_weight) * np.abs(z[:, np.newaxis] - z)
+
+
+def route_cost(points, order, altitude_weight=OPTIMIZER_ALTITUDE_WEIGHT):
+    """
+    Return the flight cost of a route, the cost minimised by optimize_route
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param order: Order of the points
+    :type order: numpy.ndarray
+
+    :param altitude_weight: Cost of 1 m of altitude change, relative to 1 m of horizontal flight
+    :type altitude_weight: float
+
+    :return: Cost
+    :rtype: float
+    """
+    if len(points) < 2:
+        return 0.0
+
+    x, y, z = (coordinates[order] for coordinates in local_points(points))
+
+    horizontal = np.hypot(np.diff(x), np.diff(y))
+
+    return float(np.sum(horizontal + np.float32(altitude_weight) * np.abs(np.diff(z)), dtype=np.float64))
+
+
+def nearest_neighbour(matrix, start=0):
+    """
+    Build an open route with the nearest neighbour heuristic
+
+    :param matrix: Cost matrix
+    :type matrix: numpy.ndarray
+
+    :param start: Index of the first point
+    :type start: int
+
+    :return: Order of the points
+    :rtype: numpy.ndarray
+    """
+    nb_point = len(matrix)
+    visited = np.zeros(nb_point, dtype=bool)
+    order = np.empty(nb_point, dtype=int)
+
+    current = start
+    for i in range(nb_point):
+        order[i] = current
+        visited[current] = True
+        if i < nb_point - 1:
+            current = int(np.argmin(np.where(visited, np.inf, matrix[current])))
+
+    return order
+
+
+def two_opt(order, matrix, time_limit=OPTIMIZER_TIME_LIMIT):
+    """
+    Improve an open route by reversing segments (2-opt), the first point is kept in place
+
+    For each segment start, the gains of all the segment ends are computed at once.
+
+    :param order: Order of the points
+    :type order: numpy.ndarray
+
+    :param matrix: Cost matrix
+    :type matrix: numpy.ndarray
+
+    :param time_limit: Maximum duration (s), the best route found so far is returned when it is reached
+    :type time_limit: float
+
+    :return: Improved order of the points
+    :rtype: numpy.ndarray
+    """
+    order = np.array(order, dtype=int)
+    nb_point = len(order)
+    deadline = time.time() + time_limit
+
+    improved = True
+    while improved:
+        improved = False
+
+        for i in range(1, nb_point - 1):
+            if time.time() > deadline:
+                return order
+
+            before = order[i - 1]
+            first = order[i]
+            ends = order[i + 1:]
+            following = order[i + 2:]
+
+            # Reversing order[i:j + 1] replaces (before, first) by (before, order[j]),
+            # and (order[j], order[j + 1]) by (first, order[j + 1]) if j is not the last point
+            gain = matrix[before, ends] - matrix[before, first]
+            gain[:-1] += matrix[first, following] - matrix[ends[:-1], following]
+
+            best = int(np.argmin(gain))
+            if gain[best] < -1e-6:
+                j = i + 1 + best
+                order[i:j + 1] = order[i:j + 1][::-1].copy()
+                improved = True
+
+    return order
+
+
+def optimize_route(points, start=0, time_limit=OPTIMIZER_TIME_LIMIT):
+    """
+    Return a short flight order for a set of points (nearest neighbour then 2-opt)
+
+    :param points: Array of shape (n, 3) with lat, lon and alt columns
+    :type points: numpy.ndarray
+
+    :param start: Index of the first point
+    :type start: int
+
+    :param time_limit: Maximum duration of the 2-opt step (s)
+    :type time_limit: float
+
+    :return: Order of the points
+    :rtype: numpy.ndarray
+    """
+    if len(points) < 3:
+        return np.arange(len(points))
+
+    matrix = cost_matrix(points)
+    order = nearest_neighbour(matrix, start)
+
+    return two_opt(order, matrix, time_limit)
@@ -0,0 +1,251 @@
+import os
+import json
+import numpy as np
+from threading import Lock
+from config import TERRAIN_DEM_PATH, TERRAIN_TILE_SIZE, TERRAIN_TILE_CACHE_SIZE
+from app.core.cache import LRUCache
+
+try:
+    import rasterio
+    from rasterio.windows import Window
+except ImportError:
+    rasterio = None
+
+# Elevation model used by the builders, opened on first use
+elevation_model = None
+
+
+class ElevationModel(object):
+    """
+    Local elevation raster read by tiles
+
+    Only the tiles covering the requested points are loaded, the most recently used are kept in an LRU cache.
+    The raster is north up, its georeference is the top left corner of the top left pixel and the pixel size.
+    """
+
+    def __init__(self, read_window, shape, west, north, lon_step, lat_step, nodata=None,
+                 tile_size=TERRAIN_TILE_SIZE, cache_size=TERRAIN_TILE_CACHE_SIZE):
+        """
+        :param read_window: Function (row_start, row_end, col_start, col_end) -> 2D array of elevations
+        :type read_window: function
+
+        :param shape: Number of rows and columns of the raster
+        :type shape: tuple[int]
+
+        :param west: Longitude of the west edge (°)
+        :type west: float
+
+        :param north: Latitude of the north edge (°)
+        :type north: float
+
+        :param lon_step: Width of a pixel (°)
+        :type lon_step: float
+
+        :param lat_step: Height of a pixel (°)
+        :type lat_step: float
+
+        :param nodata: Value of the pixels without elevation
+        :type nodata: float
+
+        :param tile_size: Size of the tiles (pixels)
+        :type tile_size: int
+
+        :param cache_size: Maximum number of tiles kept in memory
+        :type cache_size: int
+        """
+        if lon_step <= 0 or lat_step <= 0:
+            raise ValueError('The pixel size of the elevation model have to be upper 0')
+
+        self.read_window = read_window
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.west = float(west)
+        self.north = float(north)
+        self.lon_step = float(lon_step)
+        self.lat_step = float(lat_step)
+        self.nodata = nodata
+        self.tile_size = int(tile_size)
+        self.tiles = LRUCache(cache_size)
+
+    @staticmethod
+    def open(path, tile_size=TERRAIN_TILE_SIZE, cache_size=TERRAIN_TILE_CACHE_SIZE):
+        """
+        Open an elevation model
+
+        A .npy raster is memory-mapped, its georeference is read from a .json file with the same name
+        ({"west": value, "north": value, "lon_step": value, "lat_step": value, "nodata": value}).
+        Other files are opened with rasterio (GeoTIFF), which is optional.
+
+        :param path: Path of the raster
+        :type path: str
+
+        :param tile_size: Size of the tiles (pixels)
+        :type tile_size: int
+
+        :param cache_size: Maximum number of tiles kept in memory
+        :type cache_size: int
+
+        :return: Elevation model
+        :rtype: ElevationModel
+        """
+        if path is None or not os.path.exists(path):
+            raise ValueError('No elevation model available')
+
+        if path.endswith('.npy'):
+            data = np.load(path, mmap_mode='r')
+            if data.ndim != 2:
+                raise ValueError('The elevation model have to be a 2D raster')
+
+            with open(os.path.splitext(path)[0] + '.json') as f:
+                georeference = json.load(f)
+
+            return ElevationModel(
+                lambda r0, r1, c0, c1: data[r0:r1, c0:c1],
+                data.shape,
+                georeference['west'],
+                georeference['north'],
+                georeference['lon_step'],
+                georeference['lat_step'],
+                georeference.get('nodata'),
+                tile_size,
+                cache_size
+            )
+
+        if rasterio is None:
+            raise ValueError('rasterio is required to read ' + os.path.basename(path))
+
+        dataset = rasterio.open(path)
+        transform = dataset.transform
+        lock = Lock()
+
+        def read_window(r0, r1, c0, c1):
+            with lock:
+                return dataset.read(1, window=Window(c0, r0, c1 - c0, r1 - r0))
+
+        return ElevationModel(
+            read_window,
+            (dataset.height, dataset.width),
+            transform.c,
+            transform.f,
+            transform.a,
+            -transform.e,
+            dataset.nodata,
+            tile_size,
+            cache_size
+        )
+
+    def get_tile(self, tile_row, tile_col):
+        """
+        Return a tile of the raster, loaded if it is not cached
+
+        :param tile_row: Row of the tile
+        :type tile_row: int
+
+        :param tile_col: Column of the tile
+        :type tile_col: int
+
+        :return: Elevations of the tile, NaN without data
+        :rtype: numpy.ndarray
+        """
+        key = (tile_row, tile_col)
+        tile = self.tiles.get(key)
+
+        if tile is None:
+            r0 = tile_row * self.tile_size
+            c0 = tile_col * self.tile_size
+            tile = np.array(self.read_window(
+                r0, min(r0 + self.tile_size, self.shape[0]),
+                c0, min(c0 + self.tile_size, self.shape[1])
+            ), dtype=float)
+
+            if self.nodata is not None:
+                tile[tile == self.nodata] = np.nan
+
+            self.tiles.set(key, tile)
+
+        return tile
+
+    def get_pixels(self, rows, cols):
+        """
+        Return the elevation of pixels, each needed tile is read once
+
+        :param rows: Rows of the pixels
+        :type rows: numpy.ndarray
+
+        :param cols: Columns of the pixels
+        :type cols: numpy.ndarray
+
+        :return: Elevations (m)
+        :rtype: numpy.ndarray
+        """
+        tile_rows = rows // self.tile_size
+        tile_cols = cols // self.tile_size
+        nb_tile_col = (self.shape[1] - 1) // self.tile_size + 1
+
+        keys, inverse = np.unique(tile_rows * nb_tile_col + tile_cols, return_inverse=True)
+        result = np.empty(len(rows))
+
+        for i, key in enumerate(keys.tolist()):
+            tile_row, tile_col = divmod(key, nb_tile_col)
+            tile = self.get_tile(tile_row, tile_col)
+
+            mask = inverse == i
+            result[mask] = tile[rows[mask] - tile_row * self.tile_size, cols[mask] - tile_col * self.tile_size]
+
+        return result
+
+    def elevations(self, lats, lons):
+        """
+        Return the ground elevation at coordinates, bilinear interpolation of the pixel centers
+
+        :param lats: Latitudes (°)
+        :type lats: numpy.ndarray
+
+        :param lons: Longitudes (°)
+        :type lons: numpy.ndarray
+
+        :return: Elevations (m)
+        :rtype: numpy.ndarray
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lons = np.atleast_1d(np.asarray(lons, dtype=float))
+        nb_row, nb_col = self.shape
+
+        y = (self.north - lats) / self.lat_step - 0.5
+        x = (lons - self.west) / self.lon_step - 0.5
+
+        if np.any((y < -0.5) | (y > nb_row - 0.5) | (x < -0.5) | (x > nb_col - 0.5)):
+            raise ValueError('Coordinates outside of the elevation model')
+
+        r0 = np.clip(np.floor(y).astype(int), 0, max(nb_row - 2, 0))
+        c0 = np.clip(np.floor(x).astype(int), 0, max(nb_col - 2, 0))
+        r1 = np.minimum(r0 + 1, nb_row - 1)
+        c1 = np.minimum(c0 + 1, nb_col - 1)
+        wy = np.clip(y - r0, 0.0, 1.0)
+        wx = np.clip(x - c0, 0.0, 1.0)
+
+        # The 4 neighbour pixels of every point are read at once
+        nb_point = len(lats)
+        values = self.get_pixels(np.concatenate((r0, r0, r1, r1)), np.concatenate((c0, c1, c0, c1)))
+        top_left, top_right, bottom_left, bottom_right = values.reshape(4, nb_point)
+
+        result = (top_left * (1 - wx) + top_right * wx) * (1 - wy) + (bottom_left * (1 - wx) + bottom_right * wx) * wy
+
+        if np.any(np.isnan(result)):
+            raise ValueError('No elevation data for some coordinates')
+
+        return result
+
+
+def get_elevation_model():
+    """
+    Return the elevation model used by the builders
+
+    :return: Elevation model
+    :rtype: ElevationModel
+    """
+    global elevation_model
+
+    if elevation_model is None:
+        elevation_model = ElevationModel.open(TERRAIN_DEM_PATH)
+
+    return elevation_model
@@ -1,2 +1,8 @@
 class ValueExist(ValueError):
     pass
+
+
+class NoFlyZoneViolation(ValueError):
+    def __init__(self, message, violations):
+        super(NoFlyZoneViolation, self).__init__(message)
+        self.violations = violations
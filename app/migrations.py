@@ -0,0 +1,197 @@
+from sqlalchemy import inspect
+from app.extensions import db
+
+# Columns added to existing tables: table, column and its definition, the default fills the existing rows
+ADDED_COLUMNS = [
+    ('builder_options', 'type', "VARCHAR(32) DEFAULT 'vertical'"),
+    ('builder_options', 'polygon', 'TEXT'),
+    ('builder_options', 'altitude', 'FLOAT'),
+    ('builder_options', 'front_overlap', 'FLOAT'),
+    ('builder_options', 'side_overlap', 'FLOAT'),
+    ('builder_options', 'angle', 'FLOAT'),
+    ('builder_options', 'terrain_following', 'BOOLEAN DEFAULT 0'),
+    ('flightplan', 'parent_id', 'INTEGER'),
+    ('flightplan', 'mission_number', 'INTEGER DEFAULT 0')
+]
+
+
+def add_columns(connection):
+    """
+    Add the columns of the models missing from the existing tables
+
+    :param connection: Connection, in a transaction
+    :type connection: sqlalchemy.engine.Connection
+    """
+    inspector = inspect(connection)
+    tables = inspector.get_table_names()
+    columns = {}
+
+    for table, column, definition in ADDED_COLUMNS:
+        if table not in tables:
+            continue
+
+        if table not in columns:
+            columns[table] = [c['name'] for c in inspector.get_columns(table)]
+
+        if column not in columns[table]:
+            connection.execute('ALTER TABLE %s ADD COLUMN %s %s' % (table, column, definition))
+
+    if 'builder_options' in tables:
+        # The type column predates the area builder but was left empty, these builders are vertical
+        connection.execute("UPDATE builder_options SET type = 'vertical' WHERE type IS NULL")
+
+
+# Drone parameters columns stored on the waypoint and resource rows
+DRONE_PARAMETERS_COLUMNS = [
+    ('rotation', 'drone_params', 'rotation'),
+    ('lat', 'gps_coord', 'lat'),
+    ('lon', 'gps_coord', 'lon'),
+    ('alt', 'gps_coord', 'alt'),
+    ('yaw', 'gimbal', 'yaw'),
+    ('pitch', 'gimbal', 'pitch'),
+    ('roll', 'gimbal', 'roll')
+]
+
+# Indexes of the gps_coord and gimbal columns, dropped with the inlining
+DRONE_PARAMETERS_INDEXES = [
+    'ix_gps_coord_lat', 'ix_gps_coord_lon', 'ix_gps_coord_alt',
+    'ix_gimbal_yaw', 'ix_gimbal_pitch', 'ix_gimbal_roll'
+]
+
+
+def inline_drone_parameters(connection):
+    """
+    Move the drone parameters of the waypoints and resources from drone_params / gps_coord / gimbal to their rows
+
+    The legacy parameters_id column is kept (SQLite cannot drop a foreign key column) but set to NULL.
+
+    :param connection: Connection, in a transaction
+    :type connection: sqlalchemy.engine.Connection
+    """
+    inspector = inspect(connection)
+    tables = inspector.get_table_names()
+
+    for table in ('waypoint', 'resource'):
+        if table not in tables:
+            continue
+
+        columns = [column['name'] for column in inspector.get_columns(table)]
+
+        for name, source, source_name in DRONE_PARAMETERS_COLUMNS:
+            if name not in columns:
+                connection.execute('ALTER TABLE %s ADD COLUMN %s FLOAT' % (table, name))
+
+        if 'parameters_id' not in columns or 'drone_params' not in tables:
+            continue
+
+        values = []
+        for name, source, source_name in DRONE_PARAMETERS_COLUMNS:
+            if source == 'drone_params':
+                select = 'SELECT drone_params.rotation FROM drone_params WHERE drone_params.id = %s.parameters_id'
+            else:
+                select = 'SELECT {source}.{column} FROM drone_params JOIN {source} ' \
+                         'ON {source}.id = drone_params.{source_key}_id ' \
+                         'WHERE drone_params.id = %s.parameters_id'.format(
+                             source=source,
+                             column=source_name,
+                             source_key='coord' if source == 'gps_coord' else 'gimbal'
+                         )
+            values.append('%s = (%s)' % (name, select % table))
+
+        connection.execute('UPDATE %s SET %s WHERE parameters_id IS NOT NULL' % (table, ', '.join(values)))
+        connection.execute('UPDATE %s SET parameters_id = NULL' % table)
+
+    if 'drone_params' in tables:
+        # Builder options reference gps_coord and gimbal directly, only the rows of the drone parameters are removed
+        connection.execute('DELETE FROM gps_coord WHERE id IN (SELECT coord_id FROM drone_params)')
+        connection.execute('DELETE FROM gimbal WHERE id IN (SELECT gimbal_id FROM drone_params)')
+        connection.execute('DROP TABLE drone_params')
+
+    for index in DRONE_PARAMETERS_INDEXES:
+        connection.execute('DROP INDEX IF EXISTS %s' % index)
+
+
+# Counter columns: table, column, counted table and its foreign key
+COUNTERS = [
+    ('flightplan', 'waypoints_count', 'waypoint', 'flightplan_id'),
+    ('flightplan', 'recons_count', 'recon', 'flightplan_id'),
+    ('recon', 'resources_count', 'resource', 'recon_id')
+]
+
+
+def add_counters(connection):
+    """
+    Add the counter columns and initialise them from the counted rows
+
+    :param connection: Connection, in a transaction
+    :type connection: sqlalchemy.engine.Connection
+    """
+    inspector = inspect(connection)
+    tables = inspector.get_table_names()
+
+    for table, column, counted, key in COUNTERS:
+        if table not in tables or column in [c['name'] for c in inspector.get_columns(table)]:
+            continue
+
+        connection.execute('ALTER TABLE %s ADD COLUMN %s INTEGER DEFAULT 0' % (table, column))
+        connection.execute('UPDATE {table} SET {column} = (SELECT COUNT(*) FROM {counted} '
+                           'WHERE {counted}.{key} = {table}.id)'.format(table=table, column=column,
+                                                                        counted=counted, key=key))
+
+
+def create_missing_indexes(connection):
+    """
+    Create the indexes of the models missing from the existing tables
+
+    :param connection: Connection, in a transaction
+    :type connection: sqlalchemy.engine.Connection
+    """
+    inspector = inspect(connection)
+    tables = inspector.get_table_names()
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+
+        existing = [index['name'] for index in inspector.get_indexes(table.name)]
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+
+
+def replace_app_informations(connection):
+    """
+    Start the change log from the last update datetime of app_informations, then drop the table
+
+    :param connection: Connection, in a transaction
+    :type connection: sqlalchemy.engine.Connection
+    """
+    if 'app_informations' not in inspect(connection).get_table_names():
+        return
+
+    if connection.execute('SELECT COUNT(*) FROM change_log').scalar() == 0:
+        connection.execute("INSERT INTO change_log (created_on, entity, entity_id, operation) "
+                           "SELECT updated_on, 'app_informations', id, 'update' FROM app_informations")
+    connection.execute('DROP TABLE app_informations')
+
+
+# Migrations in order, each one is a function (connection) that must do nothing on an up to date schema
+MIGRATIONS = [
+    add_columns,
+    inline_drone_parameters,
+    add_counters,
+    create_missing_indexes,
+    replace_app_informations
+]
+
+
+def upgrade():
+    """
+    Bring an existing database to the schema of the models
+
+    db.create_all only creates the missing tables, the migrations change the existing ones and move their data.
+    Each migration runs in its own transaction.
+    """
+    for migration in MIGRATIONS:
+        with db.engine.begin() as connection:
+            migration(connection)
@@ -1,38 +1,259 @@
 import os
-import math
-from geopy.distance import vincenty
+import json
+import numpy as np
 from datetime import datetime
 from flask_restplus import fields
+from sqlalchemy import inspect, event
 from config import UPLOAD_FOLDER, RESULT_FOLDER, THUMBNAIL_FOLDER
 from app.utils import get_extention, allowed_file
-from app.exceptions import ValueExist
+from app.exceptions import ValueExist, NoFlyZoneViolation
 from app.extensions import db
+from app.core.geometry import Coord, GimbalAngles, path_distance, flightplan_distance_engine
+from app.core.distance import path_length, insertion_length
+from app.core.route_optimizer import optimize_route, route_cost
+from app.core.nofly import ZoneIndex
+from app.core.coverage import analyze_coverage
 
-CONST_LON = 71.5
-CONST_LAT = 111.3
+
+def add_to_counter(instance, name, count):
+    """
+    Add to a counter column of a row
+
+    The counter of a saved row is updated by an SQL expression (counter = counter + count), so concurrent
+    writers do not lose updates. A counter already changed in the session is updated in place.
+
+    :param instance: Mapped object
+    :param name: Name of the counter column
+    :type name: str
+
+    :param count: Value to add
+    :type count: int
+    """
+    if instance.id is None or inspect(instance).attrs[name].history.has_changes():
+        value = getattr(instance, name)
+        setattr(instance, name, (value if value is not None else 0) + count)
+    else:
+        setattr(instance, name, db.func.coalesce(getattr(type(instance), name), 0) + count)
+
+
+def queue_file_purge(paths):
+    """
+    Queue the removal of files, sent to the purge task once the transaction is committed
+
+    The files stay on the disk if the transaction is rolled back.
+
+    :param paths: Paths of the files
+    :type paths: list[str]
+    """
+    db.session.info.setdefault('purge_files', []).extend(paths)
+
+
+@event.listens_for(db.session, 'after_commit')
+def send_file_purge(session):
+    paths = session.info.pop('purge_files', None)
+
+    if paths:
+        from app.tasks import task_purge_files
+        task_purge_files.delay(paths)
 
 
-class AppInformations(db.Model):
+@event.listens_for(db.session, 'after_rollback')
+def discard_file_purge(session):
+    session.info.pop('purge_files', None)
+
+
+def parse_polygon(args, name='polygon'):
     """
-    Classe representant les informations du systeme
+    Return the vertices of a polygon from a list of coordinates
+
+    :param args: Vertices of the polygon
+    :type args: list
+        [
+            {
+                'lat' : value, (required|float|min[-90]|max[90])
+                'lon' : value  (required|float|min[-180]|max[180])
+            }
+        ]
+
+    :param name: Name of the parameter, used in the error messages
+    :type name: str
+
+    :return: Vertices [[lat, lon]]
+    :rtype: list[list[float]]
+
+    :raise ValueError: Si args == None, s'il y a moins de 3 sommets ou si erreur de validation d'un sommet
     """
-    __tablename__ = 'app_informations'
+    if args is None:
+        raise ValueError('Parameter ' + name + ' is required')
+
+    if len(args) < 3:
+        raise ValueError('Parameter ' + name + ' needs at least 3 coordinates')
+
+    vertices = []
+    for vertex in args:
+        coord = GPSCoord()
+        coord.set_lat(vertex.get('lat'))
+        coord.set_lon(vertex.get('lon'))
+        vertices.append([coord.lat, coord.lon])
+
+    return vertices
+
+
+class ChangeLog(db.Model):
+    """
+    Append-only log of the changes of the entities
+
+    The unique ID of a change is the version of the data, it increases with every change. The inserted, updated
+    and deleted rows are recorded at each flush, the rows changed by set-based statements are recorded with
+    record_query. A session that recorded changes is marked with data_changed in its info.
+    """
+    __tablename__ = 'change_log'
     id = db.Column(db.Integer, primary_key=True)
-    updated_on = db.Column(db.DateTime, default=datetime.utcnow)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    entity = db.Column(db.String(32))
+    entity_id = db.Column(db.Integer)
+    operation = db.Column(db.String(16))
 
     @staticmethod
-    def update():
+    def record_query(model, operation, ids):
         """
-        Met a jour la date de derniere mise a jour
+        Record a change of the rows selected by a query, with a single INSERT ... SELECT statement
+
+        :param model: Mapped class of the changed rows
+
+        :param operation: Operation (insert, update or delete)
+        :type operation: str
+
+        :param ids: Query of the unique IDs of the changed rows, run before the rows are deleted
+        :type ids: sqlalchemy.orm.Query
         """
+        table = ChangeLog.__table__
+        ids = ids.subquery()
 
-        appinfo = AppInformations.query.first()
+        db.session.execute(table.insert().from_select(
+            ['created_on', 'entity', 'entity_id', 'operation'],
+            db.select([
+                db.literal(datetime.utcnow()),
+                db.literal(model.__tablename__),
+                ids.c.id,
+                db.literal(operation)
+            ])
+        ))
+        db.session.info['data_changed'] = True
 
-        if appinfo is None:
-            appinfo = AppInformations()
-        else:
-            appinfo.updated_on = datetime.utcnow()
-        db.session.add(appinfo)
+    @staticmethod
+    def changes_since(version, limit):
+        """
+        Return the entities changed after a version, a row changed several times is returned once
+
+        :param version: Version known by the client
+        :type version: int
+
+        :param limit: Maximum number of changes read
+        :type limit: int
+
+        :return: Version reached, unique IDs of the changed rows and of the deleted rows by entity, and True if
+            all the changes were read
+        :rtype: tuple
+        """
+        rows = db.session.query(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.operation) \
+            .filter(ChangeLog.id > version) \
+            .order_by(ChangeLog.id) \
+            .limit(limit + 1) \
+            .all()
+
+        complete = len(rows) <= limit
+        rows = rows[:limit]
+
+        # Last operation of each row
+        operations = {}
+        for row in rows:
+            operations[(row.entity, row.entity_id)] = row.operation
+
+        changed = {}
+        deleted = {}
+        for (entity, entity_id), operation in operations.items():
+            target = deleted if operation == 'delete' else changed
+            target.setdefault(entity, []).append(entity_id)
+
+        return rows[-1].id if len(rows) > 0 else version, changed, deleted, complete
+
+    @staticmethod
+    def last_version():
+        """
+        Return the last change, read by a backward scan of the primary key
+
+        :return: Unique ID (version) and datetime of the last change, None without change
+        :rtype: tuple|None
+        """
+        return db.session.query(ChangeLog.id, ChangeLog.created_on).order_by(ChangeLog.id.desc()).first()
+
+
+@event.listens_for(db.session, 'after_flush')
+def record_flushed_changes(session, flush_context):
+    """
+    Append to the change log the rows inserted, modified or deleted by a flush of the ORM
+
+    The mapped instances are recorded, except the ChangeLog rows themselves: they are written by this hook, recording
+    them would log the log. The updates that leave the columns unchanged are skipped.
+
+    :param session: Session flushed
+    :type session: sqlalchemy.orm.Session
+
+    :param flush_context: Flush state
+    :type flush_context: sqlalchemy.orm.unitofwork.UOWTransaction
+    """
+    changes = []
+
+    for operation, instances in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for instance in instances:
+            if isinstance(instance, ChangeLog) or getattr(instance, '__tablename__', None) is None:
+                continue
+            if operation == 'update' and not session.is_modified(instance, include_collections=False):
+                continue
+
+            changes.append({
+                'created_on': datetime.utcnow(),
+                'entity': instance.__tablename__,
+                'entity_id': instance.id,
+                'operation': operation
+            })
+
+    if len(changes) > 0:
+        session.connection().execute(ChangeLog.__table__.insert(), changes)
+        session.info['data_changed'] = True
+
+
+class AppInformations(object):
+    """
+    Classe representant les informations du systeme, derivees du journal des modifications
+    """
+
+    def __init__(self, version, updated_on):
+        """
+        :param version: Unique ID of the last change
+        :type version: int
+
+        :param updated_on: Datetime of the last change
+        :type updated_on: datetime
+        """
+        self.version = version
+        self.updated_on = updated_on
+
+    @staticmethod
+    def get():
+        """
+        Retourne les informations du systeme
+
+        :return: Informations, None si aucune modification n'a ete enregistree
+        :rtype: AppInformations|None
+        """
+        last = ChangeLog.last_version()
+
+        if last is None:
+            return None
+
+        return AppInformations(last.id, last.created_on)
 
 
 class GPSCoord(db.Model):
@@ -41,9 +262,9 @@ class GPSCoord(db.Model):
     """
     __tablename__ = 'gps_coord'
     id = db.Column(db.Integer, primary_key=True)
-    lat = db.Column(db.Float, index=True)
-    lon = db.Column(db.Float, index=True)
-    alt = db.Column(db.Float, index=True, default=0)
+    lat = db.Column(db.Float)
+    lon = db.Column(db.Float)
+    alt = db.Column(db.Float, default=0)
 
     @staticmethod
     def from_dict(args):
@@ -110,44 +331,21 @@ class GPSCoord(db.Model):
             self.set_alt(alt)
 
         db.session.add(self)
-        AppInformations.update()
 
-    def distance_to(self, coord):
+    def distance_to(self, coord, engine=flightplan_distance_engine):
         """
         Retourne la distance entre 2 coordonnees
-        
-        :param coord: Coordonnee GPS
-        :type coord: GPSCoord
-        :return: Distance
-        :rtype: float
-        """
-
-        return vincenty(
-            (
-                self.lat,
-                self.lon
-            ),
-            (
-                coord.lat,
-                coord.lon
-            )
-        )
-
-    def pythagore_distance_to(self, coord):
-        """
-        Calcule la distance entre 2 coordonnees
 
         :param coord: Coordonnee GPS
         :type coord: GPSCoord
 
-        :return: Distance entre les deux coordonnees (en KM)
+        :param engine: Distance engine (see app.core.distance)
+        :type engine: function
+
+        :return: Distance (m)
         :rtype: float
         """
-
-        dx = CONST_LON * (self.lon - coord.lon)
-        dy = CONST_LAT * (self.lat - coord.lat)
-
-        return math.sqrt(math.pow(dx, 2) + math.pow(dy, 2))
+        return float(engine(self.lat, self.lon, coord.lat, coord.lon))
 
     def set_lat(self, lat):
         """
@@ -229,9 +427,9 @@ class Gimbal(db.Model):
     """
     __tablename__ = 'gimbal'
     id = db.Column(db.Integer, primary_key=True)
-    yaw = db.Column(db.Float, index=True, default=0.0)
-    pitch = db.Column(db.Float, index=True, default=0.0)
-    roll = db.Column(db.Float, index=True, default=0.0)
+    yaw = db.Column(db.Float, default=0.0)
+    pitch = db.Column(db.Float, default=0.0)
+    roll = db.Column(db.Float, default=0.0)
 
     @staticmethod
     def from_dict(args):
@@ -309,7 +507,6 @@ class Gimbal(db.Model):
             self.set_roll(roll)
 
         db.session.add(self)
-        AppInformations.update()
 
     def set_yaw(self, yaw):
         """
@@ -372,81 +569,66 @@ class Gimbal(db.Model):
         return Gimbal(yaw=self.yaw, pitch=self.pitch, roll=self.roll)
 
 
-class DroneParameters(db.Model):
+class DroneParameters(object):
     """
-    Classe representant un point de vue / les parametres du drones 
-    """
-    __tablename__ = 'drone_params'
-    id = db.Column(db.Integer, primary_key=True)
-    coord_id = db.Column(db.Integer, db.ForeignKey('gps_coord.id'))
-    gimbal_id = db.Column(db.Integer, db.ForeignKey('gimbal.id'))
-    rotation = db.Column(db.Float, default=0)
+    Classe representant un point de vue / les parametres du drones
 
-    coord = db.relationship('GPSCoord')
-    gimbal = db.relationship('Gimbal')
+    Les parametres sont stockes sur la ligne du waypoint ou de la ressource, ils sont exposes sous la forme
+    rotation / coord / gimbal attendue par les serializers.
+    """
+    rotation = db.Column(db.Float, default=0.0)
+    lat = db.Column(db.Float)
+    lon = db.Column(db.Float)
+    alt = db.Column(db.Float, default=0.0)
+    yaw = db.Column(db.Float, default=0.0)
+    pitch = db.Column(db.Float, default=0.0)
+    roll = db.Column(db.Float, default=0.0)
 
-    @staticmethod
-    def from_dict(args):
+    @property
+    def parameters(self):
         """
-        Retourne un objet DroneParameters a partir d'un dictionnaire
-
-        :param args: Dictionnaire representant les parametres
-        :type  args: dict
-            {
-                'rotation' : value, (optional|float|min[-180]|max[180]|default[0])
-                'coord' :           (required)
-                    {
-                        'lat' : value, (required|float|min[-90]|max[90])
-                        'lon' : value, (required|float|min[-180]|max[180])
-                        'alt' : value  (optionnal|float|default[1])
-                    }
-                'gimbal' :          (optional, else need minimum 1 value)
-                    {
-                        'yaw'   : value, (optionnal|float|min[-180]|max[180]|default[0])
-                        'pitch' : value, (optionnal|float|min[-180]|max[180]|default[90])
-                        'roll'  : value  (optionnal|float|min[-180]|max[180]|default[0])
-                    }
-            }
-        :return: Parametres du drone
-        :rtype: DroneParameters
-
-        :raise ValueError: Si dict == None ou si erreur de validation du contenu
-        :raise TypeError: Si erreur de validation du contenu
+        The row carries its own drone parameters (rotation, coord, gimbal)
         """
-        if args is None:
-            raise ValueError('DroneParameters args required')
+        return self
 
-        parameters = DroneParameters()
+    @property
+    def coord(self):
+        """
+        Coordonnee GPS du drone
 
-        if args.get('rotation') is not None:
-            parameters.set_rotation(args.get('rotation'))
-        parameters.set_coord(args.get('coord'))
+        :rtype: Coord
+        """
+        return Coord.from_model(self)
 
-        if args.get('gimbal') is not None:
-            parameters.set_gimbal(args.get('gimbal'))
-        else:
-            parameters.gimbal = Gimbal()
+    @property
+    def gimbal(self):
+        """
+        Parametres du gimbal
 
-        return parameters
+        :rtype: GimbalAngles
+        """
+        return GimbalAngles.from_model(self)
 
-    def update_from_dict(self, args):
+    def set_drone_parameters(self, args):
         """
-        Modifie les parametres a partir d'un dictionnaire 
+        Definie ou modifie les parametres du drone a partir d'un dictionnaire
+
+        A la creation (pas encore de coordonnee) la coordonnee est requise, ensuite au moins une valeur est requise.
 
         :param args: Dictionnaire representant les parametres
         :type args: dict
             {
-                'rotation' : value, (optional|float|min[-180]|max[180])
-                'coord' :           (optional)
+                'rotation' : value, (optional|float|min[-180]|max[180]|default[0])
+                'coord' :           (required a la creation)
                     {
-                        'lat' : value, (optional|float|min[-90]|max[90])
-                        'lon' : value, (optional|float|min[-180]|max[180])
-                        'alt' : value  (optional|float|default[1])
+                        'lat' : value, (required a la creation|float|min[-90]|max[90])
+                        'lon' : value, (required a la creation|float|min[-180]|max[180])
+                        'alt' : value  (optionnal|float|default[0])
                     }
                 'gimbal' :          (optional, else need minimum 1 value)
                     {
                         'yaw'   : value, (optionnal|float|min[-180]|max[180]|default[0])
-                        'pitch' : value, (optionnal|float|min[-180]|max[180]|default[90])
+                        'pitch' : value, (optionnal|float|min[-180]|max[180]|default[0])
                         'roll'  : value  (optionnal|float|min[-180]|max[180]|default[0])
                     }
             }
@@ -460,21 +642,23 @@ class DroneParameters(db.Model):
         coord = args.get('coord')
         gimbal = args.get('gimbal')
 
-        if rotation is None and coord is None and gimbal is None:
+        if self.lat is None:
+            self.set_coord(coord)
+            self.rotation = self.rotation or 0.0
+            self.yaw = self.yaw or 0.0
+            self.pitch = self.pitch or 0.0
+            self.roll = self.roll or 0.0
+        elif rotation is None and coord is None and gimbal is None:
             raise ValueError('No data found in DroneParameters args')
+        elif coord is not None:
+            self.set_coord(coord)
 
         if rotation is not None:
             self.set_rotation(rotation)
 
-        if coord is not None:
-            self.set_coord(coord)
-
         if gimbal is not None:
             self.set_gimbal(gimbal)
 
-        db.session.add(self)
-        AppInformations.update()
-
     def set_rotation(self, rotation):
         """
         Modifie la rotation du drone sur l'axe z
@@ -495,23 +679,42 @@ class DroneParameters(db.Model):
 
     def set_coord(self, args):
         """
-        Modifie la coordonnee
+        Modifie la coordonnee, lat et lon sont requises si aucune coordonnee n'est definie
 
         :param args: Dictionnaire representant la coordonnee GPS
         :type  args: dict
             {
                 'lat' : value, (required|float|min[-90]|max[90])
                 'lon' : value, (required|float|min[-180]|max[180])
-                'alt' : value  (optionnal|float|default[1])
+                'alt' : value  (optionnal|float|default[0])
             }
 
         :raise ValueError: Si dict == None ou si erreur de validation du contenu
         :raise TypeError: Si erreur de validation du contenu
         """
-        if self.coord is not None:
-            self.coord.update_from_dict(args)
+        if args is None:
+            raise ValueError('GPSCoord args required')
+
+        # Validation by a transient GPSCoord, never added to the session
+        if self.lat is None:
+            coord = GPSCoord.from_dict(args)
         else:
-            self.coord = GPSCoord.from_dict(args)
+            coord = GPSCoord(lat=self.lat, lon=self.lon, alt=self.alt)
+            if args.get('lat') is None and args.get('lon') is None and args.get('alt') is None:
+                raise ValueError('No data found in GPSCoord args')
+
+            if args.get('lat') is not None:
+                coord.set_lat(args.get('lat'))
+
+            if args.get('lon') is not None:
+                coord.set_lon(args.get('lon'))
+
+            if args.get('alt') is not None:
+                coord.set_alt(args.get('alt'))
+
+        self.lat = coord.lat
+        self.lon = coord.lon
+        self.alt = coord.alt if coord.alt is not None else 0.0
 
     def set_gimbal(self, args):
         """
@@ -521,30 +724,41 @@ class DroneParameters(db.Model):
         :type args: dict
             {
                 'yaw'   : value, (optionnal|float|min[-180]|max[180]|default[0])
-                'pitch' : value, (optionnal|float|min[-180]|max[180]|default[90])
+                'pitch' : value, (optionnal|float|min[-180]|max[180]|default[0])
                 'roll'  : value  (optionnal|float|min[-180]|max[180]|default[0])
             }
 
         :raise ValueError: Si dict == None ou si erreur durant validation du contenu
         :raise TypeError: Si erreur de validation du contenu
         """
-        if self.gimbal is not None:
-            self.gimbal.update_from_dict(args)
-        else:
-            self.gimbal = Gimbal.from_dict(args)
+        # Validation by a transient Gimbal, never added to the session
+        gimbal = Gimbal.from_dict(args)
 
-    def clone(self):
-        """
-        Clone current DroneParameters
-        
-        :return: Clone of current DroneParameters
+        if gimbal.yaw is not None:
+            self.yaw = gimbal.yaw
+
+        if gimbal.pitch is not None:
+            self.pitch = gimbal.pitch
+
+        if gimbal.roll is not None:
+            self.roll = gimbal.roll
+
+    def copy_drone_parameters(self):
         """
+        Return the drone parameters columns, to copy them on another row
 
-        return DroneParameters(
-            rotation=self.rotation,
-            coord=self.coord.clone(),
-            gimbal=self.gimbal.clone()
-        )
+        :return: Drone parameters
+        :rtype: dict
+        """
+        return {
+            'rotation': self.rotation,
+            'lat': self.lat,
+            'lon': self.lon,
+            'alt': self.alt,
+            'yaw': self.yaw,
+            'pitch': self.pitch,
+            'roll': self.roll
+        }
 
 
 class FlightPlan(db.Model):
@@ -553,14 +767,23 @@ class FlightPlan(db.Model):
     """
     __tablename__ = 'flightplan'
     id = db.Column(db.Integer, primary_key=True)
-    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_on = db.Column(db.DateTime, onupdate=datetime.utcnow)
     builded = db.Column(db.Boolean, default=False)
     name = db.Column(db.String(64), unique=True)
     distance = db.Column(db.Float, default=0.0)
+    parent_id = db.Column(db.Integer, db.ForeignKey('flightplan.id'), index=True)
+    mission_number = db.Column(db.Integer, default=0)
+    waypoints_count = db.Column(db.Integer, default=0)
+    recons_count = db.Column(db.Integer, default=0)
 
     builder_options_id = db.Column(db.Integer, db.ForeignKey('builder_options.id'))
     builder_options = db.relationship('FlightPlanBuilder')
+    parent = db.relationship('FlightPlan', remote_side=[id], backref=db.backref('missions', lazy='dynamic'))
+
+    # Read only collections for the serializers, unlike the dynamic backrefs they can be eager loaded
+    waypoint_list = db.relationship('Waypoint', viewonly=True, order_by='Waypoint.id')
+    recon_list = db.relationship('Recon', viewonly=True, order_by='Recon.id')
 
     @staticmethod
     def get_from_id(flightplan_id):
@@ -636,22 +859,206 @@ class FlightPlan(db.Model):
             self.__set_name(name)
 
         db.session.add(self)
-        AppInformations.update()
         db.session.commit()
 
-    def update_informations(self):
+    def query_path(self, *columns):
+        """
+        Return a query of the waypoints coordinates (lat, lon, alt) ordered by number
+
+        :param columns: Columns to select before the coordinates
+        :return: Query
+        :rtype: sqlalchemy.orm.Query
+        """
+        return db.session.query(*(columns + (Waypoint.lat, Waypoint.lon, Waypoint.alt))) \
+            .filter(Waypoint.flightplan_id == self.id) \
+            .order_by(Waypoint.number)
+
+    @staticmethod
+    def query_export(flightplan_id):
+        """
+        Return a query of a FlightPlan and of its waypoints ordered by number, with a row per waypoint
+
+        The rows are (id, name, number, lat, lon, alt, rotation, yaw, pitch, roll), a FlightPlan without waypoint has
+        a single row whose waypoint columns are None.
+
+        :param flightplan_id: FlightPlan unique Id
+        :type flightplan_id: int
+
+        :return: Query
+        :rtype: sqlalchemy.orm.Query
+        """
+        return db.session.query(FlightPlan.id, FlightPlan.name, Waypoint.number, Waypoint.lat, Waypoint.lon,
+                                Waypoint.alt, Waypoint.rotation, Waypoint.yaw, Waypoint.pitch, Waypoint.roll) \
+            .outerjoin(Waypoint, Waypoint.flightplan_id == FlightPlan.id) \
+            .filter(FlightPlan.id == flightplan_id) \
+            .order_by(Waypoint.number)
+
+    def get_path(self):
+        """
+        Return the waypoints coordinates with a single query
+
+        :return: Array of shape (n, 3) with lat, lon and alt columns
+        :rtype: numpy.ndarray
+        """
+        if self.id is None:
+            return np.empty((0, 3))
+
+        rows = self.query_path().all()
+        return np.array(rows, dtype=float).reshape(-1, 3)
+
+    def update_informations(self, path=None):
         """
         Met a jour les informations du plan de vol tel que la distance
+
+        :param path: Coordinates of the waypoints, loaded from the database if None
+        :type path: list[Coord]
         """
-        distance = 0.0
-        for i in range(1, self.waypoints.count()):
-            d = self.waypoints[i].parameters.coord.distance_to(self.waypoints[i - 1].parameters.coord).meters
-            if d == 0:
-                distance += (self.waypoints[i].parameters.coord.alt - self.waypoints[
-                    i - 1].parameters.coord.alt)
-            else:
-                distance += d
-        self.distance = distance
+        if path is None:
+            self.distance = path_length(np.nan_to_num(self.get_path()), flightplan_distance_engine)
+        else:
+            self.distance = path_distance(path)
+
+    def waypoint_neighbours(self, number, exclude_id=None):
+        """
+        Return the waypoints before and after a waypoint number
+
+        :param number: Number of the waypoint
+        :type number: int
+
+        :param exclude_id: Id of the waypoint, to ignore it if it is already saved
+        :type exclude_id: int
+
+        :return: Number and coordinates (number, lat, lon, alt) of the previous and following waypoints, None if
+                 there is no waypoint
+        :rtype: tuple
+        """
+        query = self.query_path(Waypoint.number)
+        if exclude_id is not None:
+            query = query.filter(Waypoint.id != exclude_id)
+
+        previous = query.filter(Waypoint.number < number).order_by(None).order_by(Waypoint.number.desc()).first()
+        following = query.filter(Waypoint.number > number).first()
+
+        return previous, following
+
+    def waypoint_distance(self, number, coord, exclude_id=None):
+        """
+        Return the distance added to the flightplan by a waypoint, used to keep the distance up to date
+        without loading the whole path
+
+        :param number: Number of the waypoint
+        :type number: int
+
+        :param coord: Coordinate of the waypoint
+        :type coord: Coord
+
+        :param exclude_id: Id of the waypoint, to ignore it if it is already saved
+        :type exclude_id: int
+
+        :return: Distance (m)
+        :rtype: float
+        """
+        previous, following = self.waypoint_neighbours(number, exclude_id)
+
+        return insertion_length(
+            (coord.lat, coord.lon, coord.alt),
+            previous[1:] if previous is not None else None,
+            following[1:] if following is not None else None,
+            flightplan_distance_engine
+        )
+
+    @property
+    def violations(self):
+        """
+        Legs of the flightplan and of its missions that cross a no-fly zone
+
+        :return: Violations
+        :rtype: list[dict]
+        """
+        if self.id is None:
+            return []
+
+        result = []
+        for flightplan in [self] + self.missions.order_by(FlightPlan.mission_number).all():
+            rows = flightplan.query_path(Waypoint.number).all()
+            points = np.nan_to_num(np.array([row[1:] for row in rows], dtype=float).reshape(-1, 3))
+
+            result += NoFlyZone.path_violations(points, [row[0] for row in rows], flightplan.mission_number)
+
+        return result
+
+    @property
+    def coverage(self):
+        """
+        Ground coverage of the photos of the flightplan and of its missions
+
+        :return: Coverage statistics
+        :rtype: dict
+        """
+        ids = [self.id] + [mission.id for mission in self.missions.all()] if self.id is not None else []
+
+        rows = db.session.query(Waypoint.rotation, Waypoint.yaw, Waypoint.pitch,
+                                Waypoint.lat, Waypoint.lon, Waypoint.alt) \
+            .filter(Waypoint.flightplan_id.in_(ids)) \
+            .all() if len(ids) > 0 else []
+
+        values = np.nan_to_num(np.array(rows, dtype=float).reshape(-1, 6))
+
+        target = None
+        if self.builder_options is not None and self.builder_options.type == 'area':
+            target = [(coord.lat, coord.lon) for coord in self.builder_options.polygon_coords]
+
+        return analyze_coverage(values[:, 3:], values[:, 0], values[:, 1], values[:, 2], target)
+
+    def optimize_waypoints(self):
+        """
+        Reorder the waypoints to shorten the flight, the first waypoint stays the first
+
+        The new order is kept if it lowers the flight cost minimised by the optimiser (distance and altitude change).
+        The existing numbers are reassigned in the new order with a single bulk update.
+
+        :return: Distance before and after the optimisation (m)
+        :rtype: tuple[float]
+        """
+        rows = self.query_path(Waypoint.id, Waypoint.number).all()
+        if len(rows) == 0:
+            return 0.0, 0.0
+
+        points = np.nan_to_num(np.array([row[2:] for row in rows], dtype=float))
+        before = path_length(points, flightplan_distance_engine)
+
+        order = optimize_route(points)
+
+        if route_cost(points, order) < route_cost(points, np.arange(len(points))):
+            after = path_length(points[order], flightplan_distance_engine)
+
+            table = Waypoint.__table__
+            statement = table.update() \
+                .where(table.c.id == db.bindparam('waypoint_id')) \
+                .values(number=db.bindparam('waypoint_number'))
+
+            db.session.execute(statement, [
+                {'waypoint_id': rows[index][0], 'waypoint_number': rows[k][1]}
+                for k, index in enumerate(order.tolist())
+            ])
+            ChangeLog.record_query(Waypoint, 'update', db.session.query(Waypoint.id).filter(
+                Waypoint.flightplan_id == self.id))
+            self.distance = after
+            self.delete_builder_options()
+            db.session.add(self)
+        else:
+            after = before
+
+        return before, after
+
+    def add_distance(self, distance):
+        """
+        Ajoute une distance a la distance du plan de vol
+
+        :param distance: Distance (m)
+        :type distance: float
+        """
+        self.distance = max((self.distance or 0.0) + distance, 0.0)
 
     def __set_name(self, name):
         """
@@ -679,13 +1086,82 @@ class FlightPlan(db.Model):
 
     def delete_waypoints(self):
         """
-        Delete all waypoints in flightplan
+        Delete all waypoints in flightplan with a single statement
         """
         if self.waypoints.count() > 0:
-            for waypoint in self.waypoints.all():
-                waypoint.deep_delete()
+            waypoints = Waypoint.query.filter(Waypoint.flightplan_id == self.id)
+            ChangeLog.record_query(Waypoint, 'delete', waypoints.with_entities(Waypoint.id))
+            waypoints.delete(synchronize_session=False)
+
             self.delete_builder_options()
-            db.session.commit()
+            self.distance = 0.0
+            self.waypoints_count = 0
+
+    def insert_waypoints(self, planned_waypoints):
+        """
+        Insert built waypoints with a single bulk statement, without creating mapped objects
+
+        :param planned_waypoints: Planned waypoints
+        :type planned_waypoints: list[PlannedWaypoint]
+        """
+        if len(planned_waypoints) == 0:
+            return
+
+        if self.id is None:
+            db.session.add(self)
+            db.session.flush()
+
+        now = datetime.utcnow()
+        last_id = db.session.query(db.func.max(Waypoint.id)).scalar() or 0
+
+        db.session.execute(Waypoint.__table__.insert(), [
+            {
+                'created_on': now,
+                'flightplan_id': self.id,
+                'number': planned.number,
+                'rotation': planned.rotation,
+                'lat': planned.coord.lat,
+                'lon': planned.coord.lon,
+                'alt': planned.coord.alt,
+                'yaw': planned.gimbal.yaw,
+                'pitch': planned.gimbal.pitch,
+                'roll': planned.gimbal.roll
+            }
+            for planned in planned_waypoints
+        ])
+        ChangeLog.record_query(Waypoint, 'insert', db.session.query(Waypoint.id).filter(
+            Waypoint.flightplan_id == self.id, Waypoint.id > last_id))
+        add_to_counter(self, 'waypoints_count', len(planned_waypoints))
+
+    def set_missions(self, missions):
+        """
+        Replace the missions that follow the flightplan when a built path is too long for the drone
+
+        The existing missions are reused in order, the remaining ones are deleted.
+
+        :param missions: Planned missions that follow this flightplan
+        :type missions: list[FlightPlanPreview]
+        """
+        current = self.missions.order_by(FlightPlan.mission_number).all()
+
+        for i, planned in enumerate(missions):
+            if i < len(current):
+                mission = current[i]
+                mission.delete_waypoints()
+            else:
+                mission = FlightPlan(parent=self)
+
+            mission.__set_name(planned.name)
+            mission.mission_number = planned.mission_number
+            mission.builded = True
+            mission.distance = planned.distance
+
+            db.session.add(mission)
+            db.session.flush()
+            mission.insert_waypoints(planned.waypoints)
+
+        for mission in current[len(missions):]:
+            mission.deep_delete()
 
     def delete_builder_options(self):
         """
@@ -696,29 +1172,41 @@ class FlightPlan(db.Model):
 
     def deep_delete(self):
         """
-        Supprime completement un flightplan, waypoint et reconnaissances liees
+        Supprime completement un flightplan, ses missions, waypoints et reconnaissances liees
+
+        The rows of the missions, waypoints, recons and resources are deleted by a few set-based statements.
         """
-        for waypoint in self.waypoints.all():
-            waypoint.deep_delete()
+        # Missions of the flightplan, and their own missions
+        mission_ids = []
+        parent_ids = [self.id]
+        while len(parent_ids) > 0:
+            parent_ids = [row.id for row in db.session.query(FlightPlan.id).filter(FlightPlan.parent_id.in_(parent_ids))]
+            mission_ids.extend(parent_ids)
+        flightplan_ids = [self.id] + mission_ids
+
+        waypoints = Waypoint.query.filter(Waypoint.flightplan_id.in_(flightplan_ids))
+        ChangeLog.record_query(Waypoint, 'delete', waypoints.with_entities(Waypoint.id))
+        waypoints.delete(synchronize_session=False)
+        Recon.bulk_delete(Recon.flightplan_id.in_(flightplan_ids))
+
+        if len(mission_ids) > 0:
+            missions = FlightPlan.query.filter(FlightPlan.id.in_(mission_ids))
+            ChangeLog.record_query(FlightPlan, 'delete', missions.with_entities(FlightPlan.id))
+            missions.delete(synchronize_session=False)
 
-        for recon in self.recons.all():
-            recon.deep_delete()
         db.session.delete(self)
-        AppInformations.update()
 
 
-class Waypoint(db.Model):
+class Waypoint(DroneParameters, db.Model):
     """
     Class that represent a waypoint in a flight plan
     """
     __tablename__ = 'waypoint'
     id = db.Column(db.Integer, primary_key=True)
-    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_on = db.Column(db.DateTime, onupdate=datetime.utcnow)
-    flightplan_id = db.Column(db.Integer, db.ForeignKey('flightplan.id'))
+    flightplan_id = db.Column(db.Integer, db.ForeignKey('flightplan.id'), index=True)
     number = db.Column(db.Integer)
-    parameters_id = db.Column(db.Integer, db.ForeignKey('drone_params.id'))
-    parameters = db.relationship('DroneParameters', backref='waypoint')
     flightplan = db.relationship('FlightPlan', backref=db.backref('waypoints', lazy='dynamic'))
 
     @staticmethod
@@ -773,6 +1261,11 @@ class Waypoint(db.Model):
         if created_on is not None:
             waypoint.created_on = fields.datetime_from_iso8601(created_on)
 
+        waypoint.check_no_fly_zones()
+
+        flightplan.add_distance(flightplan.waypoint_distance(waypoint.number, waypoint.get_coord()))
+        add_to_counter(flightplan, 'waypoints_count', 1)
+
         return waypoint
 
     def update_from_dict(self, args):
@@ -810,17 +1303,26 @@ class Waypoint(db.Model):
         if number is None and parameters is None:
             raise ValueError('No data found in Waypoint args')
 
+        previous_distance = 0.0
+        if self.flightplan is not None:
+            previous_distance = self.flightplan.waypoint_distance(self.number, self.get_coord(), self.id)
+
         if number is not None:
             self.set_number(number)
 
         if parameters is not None:
             self.set_parameters(parameters)
 
+        if number is not None or (parameters is not None and parameters.get('coord') is not None):
+            self.check_no_fly_zones()
+
         if self.flightplan is not None:
+            self.flightplan.add_distance(
+                self.flightplan.waypoint_distance(self.number, self.get_coord(), self.id) - previous_distance
+            )
             self.flightplan.delete_builder_options()
 
         db.session.add(self)
-        AppInformations.update()
 
     def set_number(self, number):
         """
@@ -870,27 +1372,57 @@ class Waypoint(db.Model):
         :raise TypeError: Si erreur de validation du contenu
         """
         try:
-            if self.parameters is not None:
-                self.parameters.update_from_dict(args)
-            else:
-                self.parameters = DroneParameters.from_dict(args)
+            self.set_drone_parameters(args)
         except Exception as e:
             error = str(e)
             if self.number is not None:
                 error += ' in Waypoint N' + str(self.number)
             raise ValueError(error)
 
-    def deep_delete(self):
+    def get_coord(self):
+        """
+        Return the coordinate of the waypoint
+
+        :return: Coordinate
+        :rtype: Coord
+        """
+        return self.coord
+
+    def check_no_fly_zones(self):
+        """
+        Check the legs from the previous waypoint and to the following waypoint against the no-fly zones
+
+        :raise NoFlyZoneViolation: If a leg crosses a no-fly zone
+        """
+        if self.flightplan is None:
+            return
+
+        coord = self.get_coord()
+        previous, following = self.flightplan.waypoint_neighbours(self.number, self.id)
+        rows = [row for row in (previous, (self.number, coord.lat, coord.lon, coord.alt), following) if row is not None]
+
+        points = np.nan_to_num(np.array([row[1:] for row in rows], dtype=float))
+        violations = NoFlyZone.path_violations(points, [row[0] for row in rows], self.flightplan.mission_number)
+
+        if len(violations) > 0:
+            raise NoFlyZoneViolation('Waypoint N' + str(self.number) + ' leg crosses a no-fly zone', violations)
+
+    def deep_delete(self, update_distance=True):
         """
         Supprime completement un waypoint et les parametres liees
+
+        :param update_distance: Update the distance of the flightplan
+        :type update_distance: bool
         """
-        db.session.delete(self.parameters)
+        if update_distance and self.flightplan is not None:
+            self.flightplan.add_distance(-self.flightplan.waypoint_distance(self.number, self.get_coord(), self.id))
+            add_to_counter(self.flightplan, 'waypoints_count', -1)
+
         db.session.delete(self)
-        AppInformations.update()
 
     def clone(self):
         return Waypoint(created_on=self.created_on, updated_on=self.updated_on, number=self.number,
-                        parameters=self.parameters)
+                        **self.copy_drone_parameters())
 
 
 class FlightPlanBuilder(db.Model):
@@ -908,10 +1440,18 @@ class FlightPlanBuilder(db.Model):
     v_increment = db.Column(db.Float)
     d_rotation = db.Column(db.Float, default=1.0)
     d_gimbal_id = db.Column(db.Integer, db.ForeignKey('gimbal.id'))
+    polygon = db.Column(db.Text)
+    altitude = db.Column(db.Float)
+    front_overlap = db.Column(db.Float)
+    side_overlap = db.Column(db.Float)
+    angle = db.Column(db.Float)
+    terrain_following = db.Column(db.Boolean, default=False)
     coord1 = db.relationship('GPSCoord', foreign_keys=coord1_id)
     coord2 = db.relationship('GPSCoord', foreign_keys=coord2_id)
     d_gimbal = db.relationship('Gimbal')
 
+    TYPES = ('vertical', 'area')
+
     @staticmethod
     def from_dict(args):
         """
@@ -920,6 +1460,9 @@ class FlightPlanBuilder(db.Model):
         :param args: Dictionnaire representant les parametres
         :type args: dict
             {
+                'type'            : value, (optional|string|in[vertical, area]|default[vertical])
+
+                # vertical
                 'coord1'          :        (required)
                     {
                         'lat' : value, (required|float|min[-90]|max[90])
@@ -934,7 +1477,21 @@ class FlightPlanBuilder(db.Model):
                 'alt_end'        : value, (required|float|min[>0])
                 'h_increment'    : value, (required|float|min[>0)
                 'v_increment'    : value, (required|float|min[>0)
-                'r_otation'      : value, (optional|int|min[-180]|max[180]|default[0])
+
+                # area
+                'polygon'        : [       (required|min_size[3])
+                    {
+                        'lat' : value, (required|float|min[-90]|max[90])
+                        'lon' : value (required|float|min[-180]|max[180])
+                    }
+                ],
+                'altitude'       : value, (required|float|min[>0])
+                'front_overlap'  : value, (optional|float|min[0]|max[<1]|default[0.7])
+                'side_overlap'   : value, (optional|float|min[0]|max[<1]|default[0.6])
+                'angle'          : value, (optional|float|min[-180]|max[180]|default[0])
+
+                'terrain_following' : value, (optional|bool|default[False])
+                'd_rotation'     : value, (optional|int|min[-180]|max[180]|default[0])
                 'd_gimbal'       :        (optional, else need minimum 1 value)
                     {
                         'yaw'   : value, (optionnal|float|min[-180]|max[180]|default[0])
@@ -951,14 +1508,25 @@ class FlightPlanBuilder(db.Model):
             raise ValueError('FlightPlanBuilder args required')
 
         builder = FlightPlanBuilder()
-        builder.set_coord1(args.get('coord1'))
-        builder.set_coord2(args.get('coord2'))
+        builder.set_type(args.get('type') or 'vertical')
+
+        if builder.type == 'area':
+            builder.set_polygon(args.get('polygon'))
+            builder.set_altitude(args.get('altitude'))
+            builder.set_front_overlap(args.get('front_overlap', 0.7))
+            builder.set_side_overlap(args.get('side_overlap', 0.6))
+            builder.set_angle(args.get('angle', 0.0))
+        else:
+            builder.set_coord1(args.get('coord1'))
+            builder.set_coord2(args.get('coord2'))
 
-        builder.set_alt_start(args.get('alt_start'))
+            builder.set_alt_start(args.get('alt_start'))
 
-        builder.set_alt_end(args.get('alt_end'))
-        builder.set_h_increment(args.get('h_increment'))
-        builder.set_v_increment(args.get('v_increment'))
+            builder.set_alt_end(args.get('alt_end'))
+            builder.set_h_increment(args.get('h_increment'))
+            builder.set_v_increment(args.get('v_increment'))
+
+        builder.set_terrain_following(args.get('terrain_following', False))
 
         d_rotation = args.get('d_rotation')
         if d_rotation is not None:
@@ -972,6 +1540,135 @@ class FlightPlanBuilder(db.Model):
 
         return builder
 
+    @property
+    def polygon_coords(self):
+        """
+        Sommets du polygone du generateur par zone
+
+        :return: Coordinates of the polygon, None if the builder have no polygon
+        :rtype: list[Coord]
+        """
+        if self.polygon is None:
+            return None
+
+        return [Coord(lat, lon) for lat, lon in json.loads(self.polygon)]
+
+    def set_type(self, builder_type):
+        """
+        Definie le type de generateur
+
+        :param builder_type: Type de generateur (vertical, area)
+        :type builder_type: str
+        """
+
+        if builder_type not in FlightPlanBuilder.TYPES:
+            raise ValueError('Parameter type have to be one of ' + ', '.join(FlightPlanBuilder.TYPES))
+
+        self.type = builder_type
+
+    def set_polygon(self, args):
+        """
+        Definie le polygone a couvrir
+
+        :param args: Liste des sommets du polygone
+        :type args: list
+            [
+                {
+                    'lat' : value, (required|float|min[-90]|max[90])
+                    'lon' : value  (required|float|min[-180]|max[180])
+                }
+            ]
+
+        :raise ValueError: Si args == None, s'il y a moins de 3 sommets ou si erreur de validation d'un sommet
+        """
+
+        vertices = parse_polygon(args)
+        self.polygon = json.dumps(vertices)
+
+    def set_altitude(self, altitude):
+        """
+        Definie l'altitude du generateur par zone
+
+        :param altitude: Altitude (m)
+        :type altitude: float
+        """
+
+        if altitude is None:
+            raise ValueError('Parameter altitude is required')
+        altitude = float(altitude)
+
+        if altitude <= 0:
+            raise ValueError('Parameter altitude have to be upper 0')
+
+        self.altitude = altitude
+
+    def set_front_overlap(self, front_overlap):
+        """
+        Definie le recouvrement entre 2 photos d'une meme ligne
+
+        :param front_overlap: Recouvrement ([0, 1[)
+        :type front_overlap: float
+        """
+
+        if front_overlap is None:
+            raise ValueError('Parameter front_overlap is required')
+        front_overlap = float(front_overlap)
+
+        if front_overlap < 0 or front_overlap >= 1:
+            raise ValueError('Parameter front_overlap have to be between 0 and 1 (excluded)')
+
+        self.front_overlap = front_overlap
+
+    def set_side_overlap(self, side_overlap):
+        """
+        Definie le recouvrement entre 2 lignes
+
+        :param side_overlap: Recouvrement ([0, 1[)
+        :type side_overlap: float
+        """
+
+        if side_overlap is None:
+            raise ValueError('Parameter side_overlap is required')
+        side_overlap = float(side_overlap)
+
+        if side_overlap < 0 or side_overlap >= 1:
+            raise ValueError('Parameter side_overlap have to be between 0 and 1 (excluded)')
+
+        self.side_overlap = side_overlap
+
+    def set_angle(self, angle):
+        """
+        Definie la direction des lignes (° depuis le nord)
+
+        :param angle: Direction des lignes
+        :type angle: float
+        """
+
+        if angle is None:
+            raise ValueError('Parameter angle is required')
+        angle = float(angle)
+
+        if angle < -180 or angle > 180:
+            raise ValueError('Parameter angle have to be between -180 and 180')
+
+        self.angle = angle
+
+    def set_terrain_following(self, terrain_following):
+        """
+        Definie si les altitudes sont des hauteurs au dessus du sol
+
+        :param terrain_following: Terrain following
+        :type terrain_following: bool
+        """
+
+        if terrain_following is None:
+            terrain_following = False
+
+        if not isinstance(terrain_following, bool):
+            raise ValueError('Parameter terrain_following have to be a boolean')
+
+        self.terrain_following = terrain_following
+
     def set_alt_start(self, alt_start):
         """
         Definie l'altitude de depart
@@ -1100,17 +1797,201 @@ class FlightPlanBuilder(db.Model):
             self.coord2 = GPSCoord.from_dict(args)
 
 
+class NoFlyZone(db.Model):
+    """
+    Class that represent a restricted airspace
+    """
+    __tablename__ = 'no_fly_zone'
+    id = db.Column(db.Integer, primary_key=True)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_on = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    name = db.Column(db.String(64), unique=True)
+    polygon = db.Column(db.Text)
+
+    # Index of the zones and state of the table when it was built, it is rebuilt when the zones change
+    zone_index = None
+    zone_index_key = None
+
+    @staticmethod
+    def from_dict(args):
+        """
+        Retourne une zone d'exclusion a partir d'un dictionnaire
+
+        :param args: Dictionnaire representant la zone
+        :type args: dict
+            {
+                'name'    : value, (required|string|unique|min_size[3]|max_size[64])
+                'polygon' : [      (required|min_size[3])
+                    {
+                        'lat' : value, (required|float|min[-90]|max[90])
+                        'lon' : value  (required|float|min[-180]|max[180])
+                    }
+                ]
+            }
+        :return: Zone d'exclusion
+        :rtype: NoFlyZone
+
+        :raise ValueError: Si args == None ou si erreur de validation du contenu
+        :raise ValueExist: Si une zone porte deja ce nom
+        """
+        if args is None:
+            raise ValueError('NoFlyZone args required')
+
+        zone = NoFlyZone()
+        zone.set_name(args.get('name'))
+        zone.set_polygon(args.get('polygon'))
+
+        return zone
+
+    def update_from_dict(self, args):
+        """
+        Modifie la zone d'exclusion a partir d'un dictionnaire
+
+        :param args: Dictionnaire representant les donnees a modifier
+        :type args: dict
+            {
+                'name'    : value, (optional|string|unique|min_size[3]|max_size[64])
+                'polygon' : [...]  (optional|min_size[3])
+            }
+
+        :raise ValueError: Si args == None ou si erreur de validation du contenu
+        :raise ValueExist: Si une zone porte deja ce nom
+        """
+        if args is None:
+            raise ValueError('NoFlyZone args required')
+
+        if args.get('name') is not None:
+            self.set_name(args.get('name'))
+
+        if args.get('polygon') is not None:
+            self.set_polygon(args.get('polygon'))
+
+        db.session.add(self)
+
+    @property
+    def polygon_coords(self):
+        """
+        Sommets de la zone
+
+        :return: Coordinates of the polygon
+        :rtype: list[Coord]
+        """
+        if self.polygon is None:
+            return None
+
+        return [Coord(lat, lon) for lat, lon in json.loads(self.polygon)]
+
+    def set_name(self, name):
+        """
+        Modifie le nom
+
+        :param name: Nom
+        :type name: str
+
+        :raise ValueError: Si name == None ou si len(name) < 3 ou len(name) > 64
+        :raise ValueExist: Si une zone porte deja ce nom
+        """
+        if name is None:
+            raise ValueError('NoFlyZone name is required')
+        name = str(name)
+
+        if len(name) < 3 or len(name) > 64:
+            raise ValueError('NoFlyZone name length have to be between 3 and 64')
+
+        zone = NoFlyZone.query.filter_by(name=name).first()
+        if zone is not None and zone.id != self.id:
+            raise ValueExist('NoFlyZone name already exist')
+
+        self.name = name
+
+    def set_polygon(self, args):
+        """
+        Modifie le polygone de la zone
+
+        :param args: Liste des sommets du polygone
+        :type args: list
+        """
+        self.polygon = json.dumps(parse_polygon(args))
+
+    def deep_delete(self):
+        """
+        Supprime la zone d'exclusion
+        """
+        db.session.delete(self)
+
+    @staticmethod
+    def get_index():
+        """
+        Return the index of the no-fly zones
+
+        The index is rebuilt if a zone was added, modified or deleted since it was built.
+
+        :return: Index of the zones
+        :rtype: ZoneIndex
+        """
+        key = tuple(db.session.query(
+            db.func.count(NoFlyZone.id),
+            db.func.max(NoFlyZone.id),
+            db.func.max(NoFlyZone.created_on),
+            db.func.max(NoFlyZone.updated_on)
+        ).one())
+
+        if NoFlyZone.zone_index is None or NoFlyZone.zone_index_key != key:
+            zones = db.session.query(NoFlyZone.id, NoFlyZone.name, NoFlyZone.polygon).all()
+            NoFlyZone.zone_index = ZoneIndex([(id, name, json.loads(polygon)) for id, name, polygon in zones])
+            NoFlyZone.zone_index_key = key
+
+        return NoFlyZone.zone_index
+
+    @staticmethod
+    def path_violations(points, numbers=None, mission_number=0):
+        """
+        Return the legs of a path that cross a no-fly zone
+
+        :param points: Array of shape (n, 3) with lat, lon and alt columns
+        :type points: numpy.ndarray
+
+        :param numbers: Number of each waypoint, index in the path if None
+        :type numbers: list[int]
+
+        :param mission_number: Mission number of the path
+        :type mission_number: int
+
+        :return: Zone and number of the first waypoint of each leg that crosses a zone
+        :rtype: list[dict]
+        """
+        index = NoFlyZone.get_index()
+        segments, zones = index.intersections(points)
+
+        if numbers is None:
+            numbers = range(len(points))
+
+        return [
+            {
+                'zone_id': int(index.ids[zone]),
+                'zone_name': index.names[zone],
+                'mission_number': mission_number,
+                'waypoint_number': numbers[segment]
+            }
+            for segment, zone in zip(segments.tolist(), zones.tolist())
+        ]
+
+
 class Recon(db.Model):
     """
     Classe representant une reconnaissance
     """
     __tablename__ = 'recon'
     id = db.Column(db.Integer, primary_key=True)
-    created_on = db.Column(db.DateTime, default=datetime.utcnow)
+    created_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_on = db.Column(db.DateTime, onupdate=datetime.utcnow)
-    flightplan_id = db.Column(db.Integer, db.ForeignKey('flightplan.id'))
+    flightplan_id = db.Column(db.Integer, db.ForeignKey('flightplan.id'), index=True)
+    resources_count = db.Column(db.Integer, default=0)
     flightplan = db.relationship('FlightPlan', backref=db.backref('recons', lazy='dynamic'))
 
+    # Read only collection for the serializers, unlike the dynamic backref it can be eager loaded
+    resource_list = db.relationship('ReconResource', viewonly=True, order_by='ReconResource.id')
+
     @staticmethod
     def get_from_id(recon_id):
         """
@@ -1161,6 +2042,7 @@ class Recon(db.Model):
             raise ValueError('FlightPlan #' + str(args.get('flightplan_id')) + ' not found')
         recon.flightplan_id = flightplan.id
         recon.flightplan = flightplan
+        add_to_counter(flightplan, 'recons_count', 1)
 
         created_on = args.get('created_on')
         if created_on is not None:
@@ -1172,25 +2054,43 @@ class Recon(db.Model):
         """
         Supprime completement une reconnaissance et les ressources liees
         """
-        for resource in self.resources.all():
-            resource.deep_delete()
+        ReconResource.bulk_delete(ReconResource.recon_id == self.id)
+        Analysis.clear_recons([self.id])
+
+        if self.flightplan is not None:
+            add_to_counter(self.flightplan, 'recons_count', -1)
         db.session.delete(self)
-        AppInformations.update()
 
 
-class ReconResource(db.Model):
+    @staticmethod
+    def bulk_delete(criterion):
+        """
+        Delete recons and their resources with set-based statements, without loading them
+
+        The analyses of the recons are kept, their reference to the recons is cleared.
+
+        :param criterion: Filter of the recons to delete
+        """
+        recon_ids = db.session.query(Recon.id).filter(criterion)
+
+        ReconResource.bulk_delete(ReconResource.recon_id.in_(recon_ids))
+        Analysis.clear_recons(recon_ids)
+
+        ChangeLog.record_query(Recon, 'delete', recon_ids)
+        Recon.query.filter(criterion).delete(synchronize_session=False)
+
+
+class ReconResource(DroneParameters, db.Model):
     """
     Classe representant une ressource d'un reconnaissance
     """
     __tablename__ = 'resource'
     id = db.Column(db.Integer, primary_key=True)
-    created_on = db.Column(db.DateTime, default=datetime.utcnow)
-    recon_id = db.Column(db.Integer, db.ForeignKey('recon.id'))
+    created_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    recon_id = db.Column(db.Integer, db.ForeignKey('recon.id'), index=True)
     recon = db.relationship('Recon', backref=db.backref('resources', lazy='dynamic'))
     number = db.Column(db.Integer)
     filename = db.Column(db.String(64), unique=True)
-    parameters_id = db.Column(db.Integer, db.ForeignKey('drone_params.id'))
-    parameters = db.relationship('DroneParameters', backref='resource')
 
     @staticmethod
     def from_dict(args):
@@ -1235,6 +2135,7 @@ class ReconResource(db.Model):
             raise ValueError('Recon #' + str(args.get('recon_id')) + ' not found')
         resource.recon_id = recon.id
         resource.recon = recon
+        add_to_counter(recon, 'resources_count', 1)
 
         resource.__set_number(args.get('number'))
         resource.__set_parameters(args.get('parameters'))
@@ -1290,31 +2191,22 @@ class ReconResource(db.Model):
             self.filename = filename
             db.session.add(self)
             db.session.commit()
-            AppInformations.update()
             raise ValueExist('Resource content already exist')
         else:
             file.save(os.path.join(UPLOAD_FOLDER, filename))
             self.filename = filename
             db.session.add(self)
             db.session.commit()
-            AppInformations.update()
 
     def remove_content(self):
         """
         Supprime le fichier de la ressource et la vignette si elle existe
         """
         if self.filename is not None:
-            path = os.path.join(UPLOAD_FOLDER, self.filename)
-            if os.path.exists(path):
-                os.remove(path)
-
-            thumbnail_path = os.path.join(THUMBNAIL_FOLDER, self.filename)
-            if os.path.exists(thumbnail_path):
-                os.remove(thumbnail_path)
+            queue_file_purge(ReconResource.content_paths(self.filename))
 
             self.filename = None
             db.session.add(self)
-            AppInformations.update()
 
     def __set_number(self, number):
         """
@@ -1362,18 +2254,54 @@ class ReconResource(db.Model):
         :raise ValueError: Si dict == None ou si erreur de validation du contenu
         :raise TypeError: Si erreur de validation du contenu
         """
-        if self.parameters is not None:
-            self.parameters.update_from_dict(args)
-        else:
-            self.parameters = DroneParameters.from_dict(args)
+        self.set_drone_parameters(args)
 
-    def deep_delete(self):
+    @staticmethod
+    def content_paths(filename):
+        """
+        Return the paths of the content and the thumbnail of a resource
+
+        :param filename: Name of the resource file
+        :type filename: str
+
+        :return: Paths of the files
+        :rtype: list[str]
+        """
+        return [os.path.join(UPLOAD_FOLDER, filename), os.path.join(THUMBNAIL_FOLDER, filename)]
+
+    @staticmethod
+    def bulk_delete(criterion):
+        """
+        Delete resources with set-based statements, without loading them
+
+        Their files are queued for purge, the analysis results keep their values but lose the reference to them.
+
+        :param criterion: Filter of the resources to delete
+        """
+        resource_ids = db.session.query(ReconResource.id).filter(criterion)
+
+        paths = []
+        for row in db.session.query(ReconResource.filename).filter(criterion, ReconResource.filename.isnot(None)):
+            paths.extend(ReconResource.content_paths(row.filename))
+        queue_file_purge(paths)
+
+        AnalysisResult.clear_resources(resource_ids)
+
+        ChangeLog.record_query(ReconResource, 'delete', resource_ids)
+        ReconResource.query.filter(criterion).delete(synchronize_session=False)
+
+    def deep_delete(self, update_count=True):
         """
         Supprime completement une ressource et le fichier liee
+
+        :param update_count: Update the resources count of the recon
+        :type update_count: bool
         """
         self.remove_content()
+
+        if update_count and self.recon is not None:
+            add_to_counter(self.recon, 'resources_count', -1)
         db.session.delete(self)
-        AppInformations.update()
 
 
 class Analysis(db.Model):
@@ -1382,8 +2310,8 @@ class Analysis(db.Model):
     """
     __tablename__ = 'analysis'
     id = db.Column(db.Integer, primary_key=True)
-    created_on = db.Column(db.DateTime, default=datetime.utcnow)
-    state = db.Column(db.String(32), default='pending')
+    created_on = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    state = db.Column(db.String(32), default='pending', index=True)
     total = db.Column(db.Integer)
     current = db.Column(db.Integer)
     message = db.Column(db.String(64))
@@ -1397,6 +2325,9 @@ class Analysis(db.Model):
 
     subtrahend_recon = db.relationship('Recon', foreign_keys=subtrahend_recon_id)
 
+    # Read only collection for the serializers, unlike the dynamic backref it can be eager loaded
+    result_list = db.relationship('AnalysisResult', viewonly=True, order_by='AnalysisResult.id')
+
     @staticmethod
     def get_from_id(analysis_id):
         """
@@ -1459,12 +2390,33 @@ class Analysis(db.Model):
 
     def deep_delete(self):
         """
-        Delete the analysis and the results
+        Delete the analysis and the results, the result files are queued for purge
         """
-        for result in self.results.all():
-            result.deep_delete()
+        paths = [
+            os.path.join(RESULT_FOLDER, row.filename)
+            for row in db.session.query(AnalysisResult.filename).filter(
+                AnalysisResult.analysis_id == self.id, AnalysisResult.filename.isnot(None))
+        ]
+        queue_file_purge(paths)
+
+        results = AnalysisResult.query.filter(AnalysisResult.analysis_id == self.id)
+        ChangeLog.record_query(AnalysisResult, 'delete', results.with_entities(AnalysisResult.id))
+        results.delete(synchronize_session=False)
         db.session.delete(self)
 
+    @staticmethod
+    def clear_recons(recon_ids):
+        """
+        Clear the references of the analyses to deleted recons
+
+        :param recon_ids: Unique IDs of the recons, list or query
+        :type recon_ids: list[int]|sqlalchemy.orm.Query
+        """
+        for column in (Analysis.minuend_recon_id, Analysis.subtrahend_recon_id):
+            analyses = Analysis.query.filter(column.in_(recon_ids))
+            ChangeLog.record_query(Analysis, 'update', analyses.with_entities(Analysis.id))
+            analyses.update({column.key: None}, synchronize_session=False)
+
 
 class AnalysisResult(db.Model):
     """
@@ -1473,7 +2425,7 @@ class AnalysisResult(db.Model):
     __tablename__ = 'analysis_result'
     id = db.Column(db.Integer, primary_key=True)
     created_on = db.Column(db.DateTime, default=datetime.utcnow)
-    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'))
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id'), index=True)
     filename = db.Column(db.String(64), unique=True)
     result = db.Column(db.Float)
 
@@ -1487,14 +2439,25 @@ class AnalysisResult(db.Model):
 
     subtrahend_resource = db.relationship('ReconResource', foreign_keys=subtrahend_resource_id)
 
+    @staticmethod
+    def clear_resources(resource_ids):
+        """
+        Clear the references of the analysis results to deleted resources
+
+        :param resource_ids: Unique IDs of the resources, list or query
+        :type resource_ids: list[int]|sqlalchemy.orm.Query
+        """
+        for column in (AnalysisResult.minuend_resource_id, AnalysisResult.subtrahend_resource_id):
+            results = AnalysisResult.query.filter(column.in_(resource_ids))
+            ChangeLog.record_query(AnalysisResult, 'update', results.with_entities(AnalysisResult.id))
+            results.update({column.key: None}, synchronize_session=False)
+
     def deep_delete(self):
         """
         Delete the analysis result and the file
         """
         if self.filename is not None:
-            path = os.path.join(RESULT_FOLDER, self.filename)
-            if os.path.exists(path):
-                os.remove(path)
+            queue_file_purge([os.path.join(RESULT_FOLDER, self.filename)])
             self.filename = None
         db.session.delete(self)
 
@@ -26,6 +26,19 @@ def task_build_thumbnail(resource_id):
     build_thumbnail(resource)
 
 
+@celery.task
+def task_purge_files(paths):
+    """
+    Remove the files of deleted resources and results
+
+    :param paths: Paths of the files
+    :type paths: list[str]
+    """
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
 @celery.task
 def new_analysis(analysis_id):
     """
@@ -0,0 +1,87 @@
+"""
+Benchmark of the compiled serializers against flask_restplus.marshal
+
+Serialize 1000 objects (by default) of the hot response models, built in memory, with both implementations.
+
+Usage: python benchmark_serializers.py [number of objects]
+"""
+import sys
+import timeit
+from datetime import datetime
+from flask_restplus import marshal
+from app.api.serializers.compiler import serialize
+from app.api.serializers.waypoint import waypoint
+from app.api.serializers.recon import recon_with_resources
+from app.api.serializers.flightplan import flightplan_complete
+from app.api.serializers.analysis import analysis_with_result
+from app.models import FlightPlan, Waypoint, Recon, ReconResource, Analysis, AnalysisResult
+
+NOW = datetime.utcnow()
+
+
+def make_waypoint(number):
+    return Waypoint(id=number + 1, created_on=NOW, flightplan_id=1, number=number, rotation=0.0,
+                    lat=48.0 + number * 1e-5, lon=-4.0, alt=10.0, yaw=0.0, pitch=-90.0, roll=0.0)
+
+
+def make_resource(number):
+    return ReconResource(id=number + 1, created_on=NOW, recon_id=1, number=number, filename='resource.jpg',
+                         rotation=0.0, lat=48.0, lon=-4.0, alt=10.0, yaw=0.0, pitch=-90.0, roll=0.0)
+
+
+def make_recon(nb_resource):
+    recon = Recon(id=1, created_on=NOW, flightplan_id=1, resources_count=nb_resource)
+    recon.resource_list = [make_resource(i) for i in range(nb_resource)]
+    return recon
+
+
+def make_flightplan(nb_waypoint):
+    flightplan = FlightPlan(id=1, created_on=NOW, updated_on=NOW, builded=True, name='Benchmark', distance=1.0,
+                            mission_number=0, waypoints_count=nb_waypoint, recons_count=1)
+    flightplan.waypoint_list = [make_waypoint(i) for i in range(nb_waypoint)]
+    flightplan.recon_list = [make_recon(5)]
+    return flightplan
+
+
+def make_analysis(nb_result):
+    analysis = Analysis(id=1, created_on=NOW, state='complete', total=nb_result, current=nb_result, result=1.0)
+    analysis.result_list = []
+    for i in range(nb_result):
+        result = AnalysisResult(id=i + 1, created_on=NOW, analysis_id=1, filename='result.jpg', result=1.0,
+                                minuend_resource_id=1, subtrahend_resource_id=2)
+        result.minuend_resource = make_resource(0)
+        result.subtrahend_resource = make_resource(1)
+        analysis.result_list.append(result)
+    return analysis
+
+
+# Model, description and factory of the objects
+CASES = [
+    (waypoint, 'waypoint', lambda: make_waypoint(0)),
+    (recon_with_resources, 'recon_with_resources (10 resources)', lambda: make_recon(10)),
+    (flightplan_complete, 'flightplan_complete (20 waypoints, 5 resources)', lambda: make_flightplan(20)),
+    (analysis_with_result, 'analysis_with_result (10 results)', lambda: make_analysis(10))
+]
+
+
+def best_time(function, repeat=5):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+if __name__ == '__main__':
+    nb_object = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print('{0:<50} {1:>14} {2:>14} {3:>8}'.format('Model (%d objects)' % nb_object, 'marshal (ms)',
+                                                  'compiled (ms)', 'gain'))
+
+    for model, description, factory in CASES:
+        objects = [factory() for _ in range(nb_object)]
+
+        if serialize(objects, model) != marshal(objects, model):
+            raise Exception('The compiled serializer of ' + description + ' differs from marshal')
+
+        reference = best_time(lambda: marshal(objects, model))
+        compiled = best_time(lambda: serialize(objects, model))
+
+        print('{0:<50} {1:>14.1f} {2:>14.1f} {3:>7.1f}x'.format(description, reference * 1000, compiled * 1000,
+                                                              reference / compiled))
@@ -3,6 +3,64 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 
 # App settings
 MAX_WAYPOINT = 99
+MAX_BUILD_WAYPOINT = 5000
+BUILDER_CACHE_SIZE = 128
+BUILD_POOL_WORKERS = None  # Number of processes used by the batch builder, number of CPUs if None
+
+# Pagination settings (number of items of a collection page, by default and at most)
+PAGE_DEFAULT_SIZE = 100
+PAGE_MAX_SIZE = 1000
+
+# Sync settings (maximum number of changes read by a sync request)
+SYNC_MAX_CHANGES = 500
+
+# Sparse fieldset settings (number of models trimmed to the requested fields kept)
+FIELDSET_CACHE_SIZE = 128
+
+# Dump settings (number of flightplans loaded at once by a dump)
+DUMP_BATCH_SIZE = 20
+
+# Response cache settings (number of responses kept by each process, Redis URL of the cache shared by the
+# processes or None, time to live of the shared responses in s)
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_REDIS_URL = None
+RESPONSE_CACHE_TTL = 3600
+
+# Compression settings (responses smaller than COMPRESSION_MIN_SIZE bytes are sent uncompressed, gzip level and
+# brotli quality, brotli is used if installed)
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Distance settings (maximum relative error accepted, the cheapest engine that meets it for any leg is used,
+# see app.core.distance.ENGINES)
+FLIGHTPLAN_DISTANCE_ACCURACY = 1e-6
+BUILDER_DISTANCE_ACCURACY = 1e-6
+SPLITTER_DISTANCE_ACCURACY = 1e-2
+
+# Waypoint order optimisation settings (cost of 1 m of altitude change and time limit of the 2-opt step in s)
+OPTIMIZER_ALTITUDE_WEIGHT = 2.0
+OPTIMIZER_TIME_LIMIT = 0.5
+
+# No-fly zone settings (number of entries of a node of the zone index)
+NOFLY_NODE_CAPACITY = 16
+
+# Camera settings (field of view in degrees, across and along the flight line)
+CAMERA_H_FOV = 73.7
+CAMERA_V_FOV = 53.1
+
+# Coverage analysis settings (grid cell size in m, enlarged to keep the grid under COVERAGE_MAX_CELLS cells,
+# minimum number of photos of a ground point for the change analysis, number of gaps reported)
+COVERAGE_CELL_SIZE = 1.0
+COVERAGE_MAX_CELLS = 1000000
+COVERAGE_MIN_VIEWS = 2
+COVERAGE_MAX_GAPS = 20
+
+# Terrain settings (elevation model of the terrain following builders: .npy raster with a .json georeference,
+# or GeoTIFF if rasterio is installed, read by tiles of TERRAIN_TILE_SIZE pixels)
+TERRAIN_DEM_PATH = os.path.join(basedir, 'dem', 'elevation.npy')
+TERRAIN_TILE_SIZE = 256
+TERRAIN_TILE_CACHE_SIZE = 64
 
 # Redis settings
 CELERY_BROKER_URL = 'redis://localhost:6379/0'